@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: fractal_batch.py
+#
+#   Descrição:
+#   Executor em lote para gerar dezenas de variantes de uma vez (máscaras x
+#   sementes x kill_distance/step_size...) e escolher as melhores para a
+#   exposição. Expande uma grade de parâmetros, executa cada combinação num
+#   pool de processos do tamanho do número de núcleos e grava as saídas e um
+#   manifesto CSV com parâmetros, contagem de nós, iterações e tempos.
+#
+#   Rodar de novo a mesma grade retoma o lote: trabalhos já concluídos (com
+#   status 'ok' no manifesto e arquivo de saída presente) são pulados. Um
+#   checkpoint_path nos params vira um checkpoint por trabalho na pasta de
+#   saída (<nome>_<job_id>.npz), já que os trabalhos rodam ao mesmo tempo.
+#
+#   Arquivo de lote (JSON ou TOML), por exemplo:
+#
+#       generator = "imagem"
+#       output_dir = "lote_folhas"
+#
+#       [params]            # parâmetros fixos (mesmo dicionário da GUI)
+#       num_attractors = 2000
+#
+#       [grid]              # cada chave recebe uma lista de valores
+#       mask_path = ["mao.png", "coelho.png"]
+#       seed = [1, 2, 3]
+#       kill_distance = [8, 10, 12]
+#       step_size = [4, 5]
+#
+#   Uso:
+#   python fractal_batch.py lote.toml [--processos 8]
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import fractal_cli
+
+MANIFEST_NAME = 'manifest.csv'
+MANIFEST_FIELDS = ['job_id', 'status', 'output_path', 'seed', 'nodes', 'iterations',
+                   'attractors', 'elapsed', 'finished_at', 'error', 'params']
+
+
+def expand_grid(base_params, grid):
+    """Gera um dicionário de params por combinação da grade (produto cartesiano)."""
+    keys = list(grid.keys())
+    for values in itertools.product(*(grid[key] for key in keys)):
+        params = dict(base_params)
+        params.update(zip(keys, values))
+        yield params
+
+
+def job_id_for(generator, params):
+    """Identificador estável do trabalho: hash do gerador + params normalizados."""
+    canonical = json.dumps({'generator': generator, 'params': params}, sort_keys=True, default=str)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:12]
+
+
+def job_checkpoint_path(checkpoint_path, output_dir, job_id):
+    """Checkpoint próprio de um trabalho: <nome>_<job_id>.npz dentro de `output_dir`."""
+    stem, extension = os.path.splitext(os.path.basename(checkpoint_path))
+    return os.path.join(output_dir, f"{stem}_{job_id}{extension or '.npz'}")
+
+
+def read_manifest(path):
+    """Lê o manifesto existente (se houver) como {job_id: linha}."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, newline='', encoding='utf-8') as f:
+        return {row['job_id']: row for row in csv.DictReader(f)}
+
+
+def is_finished(row):
+    return row is not None and row['status'] == 'ok' and os.path.exists(row['output_path'])
+
+
+def run_job(generator, params):
+    """Executado nos processos do pool: roda um gerador sem saída no console."""
+    try:
+        result = fractal_cli.run_generator(generator, params, quiet=True)
+        return {'status': 'ok', 'elapsed': result['elapsed'], 'stats': result['stats'], 'error': ''}
+    except Exception as e:
+        return {'status': 'erro', 'elapsed': 0.0, 'stats': {}, 'error': f"{type(e).__name__}: {e}"}
+
+
+def run_batch(spec, processes=None):
+    """
+    Executa (ou retoma) um lote descrito por `spec`:
+    {'generator', 'output_dir', 'params', 'grid'}.
+    Retorna (concluídos, pulados, falhas).
+    """
+    generator = spec['generator']
+    if generator not in fractal_cli.GENERATORS:
+        raise ValueError(f"Gerador desconhecido: '{generator}'")
+    output_dir = spec.get('output_dir', f'lote_{generator}')
+    os.makedirs(output_dir, exist_ok=True)
+    extension = spec.get('extension', fractal_cli.GENERATORS[generator][2])
+
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    previous = read_manifest(manifest_path)
+
+    base_params = fractal_cli.build_params(generator, spec.get('params', {}))
+    jobs = []
+    skipped = 0
+    for params in expand_grid(base_params, spec.get('grid', {})):
+        job_id = job_id_for(generator, params)
+        if is_finished(previous.get(job_id)):
+            skipped += 1
+            continue
+        params['output_path'] = os.path.join(output_dir, f"{generator}_{job_id}{extension}")
+        if params.get('checkpoint_path'):
+            # Os trabalhos rodam ao mesmo tempo: cada um tem o seu checkpoint (e a
+            # sua pasta de quadros), senão um sobrescreve e apaga os dos outros
+            params['checkpoint_path'] = job_checkpoint_path(params['checkpoint_path'], output_dir, job_id)
+        jobs.append((job_id, params))
+
+    print(f"Lote '{generator}': {len(jobs) + skipped} trabalhos, {skipped} já concluídos, "
+          f"{len(jobs)} a executar.")
+    if not jobs:
+        return 0, skipped, 0
+
+    # Reescreve o manifesto mantendo apenas os trabalhos concluídos; as novas linhas
+    # são acrescentadas à medida que cada processo termina (retomada segura).
+    kept_rows = [row for row in previous.values() if is_finished(row)]
+    with open(manifest_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS)
+        writer.writeheader()
+        writer.writerows(kept_rows)
+
+    processes = processes or os.cpu_count() or 1
+    done = failed = 0
+    start_time = time.time()
+    with open(manifest_path, 'a', newline='', encoding='utf-8') as f, \
+            ProcessPoolExecutor(max_workers=processes) as pool:
+        writer = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS)
+        futures = {pool.submit(run_job, generator, params): (job_id, params) for job_id, params in jobs}
+        for future in as_completed(futures):
+            job_id, params = futures[future]
+            result = future.result()
+            stats = result['stats']
+            recorded = {key: value for key, value in params.items() if key != 'output_path'}
+            writer.writerow({
+                'job_id': job_id,
+                'status': result['status'],
+                'output_path': params['output_path'],
+                'seed': stats.get('seed', params.get('seed', '')),
+                'nodes': stats.get('nodes', ''),
+                'iterations': stats.get('iterations', ''),
+                'attractors': stats.get('attractors', ''),
+                'elapsed': f"{result['elapsed']:.3f}",
+                'finished_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'error': result['error'],
+                'params': json.dumps(recorded, sort_keys=True, default=str),
+            })
+            f.flush()
+
+            if result['status'] == 'ok':
+                done += 1
+            else:
+                failed += 1
+                print(f"  Falha em {job_id}: {result['error']}")
+            print(f"  [{done + failed}/{len(jobs)}] {job_id} {result['status']} "
+                  f"({result['elapsed']:.1f} s, {stats.get('nodes', '?')} nós)", flush=True)
+
+    print(f"Lote finalizado em {time.time() - start_time:.1f} segundos: {done} concluídos, "
+          f"{failed} falhas. Manifesto: {manifest_path}")
+    return done, skipped, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executa uma grade de parâmetros em paralelo.")
+    parser.add_argument("lote", help="Arquivo JSON ou TOML descrevendo o lote.")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="Número de processos (padrão: número de núcleos).")
+    args = parser.parse_args(argv)
+
+    spec = fractal_cli.load_config_file(args.lote)
+    _, _, failed = run_batch(spec, processes=args.processos)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,449 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: fractal_benchmark.py
+#
+#   Descrição:
+#   Benchmark reprodutível dos caminhos críticos (crescimento, desenho dos
+#   quadros e codificação do vídeo), para saber se uma mudança deixou a
+#   geração mais rápida ou mais lenta.
+#
+#   Cargas de trabalho, cada uma em três tamanhos (small, medium, large):
+#   - folha:   elipse de fractal_space_colonization.generate_leaf_shaped_attractors
+#   - mascara: silhueta de mask_silhouette.png (mesmo caminho das GUIs)
+#   - colonia: expansão em anéis de fractal_crescimento_colonia_filme.py
+#   - cubo:    volume de versao3d/cubo_bom.obj (núcleo do Fractal3d.py)
+#
+#   Medidas: iterações/s do crescimento, pico de memória (RSS do processo
+#   filho que roda o caso), ms por quadro desenhado e quadros/s codificados.
+#   Cada caso roda com semente fixa e a árvore final é comparada com a
+#   referência gravada em benchmarks/reference/ (equivalência de saída).
+#   Os resultados são acrescentados a benchmarks/results.jsonl, com o commit
+#   do git, para comparar execuções ao longo do tempo.
+#
+#   Com --amostragem, cada caso também roda no modo aproximado do núcleo
+#   (sample_fraction) e a tabela mostra a troca medida: aceleração do
+#   crescimento e desvio médio da árvore em relação à exata, em passos.
+#   Com --float32, roda também em float32 e falha se o desvio em relação
+#   à árvore em float64 passar de FLOAT32_TOLERANCE passos.
+#   Com --processos N, roda também cada caso com raio de influência no motor
+#   serial e repartido em N processos (fractal_partition) e falha se as duas
+#   árvores não coincidirem.
+#
+#   Uso:
+#   python fractal_benchmark.py                      (todos os casos)
+#   python fractal_benchmark.py --casos folha mascara --tamanhos small
+#   python fractal_benchmark.py --gravar_referencia  (após mudança intencional)
+#   python fractal_benchmark.py --casos cubo --amostragem 0.5 0.25
+#   python fractal_benchmark.py --float32
+#   python fractal_benchmark.py --casos cubo --processos 4
+#   python fractal_benchmark.py --historico          (só mostra os resultados)
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows: sem pico de memória
+    resource = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARK_DIR = os.path.join(BASE_DIR, 'benchmarks')
+REFERENCE_DIR = os.path.join(BENCHMARK_DIR, 'reference')
+RESULTS_PATH = os.path.join(BENCHMARK_DIR, 'results.jsonl')
+
+SEED = 1
+SIZES = ('small', 'medium', 'large')
+# Tolerância da comparação de posições com a referência
+POSITION_TOLERANCE = 1e-6
+# Desvio médio máximo (em passos) da árvore em float32 em relação à de float64
+FLOAT32_TOLERANCE = 0.5
+# Fases do perfil que compõem o crescimento (o resto é desenho/gravação)
+GROWTH_PHASES = ('ring', 'associate', 'grow', 'prune', 'exchange')
+
+# Número de atratores por tamanho (na colônia, o limite de nós)
+WORKLOADS = {
+    'folha': {'small': 500, 'medium': 2000, 'large': 6000},
+    'mascara': {'small': 500, 'medium': 2000, 'large': 6000},
+    'colonia': {'small': 300, 'medium': 800, 'large': 2000},
+    'cubo': {'small': 500, 'medium': 2000, 'large': 6000},
+}
+
+# Mesmos valores dos scripts originais
+LEAF_PARAMS = {'width': 800, 'height': 1000, 'kill_distance': 10, 'step_size': 5, 'stagnation_limit': 10}
+MASK_PARAMS = {'mask_path': os.path.join(BASE_DIR, 'mask_silhouette.png'), 'width': 600, 'height': 600,
+               'kill_distance': 10, 'step_size': 5, 'stagnation_limit': 10}
+CUBE_PARAMS = {'input_file': os.path.join(BASE_DIR, 'versao3d', 'cubo_bom.obj'),
+               'step_size': 0.05, 'kill_distance': 0.1, 'stagnation_limit': 15}
+# Raio de influência das comparações serial x particionado (--processos)
+INFLUENCE_RADII = {'folha': 50, 'mascara': 50, 'cubo': 0.4}
+VIDEO_PARAMS = {'bg_color': '#0a0a14', 'tree_color': '#ffffe6', 'line_width': 1, 'frame_interval': 5}
+
+
+class QuietQueue:
+    """Fila que descarta o progresso (o benchmark só usa o retorno e o perfil)."""
+
+    def __init__(self):
+        self.error = None
+        self.stats = {}
+
+    def put(self, message, block=True, timeout=None):
+        if 'error' in message:
+            self.error = message['error']
+        if 'stats' in message:
+            self.stats = message['stats']
+
+
+# =============================================================================
+# CARGAS DE TRABALHO
+# =============================================================================
+def _render_and_encode(tree, iterations, size, profiler, folder):
+    """Desenha os quadros do crescimento e codifica um MP4 (fases 'render' e 'encode')."""
+    import imageio.v2 as imageio
+    import fractal_render
+
+    frames = fractal_render.iter_growth_frames(tree, iterations, size, VIDEO_PARAMS['bg_color'],
+                                               VIDEO_PARAMS['tree_color'], VIDEO_PARAMS['line_width'],
+                                               VIDEO_PARAMS['frame_interval'], profiler)
+    with imageio.get_writer(os.path.join(folder, 'video.mp4'), fps=30, macro_block_size=None) as writer:
+        for index, frame_image in frames:
+            with profiler.phase('encode'):
+                writer.append_data(np.asarray(frame_image))
+            profiler.end_step('frame', index)
+
+
+def _partitioned(engine, partitions):
+    """O motor repartido em `partitions` processos (ou o próprio motor, sem partições)."""
+    if partitions is None:
+        return engine
+    import fractal_partition
+
+    return fractal_partition.PartitionedColonization.from_engine(engine, partitions)
+
+
+def run_leaf(count, profiler, folder, options=None):
+    import fractal_growth
+    import fractal_space_colonization
+
+    params = LEAF_PARAMS
+    options = dict(options or {})
+    partitions = options.pop('partitions', None)
+    random.seed(SEED)
+    leaf = fractal_space_colonization.generate_leaf_shaped_attractors(count, params['width'], params['height'])
+    attractors = np.array([attractor['pos'] for attractor in leaf])
+    positions, parents = fractal_growth.initial_trunk((params['width'] / 2, params['height']), (0.0, -1.0),
+                                                      params['step_size'])
+    engine = fractal_growth.SpaceColonization(attractors, positions, parents, params['step_size'],
+                                              params['kill_distance'], params['stagnation_limit'],
+                                              **options)
+    engine = _partitioned(engine, partitions)
+    engine.profiler = profiler
+    tree = engine.run()
+    _render_and_encode(tree, engine.iterations, (params['width'], params['height']), profiler, folder)
+    return tree, engine.iterations
+
+
+def run_mask(count, profiler, folder, options=None):
+    import fractal_growth
+
+    params = dict(MASK_PARAMS, num_attractors=count, seed=SEED, use_cache=False, **(options or {}))
+    tree, stats = fractal_growth.grow_mask_tree(params, QuietQueue(), profiler)
+    _render_and_encode(tree, stats['iterations'], (params['width'], params['height']), profiler, folder)
+    return tree, stats['iterations']
+
+
+def run_colony(count, profiler, folder, options=None):
+    # A colônia tem laço próprio, sem as opções do núcleo: `options` é ignorado
+    import fractal_cli
+    import fractal_crescimento_colonia_filme as colony
+
+    params = dict(fractal_cli.COLONY_DEFAULTS, max_nodes=count, seed=SEED, transparent_bg=False,
+                  output_path=os.path.join(folder, 'colonia.mp4'))
+    output_queue = QuietQueue()
+    tree = colony.run_fractal_generation(params, output_queue, profiler)
+    if tree is None:
+        raise RuntimeError(output_queue.error)
+    return tree, output_queue.stats['iterations']
+
+
+def run_cube(count, profiler, folder, options=None):
+    sys.path.insert(0, os.path.join(BASE_DIR, 'versao3d'))
+    import Fractal3d
+
+    params = dict(CUBE_PARAMS, num_attractors=count, seed=SEED, use_cache=False, **(options or {}))
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = _partitioned(Fractal3d._new_engine_3d(params, SEED), params.get('partitions'))
+        engine.profiler = profiler
+        tree = engine.run()
+        with profiler.phase('disk_write'):
+            Fractal3d.export_tree_to_obj(tree, os.path.join(folder, 'arvore.obj'))
+    return tree, engine.iterations
+
+
+RUNNERS = {'folha': run_leaf, 'mascara': run_mask, 'colonia': run_colony, 'cubo': run_cube}
+# Cargas que passam pelo núcleo compartilhado (aceitam as variantes) e o passo de cada uma
+STEP_SIZES = {'folha': LEAF_PARAMS['step_size'], 'mascara': MASK_PARAMS['step_size'],
+              'cubo': CUBE_PARAMS['step_size']}
+
+
+# =============================================================================
+# EXECUÇÃO DE UM CASO (num processo filho, para medir o pico de memória)
+# =============================================================================
+def case_name(workload, size, variant=''):
+    return f"{workload}_{size}{variant}"
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_case(workload, size, variant='', options=None):
+    """Roda um caso e retorna as medidas, a árvore final e o pico de memória."""
+    import fractal_profile
+
+    count = WORKLOADS[workload][size]
+    profiler = fractal_profile.PhaseProfiler()
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        tree, iterations = RUNNERS[workload](count, profiler, folder, options)
+        elapsed = time.perf_counter() - start
+
+    summary = profiler.summary()
+    phases = summary['phases']
+    growth_s = sum(phases[name]['total_s'] for name in GROWTH_PHASES if name in phases)
+    frames = profiler.steps.get('frame', 0)
+    result = {
+        'case': case_name(workload, size, variant), 'workload': workload, 'size': size,
+        'count': count, 'options': options, 'seed': SEED, 'nodes': int(len(tree['parents'])), 'iterations': int(iterations),
+        'elapsed_s': round(elapsed, 4), 'growth_s': round(growth_s, 4),
+        'iterations_per_s': round(iterations / growth_s, 2) if growth_s else None,
+        'render_ms_per_frame': phases['render']['mean_ms'] if 'render' in phases else None,
+        'encode_fps': round(frames / phases['encode']['total_s'], 2) if 'encode' in phases else None,
+        'frames': frames,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+    tree = {'positions': np.asarray(tree['positions']), 'parents': np.asarray(tree['parents'])}
+    return result, tree
+
+
+def _run_case_isolated(workload, size, variant='', options=None):
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(run_case, workload, size, variant, options).result()
+
+
+# =============================================================================
+# EQUIVALÊNCIA COM A REFERÊNCIA
+# =============================================================================
+def reference_path(name):
+    return os.path.join(REFERENCE_DIR, f"{name}.npz")
+
+
+def compare_with_reference(name, tree):
+    """Retorna (equivalente, detalhe); equivalente é None se não há referência."""
+    path = reference_path(name)
+    if not os.path.exists(path):
+        return None, 'sem referência'
+    with np.load(path) as reference:
+        ref_positions, ref_parents = reference['positions'], reference['parents']
+    if len(ref_parents) != len(tree['parents']):
+        return False, f"{len(tree['parents'])} nós (referência: {len(ref_parents)})"
+    if not np.array_equal(ref_parents, tree['parents']):
+        return False, 'topologia diferente'
+    deviation = float(np.abs(ref_positions - tree['positions']).max()) if len(ref_parents) else 0.0
+    if deviation > POSITION_TOLERANCE:
+        return False, f"posições diferem até {deviation:.3g}"
+    return True, 'idêntica'
+
+
+def tree_deviation(reference, tree):
+    """
+    Desvio médio entre duas árvores: a média, nos dois sentidos, da distância
+    de cada nó de uma ao nó mais próximo da outra (distância de Chamfer).
+    """
+    import fractal_growth
+
+    _, forward = fractal_growth.nearest_nodes(reference['positions'], tree['positions'])
+    _, backward = fractal_growth.nearest_nodes(tree['positions'], reference['positions'])
+    return 0.5 * (float(np.sqrt(forward).mean()) + float(np.sqrt(backward).mean()))
+
+
+def describe_tradeoff(exact, approximate, exact_tree, tree, step_size):
+    """Texto da troca velocidade/qualidade de um caso aproximado em relação ao exato."""
+    speedup = exact['growth_s'] / approximate['growth_s'] if approximate['growth_s'] else float('inf')
+    deviation = tree_deviation(exact_tree, tree) / step_size
+    nodes = approximate['nodes'] / exact['nodes'] if exact['nodes'] else 0.0
+    return speedup, deviation, (f"crescimento {speedup:.2f}x mais rápido, desvio médio "
+                                f"{deviation:.3f} passos, {100 * nodes:.0f}% dos nós")
+
+
+def save_reference(name, tree):
+    os.makedirs(REFERENCE_DIR, exist_ok=True)
+    np.savez_compressed(reference_path(name), positions=tree['positions'], parents=tree['parents'])
+
+
+# =============================================================================
+# HISTÓRICO DE RESULTADOS
+# =============================================================================
+def environment_info():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(), 'numpy': np.__version__,
+            'platform': platform.platform(), 'cpus': os.cpu_count()}
+
+
+def read_results(path=RESULTS_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_results(rows, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, sort_keys=True) + '\n')
+
+
+def _format_delta(current, previous):
+    if current is None or not previous:
+        return ''
+    return f" ({100 * (current / previous - 1):+.0f}%)"
+
+
+def print_table(rows, history):
+    """Tabela dos resultados, com a variação em relação à execução anterior de cada caso."""
+    previous = {}
+    for row in history:
+        previous[row['case']] = row
+    print(f"{'caso':<22}{'nós':>7}{'iter':>6}{'iter/s':>18}{'ms/quadro':>12}{'quadros/s':>12}"
+          f"{'pico MB':>10}  equivalência")
+    for row in rows:
+        before = previous.get(row['case'], {})
+        speed = row['iterations_per_s']
+        speed_text = f"{speed:.1f}{_format_delta(speed, before.get('iterations_per_s'))}" if speed else '-'
+        render = row['render_ms_per_frame']
+        encode = row['encode_fps']
+        peak = row['peak_rss_mb']
+        print(f"{row['case']:<22}{row['nodes']:>7}{row['iterations']:>6}{speed_text:>18}"
+              f"{render if render is not None else '-':>12}{encode if encode is not None else '-':>12}"
+              f"{peak if peak is not None else '-':>10}  {row['equivalence']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do crescimento, desenho e codificação.")
+    parser.add_argument("--casos", nargs='+', choices=sorted(WORKLOADS), default=sorted(WORKLOADS),
+                        help="Cargas de trabalho a executar (padrão: todas).")
+    parser.add_argument("--tamanhos", nargs='+', choices=SIZES, default=list(SIZES),
+                        help="Tamanhos a executar (padrão: todos).")
+    parser.add_argument("--gravar_referencia", action="store_true",
+                        help="Grava as árvores desta execução como nova referência de equivalência.")
+    parser.add_argument("--sem_historico", action="store_true",
+                        help="Não acrescenta os resultados a benchmarks/results.jsonl.")
+    parser.add_argument("--historico", action="store_true",
+                        help="Só mostra os últimos resultados gravados de cada caso.")
+    parser.add_argument("--amostragem", nargs='+', type=float, default=[], metavar='FRAÇÃO',
+                        help="Também roda cada caso no modo aproximado com estas frações de atratores "
+                             "por iteração e compara com a árvore exata (a colônia não tem esse modo).")
+    parser.add_argument("--float32", action="store_true",
+                        help="Também roda cada caso em float32 e compara com a árvore em float64.")
+    parser.add_argument("--processos", type=int, default=None, metavar='N',
+                        help="Também roda cada caso com raio de influência, serial e repartido em N "
+                             "processos, e exige árvores iguais (a colônia não tem esse modo).")
+    args = parser.parse_args(argv)
+
+    history = read_results()
+    if args.historico:
+        latest = {}
+        for row in history:
+            latest[row['case']] = row
+        print_table(list(latest.values()), [])
+        return 0
+
+    # Variantes do núcleo: (sufixo do caso, opções, desvio máximo aceito em passos)
+    variants = [(f"@{fraction:g}", {'sample_fraction': fraction}, None) for fraction in args.amostragem]
+    if args.float32:
+        variants.append(('@float32', {'dtype': 'float32'}, FLOAT32_TOLERANCE))
+    if args.processos is not None:
+        variants.append((f'@p{args.processos}', {'partitions': args.processos}, 0.0))
+
+    environment = environment_info()
+    timestamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+    rows = []
+    failed = False
+    for workload in args.casos:
+        for size in args.tamanhos:
+            name = case_name(workload, size)
+            print(f"Executando {name}...", flush=True)
+            result, tree = _run_case_isolated(workload, size)
+            if args.gravar_referencia:
+                save_reference(name, tree)
+                equivalent, detail = True, 'referência gravada'
+            else:
+                equivalent, detail = compare_with_reference(name, tree)
+            failed = failed or equivalent is False
+            rows.append(dict(result, timestamp=timestamp, equivalent=equivalent, equivalence=detail,
+                             **environment))
+
+            if workload not in STEP_SIZES:
+                continue
+            for variant, options, tolerance in variants:
+                exact, exact_tree = result, tree
+                if 'partitions' in options:
+                    # O modo particionado exige raio de influência: a base é o
+                    # motor serial com o mesmo raio
+                    radius = {'influence_radius': INFLUENCE_RADII[workload]}
+                    options = dict(options, **radius)
+                    print(f"Executando {case_name(workload, size, '@raio')}...", flush=True)
+                    exact, exact_tree = _run_case_isolated(workload, size, '@raio', radius)
+                    rows.append(dict(exact, timestamp=timestamp, equivalent=None,
+                                     equivalence='base serial do particionado', **environment))
+                print(f"Executando {case_name(workload, size, variant)}...", flush=True)
+                approximate, approximate_tree = _run_case_isolated(workload, size, variant, options)
+                speedup, deviation, detail = describe_tradeoff(exact, approximate, exact_tree, approximate_tree,
+                                                               STEP_SIZES[workload])
+                within = None if tolerance is None else deviation <= tolerance
+                if within is False:
+                    detail += f" (acima da tolerância de {tolerance:g})"
+                failed = failed or within is False
+                rows.append(dict(approximate, timestamp=timestamp, equivalent=within, equivalence=detail,
+                                 speedup=round(speedup, 3), deviation_steps=round(deviation, 3),
+                                 **environment))
+
+    print_table(rows, history)
+    if not args.sem_historico:
+        append_results(rows)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
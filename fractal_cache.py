@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: fractal_cache.py
+#
+#   Descrição:
+#   Cache em disco endereçado por conteúdo. A chave de cada resultado é o
+#   hash dos params normalizados (só os que afetam a simulação), da semente
+#   e do conteúdo dos arquivos de entrada (máscara ou malha). Assim, repetir
+#   a mesma máscara com os mesmos ajustes (por exemplo, reexportar a mesma
+#   árvore como PNG e como WebM) não refaz a simulação.
+#
+#   Cada entrada é uma pasta com a árvore final (tree.npz), metadados
+#   (meta.json) e, opcionalmente, saídas já renderizadas. Pré-processamentos
+#   caros (a malha 3D consertada e o volume voxelizado) ficam em entradas de
+#   arrays .npy soltos, abertos com memory-map. O tamanho total é limitado e
+#   as entradas menos usadas recentemente são removidas (LRU).
+#
+#   Pasta padrão: ~/.cache/existencia_hibrida (ou $FRACTAL_CACHE_DIR).
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'existencia_hibrida')
+DEFAULT_MAX_MB = 2048
+
+_file_hash_memo = {}
+
+
+def file_content_hash(path):
+    """SHA-256 do conteúdo de um arquivo (memorizado por caminho, tamanho e mtime)."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _file_hash_memo:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        _file_hash_memo[memo_key] = digest.hexdigest()
+    return _file_hash_memo[memo_key]
+
+
+def normalize_params(params, keys):
+    """
+    Extrai de `params` só as chaves que afetam o resultado, com números
+    normalizados (10 e 10.0 geram a mesma chave).
+    """
+    normalized = {}
+    for key in keys:
+        if key not in params or params[key] is None:
+            continue
+        value = params[key]
+        if isinstance(value, (bool, str)):
+            normalized[key] = value
+        elif isinstance(value, (int, float, np.integer, np.floating)):
+            normalized[key] = float(value)
+        elif isinstance(value, (list, tuple)):
+            normalized[key] = [float(v) if isinstance(v, (int, float)) else v for v in value]
+        else:
+            normalized[key] = str(value)
+    return normalized
+
+
+def make_key(kind, params, keys, seed, files=()):
+    """Chave de cache: hash do tipo de resultado, params normalizados, semente e arquivos."""
+    payload = {
+        'kind': kind,
+        'params': normalize_params(params, keys),
+        'seed': None if seed is None else int(seed),
+        'files': [file_content_hash(path) for path in files],
+    }
+    canonical = json.dumps(payload, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def render_file_name(kind, params, keys, extension):
+    """Nome do arquivo de uma saída renderizada dentro da entrada da árvore."""
+    key = make_key(kind, params, keys, None)
+    return f"{kind}_{key[:16]}{extension}"
+
+
+def cache_from_params(params):
+    """Cria o cache conforme os params ('use_cache', 'cache_dir', 'cache_max_mb'), ou None."""
+    if not params.get('use_cache', True):
+        return None
+    root = params.get('cache_dir') or os.environ.get('FRACTAL_CACHE_DIR') or DEFAULT_CACHE_DIR
+    return ResultCache(root, max_mb=params.get('cache_max_mb', DEFAULT_MAX_MB))
+
+
+class ResultCache:
+    """Cache LRU em disco de árvores (arrays NumPy) e de saídas renderizadas."""
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_mb=DEFAULT_MAX_MB):
+        self.root = root
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def _touch(self, entry_dir):
+        # A data de modificação da pasta marca o último uso (ordem do LRU)
+        now = time.time()
+        os.utime(entry_dir, (now, now))
+
+    # --- Árvores ---------------------------------------------------------------
+    def get_tree(self, key):
+        """Retorna (arrays, metadados) da árvore armazenada, ou None."""
+        entry_dir = self._entry_dir(key)
+        tree_path = os.path.join(entry_dir, 'tree.npz')
+        if not os.path.exists(tree_path):
+            return None
+        try:
+            with np.load(tree_path) as data:
+                arrays = {name: data[name] for name in data.files}
+            with open(os.path.join(entry_dir, 'meta.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._touch(entry_dir)
+        return arrays, meta
+
+    def put_tree(self, key, arrays, meta):
+        entry_dir = self._entry_dir(key)
+        os.makedirs(entry_dir, exist_ok=True)
+        # Escrita atômica: grava num temporário da mesma pasta e renomeia
+        fd, tmp_path = tempfile.mkstemp(suffix='.npz', dir=entry_dir)
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, os.path.join(entry_dir, 'tree.npz'))
+        # meta.json por último, também atômico: um leitor nunca vê metadados pela metade
+        fd, tmp_path = tempfile.mkstemp(suffix='.json', dir=entry_dir)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(entry_dir, 'meta.json'))
+        self._touch(entry_dir)
+        self.evict(keep=key)
+
+    # --- Arrays pré-processados (memory-map) -------------------------------------
+    def get_arrays(self, key, mmap_mode='r'):
+        """
+        Retorna (arrays, metadados) de uma entrada gravada com put_arrays, ou
+        None. Cada array é um .npy aberto com `mmap_mode` (só as páginas lidas
+        saem do disco).
+        """
+        entry_dir = self._entry_dir(key)
+        meta_path = os.path.join(entry_dir, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            arrays = {name: np.load(os.path.join(entry_dir, f'{name}.npy'), mmap_mode=mmap_mode)
+                      for name in meta['arrays']}
+        except (OSError, ValueError, KeyError):
+            return None
+        self._touch(entry_dir)
+        return arrays, meta['meta']
+
+    def put_arrays(self, key, arrays, meta):
+        entry_dir = self._entry_dir(key)
+        os.makedirs(entry_dir, exist_ok=True)
+        for name, array in arrays.items():
+            fd, tmp_path = tempfile.mkstemp(suffix='.npy', dir=entry_dir)
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, np.ascontiguousarray(array))
+            os.replace(tmp_path, os.path.join(entry_dir, f'{name}.npy'))
+        # meta.json por último: a entrada só é lida depois de todos os arrays gravados
+        fd, tmp_path = tempfile.mkstemp(suffix='.json', dir=entry_dir)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'arrays': sorted(arrays), 'meta': meta}, f)
+        os.replace(tmp_path, os.path.join(entry_dir, 'meta.json'))
+        self._touch(entry_dir)
+        self.evict(keep=key)
+
+    # --- Saídas renderizadas ---------------------------------------------------
+    def get_file(self, key, name):
+        """Caminho de uma saída renderizada armazenada na entrada `key`, ou None."""
+        entry_dir = self._entry_dir(key)
+        path = os.path.join(entry_dir, name)
+        if not os.path.exists(path):
+            return None
+        self._touch(entry_dir)
+        return path
+
+    def put_file(self, key, name, source_path):
+        entry_dir = self._entry_dir(key)
+        os.makedirs(entry_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=entry_dir)
+        os.close(fd)
+        shutil.copyfile(source_path, tmp_path)
+        os.replace(tmp_path, os.path.join(entry_dir, name))
+        self._touch(entry_dir)
+        self.evict(keep=key)
+
+    # --- Remoção por tamanho (LRU) -----------------------------------------------
+    def _entries(self):
+        entries = []
+        for prefix in os.listdir(self.root):
+            prefix_dir = os.path.join(self.root, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for key in os.listdir(prefix_dir):
+                entry_dir = os.path.join(prefix_dir, key)
+                try:
+                    size = sum(os.path.getsize(os.path.join(entry_dir, name))
+                               for name in os.listdir(entry_dir))
+                    entries.append((os.path.getmtime(entry_dir), size, entry_dir))
+                except OSError:
+                    continue
+        return entries
+
+    def evict(self, keep=None):
+        """
+        Remove as entradas menos usadas até o total caber em `max_bytes`.
+        A entrada `keep` (a que acabou de ser gravada) nunca é removida, mesmo
+        que sozinha passe do limite.
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        keep_dir = None if keep is None else self._entry_dir(keep)
+        for _, size, entry_dir in entries:
+            if total <= self.max_bytes:
+                break
+            if entry_dir == keep_dir:
+                continue
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
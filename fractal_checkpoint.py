@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: fractal_checkpoint.py
+#
+#   Descrição:
+#   Pontos de salvamento (checkpoints) periódicos para simulações longas
+#   (colônia e 3D com muitos atratores). Um checkpoint guarda o estado
+#   completo da simulação: arrays NumPy (nós, pais, atratores, contadores
+#   de estagnação...) e um dicionário JSON com os escalares (raio atual,
+#   direções dos lobos, índice do quadro, estado do gerador aleatório...).
+#
+#   A gravação é atômica (arquivo temporário + os.replace): uma queda no meio
+#   da escrita nunca corrompe o último checkpoint válido. Ao retomar, os
+#   params são conferidos com os do checkpoint para não misturar execuções.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import fractal_cache
+
+DEFAULT_INTERVAL = 50
+
+
+def rng_state_to_json(state):
+    """Converte `random.Random.getstate()` em listas (serializáveis em JSON)."""
+    version, internal, gauss_next = state
+    return [version, list(internal), gauss_next]
+
+
+def rng_state_from_json(data):
+    version, internal, gauss_next = data
+    return (version, tuple(internal), gauss_next)
+
+
+class Checkpointer:
+    """
+    Grava e lê o checkpoint de uma simulação em `path` (.npz).
+
+    `fingerprint` identifica os params da simulação; um checkpoint com outra
+    impressão digital não é retomado. `interval` é o número de iterações
+    entre gravações.
+    """
+
+    def __init__(self, path, fingerprint, interval=DEFAULT_INTERVAL):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.interval = max(1, int(interval))
+        self.last_saved = None
+
+    @classmethod
+    def from_params(cls, params, kind, keys, files=()):
+        """Cria o checkpointer a partir de params['checkpoint_path'] (ou None se ausente)."""
+        path = params.get('checkpoint_path')
+        if not path:
+            return None
+        fingerprint = fractal_cache.make_key(kind, params, keys, None, files)
+        return cls(path, fingerprint, params.get('checkpoint_interval', DEFAULT_INTERVAL))
+
+    @property
+    def frames_dir(self):
+        """Pasta persistente para os quadros já renderizados desta simulação."""
+        return self.path + '.frames'
+
+    def due(self, iteration):
+        return iteration % self.interval == 0
+
+    def save(self, arrays, state):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        payload = dict(state, fingerprint=self.fingerprint, saved_at=time.time())
+        fd, tmp_path = tempfile.mkstemp(suffix='.npz', dir=directory)
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, __state__=np.array(json.dumps(payload)), **arrays)
+        os.replace(tmp_path, self.path)
+        self.last_saved = state.get('iteration')
+
+    def load(self):
+        """Retorna (arrays, estado) do último checkpoint, ou None se não houver."""
+        if not os.path.exists(self.path):
+            return None
+        with np.load(self.path) as data:
+            state = json.loads(str(data['__state__']))
+            arrays = {name: data[name] for name in data.files if name != '__state__'}
+        if state.get('fingerprint') != self.fingerprint:
+            raise ValueError(f"O checkpoint '{self.path}' foi gravado com outros parâmetros; "
+                             "remova-o ou use os mesmos params para retomar.")
+        return arrays, state
+
+    def clear(self):
+        """Remove o checkpoint e a pasta de quadros após uma execução concluída."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        if os.path.isdir(self.frames_dir):
+            for name in os.listdir(self.frames_dir):
+                os.remove(os.path.join(self.frames_dir, name))
+            os.rmdir(self.frames_dir)
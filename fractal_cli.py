@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: fractal_cli.py
+#
+#   Descrição:
+#   Executor de linha de comando (sem interface gráfica) para todos os
+#   geradores do projeto. Recebe o mesmo dicionário `params` usado por
+#   `run_fractal_generation`, seja por flags (--chave valor) ou por um
+#   arquivo JSON/TOML (--config), e grava PNG/MP4/WebM/OBJ/PLY sem precisar
+#   de Tk nem de servidor X (nós da render farm).
+#
+#   Uso:
+#   python fractal_cli.py imagem  --mask_path mao.png --saida mao.png
+#   python fractal_cli.py video   --mask_path mao.png --saida mao.mp4
+#   python fractal_cli.py webm    --mask_path mao.png --saida mao.webm
+#   python fractal_cli.py colonia --config colonia.toml --saida colonia.webm
+#   python fractal_cli.py 3d      --input_file versao3d/cubo_bom.obj --saida arvore.obj
+#
+#   Precedência dos parâmetros: padrões da GUI < arquivo --config < flags.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import math
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+VERSAO3D_DIR = os.path.join(BASE_DIR, 'versao3d')
+
+# =============================================================================
+# PARÂMETROS PADRÃO (os mesmos valores iniciais das GUIs)
+# =============================================================================
+MASK_DEFAULTS = {
+    'mask_path': None,
+    'num_attractors': 1500,
+    'kill_distance': 10,
+    'step_size': 5,
+    'stagnation_limit': 10,
+    'bg_color': '#0a0a14',
+    'tree_color': '#ffffd0',
+    'line_width': 1,
+    'width': 800,
+    'height': 1000,
+}
+
+VIDEO_DEFAULTS = dict(MASK_DEFAULTS, frame_interval=5, height=1008)
+
+# Valores já convertidos como a GUI da colônia faz em start_generation()
+COLONY_DEFAULTS = {
+    'max_nodes': 2000,
+    'attractors_per_ring_base': 100,
+    'attractor_density_variation': 0.2,
+    'initial_radius': 50,
+    'radius_step_base': 30,
+    'ring_irregularity': 0.1,
+    'expansion_variation': 0.3,
+    'perlin_scale': 100,
+    'perlin_strength': 0.8,
+    'num_growth_lobes': 2,
+    'lobe_attractor_multiplier': 2.0,
+    'lobe_spread_angle': 30 * math.pi / 180,
+    'lobe_movement_factor': 5,
+    'kill_distance': 10,
+    'step_size': 5,
+    'frame_interval': 20,
+    'bg_color': '#0a0a14',
+    'branch_color': '#ffffd0',
+    'width': 800,
+    'height': 800,
+    'line_thickness': 1,
+    'transparent_bg': True,
+}
+
+# Mesmos padrões do argparse de versao3d/Fractal3d.py
+DEFAULTS_3D = {
+    'input_file': None,
+    'num_attractors': 5000,
+    'step_size': 0.5,
+    'kill_distance': 2.0,
+    'stagnation_limit': 15,
+}
+
+# Parâmetros numéricos que são contagens, tamanhos em pixels ou limites de
+# iterações; os demais números dos padrões viram flags float
+INTEGER_PARAMS = {'num_attractors', 'stagnation_limit', 'width', 'height', 'line_width', 'frame_interval',
+                  'max_nodes', 'attractors_per_ring_base', 'num_growth_lobes', 'line_thickness'}
+
+# gerador -> (módulo, parâmetros padrão, extensão padrão da saída, parâmetros obrigatórios)
+GENERATORS = {
+    'imagem': ('fractal_space_colonization_imagem_gui', MASK_DEFAULTS, '.png', ['mask_path']),
+    'video': ('fractal_space_colonization_video_gui', VIDEO_DEFAULTS, '.mp4', ['mask_path']),
+    'webm': ('fractal_space_colonization_video_webM_RA_gui', VIDEO_DEFAULTS, '.webm', ['mask_path']),
+    'colonia': ('fractal_crescimento_colonia_filme', COLONY_DEFAULTS, '.webm', []),
+    '3d': ('Fractal3d', DEFAULTS_3D, '.obj', ['input_file']),
+}
+
+
+class ConsoleQueue:
+    """Substitui a `queue.Queue` da GUI: imprime o status e guarda a imagem final."""
+
+    def __init__(self, quiet=False):
+        self.quiet = quiet
+        self.image = None
+        self.error = None
+        self.stats = {}
+
+    def put(self, message, block=True, timeout=None):
+        if 'error' in message:
+            self.error = message['error']
+        if 'image' in message:
+            self.image = message['image']
+        if 'stats' in message:
+            self.stats = message['stats']
+        if 'status' in message and not self.quiet:
+            progress = message.get('progress')
+            prefix = f"[{progress:5.1f}%] " if progress is not None else ""
+            print(f"{prefix}{message['status']}", flush=True)
+
+
+def load_config_file(path):
+    """Lê um arquivo JSON ou TOML com o dicionário de parâmetros."""
+    with open(path, 'rb') as f:
+        if path.lower().endswith('.toml'):
+            try:
+                import tomllib
+            except ImportError:  # Python < 3.11
+                import tomli as tomllib
+            return tomllib.load(f)
+        return json.loads(f.read().decode('utf-8'))
+
+
+def parse_bool(text):
+    if isinstance(text, bool):
+        return text
+    if text.lower() in ('1', 'true', 'sim', 's', 'yes', 'y', 'on'):
+        return True
+    if text.lower() in ('0', 'false', 'nao', 'não', 'n', 'no', 'off'):
+        return False
+    raise argparse.ArgumentTypeError(f"valor booleano inválido: '{text}'")
+
+
+def _flag_type(key, default):
+    if isinstance(default, bool):
+        return parse_bool
+    if key in INTEGER_PARAMS:
+        return int
+    # Distâncias, raios e escalas aceitam frações mesmo com padrão inteiro
+    if isinstance(default, (int, float)):
+        return float
+    return str
+
+
+def import_generator(name):
+    """Importa o módulo do gerador (o 3D vive em versao3d/)."""
+    module_name = GENERATORS[name][0]
+    if name == '3d' and VERSAO3D_DIR not in sys.path:
+        sys.path.insert(0, VERSAO3D_DIR)
+    return importlib.import_module(module_name)
+
+
+def build_params(name, config=None, overrides=None):
+    """Monta o dicionário `params` final: padrões < config < flags."""
+    params = dict(GENERATORS[name][1])
+    params.update(config or {})
+    params.update(overrides or {})
+    return params
+
+
+def _run_3d(module, params, output_queue):
+    """Gera a árvore 3D e grava os arquivos pedidos; retorna None se a geração falhar."""
+    final_tree = module.run_fractal_generation_3d(params, output_queue)
+    if not final_tree:
+        return None
+    if params.get('lod_budgets'):
+        module.export_lods(final_tree, params, params['output_path'])
+    elif params.get('tube_segments'):
+        module.export_tubes(final_tree, params, params['output_path'])
+    else:
+        module.export_tree(final_tree, params['output_path'])
+    if params.get('turntable_path'):
+        module.render_turntable(final_tree, params, params['turntable_path'])
+    return final_tree
+
+
+def run_generator(name, params, quiet=False):
+    """
+    Executa um gerador de forma síncrona, sem Tk.
+    Retorna um dicionário com o caminho de saída, o tempo total e as estatísticas
+    do gerador (semente, nós, iterações...); lança RuntimeError se o gerador
+    reportar erro.
+    """
+    missing = [key for key in GENERATORS[name][3] if not params.get(key)]
+    if missing:
+        raise ValueError(f"Parâmetro(s) obrigatório(s) ausente(s): {', '.join(missing)}")
+    if not params.get('output_path'):
+        raise ValueError("Parâmetro obrigatório ausente: output_path (--saida)")
+
+    module = import_generator(name)
+    start_time = time.time()
+    output_queue = ConsoleQueue(quiet=quiet)
+
+    if name == '3d':
+        # O gerador 3D imprime o progresso direto no stdout; com `quiet` (lotes)
+        # essas linhas são capturadas e só aparecem na mensagem de erro
+        captured = io.StringIO()
+        silence = contextlib.redirect_stdout(captured) if quiet else contextlib.nullcontext()
+        with silence:
+            final_tree = _run_3d(module, params, output_queue)
+        if not final_tree:
+            details = captured.getvalue().strip().splitlines()[-5:]
+            raise RuntimeError("A geração 3D falhou"
+                               + (": " + " | ".join(details) if details else " (veja as mensagens acima)."))
+    else:
+        module.run_fractal_generation(params, output_queue)
+        if output_queue.error is not None:
+            raise RuntimeError(output_queue.error)
+        if name == 'imagem':
+            if output_queue.image is None:
+                raise RuntimeError("O gerador não produziu nenhuma imagem.")
+            output_queue.image.save(params['output_path'])
+
+    return {'output_path': params['output_path'], 'elapsed': time.time() - start_time,
+            'stats': output_queue.stats}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Executa os geradores de fractal sem interface gráfica (headless).")
+    subparsers = parser.add_subparsers(dest='generator', required=True, metavar='gerador')
+
+    for name, (module_name, defaults, extension, _) in GENERATORS.items():
+        sub = subparsers.add_parser(name, help=f"Gerador de '{module_name}.py' (saída {extension}).")
+        sub.add_argument("--config", help="Arquivo JSON ou TOML com o dicionário params.")
+        sub.add_argument("-o", "--saida", dest="output_path", default=argparse.SUPPRESS,
+                         help=f"Arquivo de saída ({extension}).")
+        sub.add_argument("-q", "--silencioso", action="store_true", help="Não imprime o progresso.")
+        sub.add_argument("--seed", type=int, default=argparse.SUPPRESS,
+                         help="Semente aleatória (padrão: sorteada e informada ao final).")
+        sub.add_argument("--checkpoint_path", default=argparse.SUPPRESS,
+                         help="Arquivo .npz onde o estado da simulação é salvo periodicamente.")
+        sub.add_argument("--checkpoint_interval", type=int, default=argparse.SUPPRESS,
+                         help="Iterações entre checkpoints (padrão: 50).")
+        sub.add_argument("--resume", action="store_true", default=argparse.SUPPRESS,
+                         help="Continua do último checkpoint em --checkpoint_path.")
+        sub.add_argument("--sem_cache", dest="use_cache", action="store_false", default=argparse.SUPPRESS,
+                         help="Não lê nem grava o cache de resultados.")
+        sub.add_argument("--cache_dir", default=argparse.SUPPRESS,
+                         help="Pasta do cache (padrão: $FRACTAL_CACHE_DIR ou ~/.cache/existencia_hibrida).")
+        sub.add_argument("--cache_max_mb", type=float, default=argparse.SUPPRESS,
+                         help="Tamanho máximo do cache em MB (padrão: 2048).")
+        sub.add_argument("--profile_path", default=argparse.SUPPRESS,
+                         help="Grava o perfil de tempo por fase em JSON ou CSV (pela extensão).")
+        sub.add_argument("--convergence_window", type=int, default=argparse.SUPPRESS,
+                         help="Para após N iterações sem nós novos ou sem mudança nos atratores.")
+        sub.add_argument("--max_iterations", type=int, default=argparse.SUPPRESS,
+                         help="Número máximo de iterações do crescimento.")
+        sub.add_argument("--time_budget", type=float, default=argparse.SUPPRESS,
+                         help="Tempo máximo do crescimento em segundos (termina com o resultado até então).")
+        if name != 'colonia':
+            sub.add_argument("--influence_radius", type=float, default=argparse.SUPPRESS,
+                             help="Raio de influência dos atratores (padrão: sem limite).")
+            sub.add_argument("--max_substeps", type=int, default=argparse.SUPPRESS,
+                             help="Máximo de passos de uma ponta isolada numa iteração (padrão: 1).")
+            sub.add_argument("--sample_fraction", type=float, default=argparse.SUPPRESS,
+                             help="Modo aproximado: fração dos atratores associada por iteração (padrão: todos).")
+            sub.add_argument("--dtype", choices=('float64', 'float32'), default=argparse.SUPPRESS,
+                             help="Precisão de nós, atratores e distâncias (padrão: float64).")
+            sub.add_argument("--partitions", type=int, default=argparse.SUPPRESS,
+                             help="Reparte o crescimento em N processos por fatias do espaço "
+                                  "(0 = um por núcleo; exige --influence_radius).")
+        if name == '3d':
+            sub.add_argument("--volume_sampling", choices=('voxels', 'stream'), default=argparse.SUPPRESS,
+                             help="Sorteio dos atratores: centros de voxels (padrão) ou lotes sem voxelização.")
+            sub.add_argument("--sampling_max_mb", type=float, default=argparse.SUPPRESS,
+                             help="Memória máxima (MB) de cada lote do sorteio 'stream' (padrão: 64).")
+            sub.add_argument("--containment", choices=('reject', 'project'), default=argparse.SUPPRESS,
+                             help="Mantém os galhos dentro da malha: descarta ou projeta de volta os nós que saem.")
+            sub.add_argument("--containment_resolution", type=int, default=argparse.SUPPRESS,
+                             help="Células da grade de distância no maior eixo da malha (padrão: 64).")
+            sub.add_argument("--tube_segments", type=int, default=argparse.SUPPRESS,
+                             help="Exporta uma malha de tubos (.obj/.stl) com N vértices por anel.")
+            sub.add_argument("--tube_radius", type=float, default=argparse.SUPPRESS,
+                             help="Raio do tronco dos tubos (padrão: step_size).")
+            sub.add_argument("--tube_min_radius", type=float, default=argparse.SUPPRESS,
+                             help="Raio mínimo dos galhos (padrão: 10%% do raio do tronco).")
+            sub.add_argument("--radius_exponent", type=float, default=argparse.SUPPRESS,
+                             help="Expoente do modelo de Leonardo: raio ∝ folhas^(1/expoente) (padrão: 2).")
+            sub.add_argument("--lod_budgets", type=int, nargs='+', default=argparse.SUPPRESS,
+                             help="Orçamentos de triângulos dos níveis de detalhe (um arquivo por nível + manifesto).")
+            sub.add_argument("--turntable_path", default=argparse.SUPPRESS,
+                             help="Renderiza também um vídeo turntable (.mp4, ou .webm com transparência).")
+            sub.add_argument("--turntable_mode", choices=('growth', 'rotation', 'both'), default=argparse.SUPPRESS,
+                             help="Turntable: crescimento, rotação da árvore pronta ou os dois (padrão: both).")
+            sub.add_argument("--turntable_frames", type=int, default=argparse.SUPPRESS,
+                             help="Número de quadros do turntable (padrão: 120).")
+            sub.add_argument("--turntable_turns", type=float, default=argparse.SUPPRESS,
+                             help="Voltas da câmera no turntable (padrão: 1).")
+        if name in ('imagem', 'video', 'webm'):
+            sub.add_argument("--coarse_factor", type=int, default=argparse.SUPPRESS,
+                             help="Simula antes um esqueleto em 1/N da resolução (padrão: 1, desligado).")
+        # Uma flag por chave de params; só as flags informadas sobrescrevem o config
+        for key, default in defaults.items():
+            sub.add_argument(f"--{key}", type=_flag_type(key, default), default=argparse.SUPPRESS,
+                             help=f"(padrão: {default})")
+    return parser
+
+
+def main(argv=None):
+    args = vars(build_parser().parse_args(argv))
+    name = args.pop('generator')
+    config_path = args.pop('config')
+    quiet = args.pop('silencioso')
+
+    config = load_config_file(config_path) if config_path else {}
+    params = build_params(name, config, args)
+
+    try:
+        result = run_generator(name, params, quiet=quiet)
+    except (ValueError, RuntimeError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+
+    seed = result['stats'].get('seed')
+    seed_text = f", semente {seed}" if seed is not None else ""
+    print(f"Saída gravada em '{result['output_path']}' ({result['elapsed']:.2f} segundos{seed_text}).")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,10 +4,15 @@
 #   Arquivo: expanding_colony_generator.py (v9, correção do limite de nós)
 #
 # =============================================================================
-import tkinter as tk
-from tkinter import ttk, filedialog, colorchooser, messagebox
 import numpy as np
-from PIL import Image, ImageDraw, ImageTk
+from PIL import Image, ImageDraw
+try:
+    import tkinter as tk
+    from tkinter import ttk, filedialog, colorchooser
+    from PIL import ImageTk
+except ImportError:
+    # Nós de renderização sem Tk: o núcleo continua disponível via fractal_cli.py
+    tk = ttk = filedialog = colorchooser = ImageTk = None
 import random
 import time
 import threading
@@ -17,20 +22,131 @@ import os
 import tempfile
 import shutil
 import math
+import fractal_checkpoint
+import fractal_growth
+import fractal_noise
+import fractal_profile
+import fractal_render
 
-try:
-    import noise # pip install noise
-except ImportError:
-    messagebox.showerror("Erro de Dependência", "A biblioteca 'noise' não está instalada.\nPor favor, execute: pip install noise")
-    exit()
+# Parâmetros que determinam a simulação e os quadros já renderizados (impressão
+# digital do checkpoint: só se retoma uma execução com os mesmos valores)
+COLONY_KEYS = ('max_nodes', 'attractors_per_ring_base', 'attractor_density_variation', 'initial_radius',
+               'radius_step_base', 'ring_irregularity', 'expansion_variation', 'perlin_scale',
+               'perlin_strength', 'num_growth_lobes', 'lobe_attractor_multiplier', 'lobe_spread_angle',
+               'lobe_movement_factor', 'kill_distance', 'step_size', 'frame_interval', 'bg_color',
+               'branch_color', 'width', 'height', 'line_thickness', 'transparent_bg',
+               'convergence_window', 'max_iterations')
+
+# Sem nenhum limite a colônia podia girar para sempre abaixo de max_nodes (anéis
+# que ninguém alcança); por padrão ela para após tantas iterações sem progresso.
+CONVERGENCE_WINDOW = 200
+
+
+class ColonyFrontier:
+    """
+    Nós da colônia em arrays, com a "fronteira ativa": os nós a menos de `band`
+    do raio atual de expansão. Os atratores sempre nascem num anel externo,
+    então os nós internos deixam de ser candidatos e as buscas de vizinho mais
+    próximo olham só a fronteira, com custo que não cresce com a colônia.
+
+    As respostas continuam exatas: um nó aposentado está a menos de `cut` do
+    centro, portanto a mais de (raio do atrator - cut) de qualquer atrator.
+    Quando essa garantia não basta para algum atrator, ele é buscado entre
+    todos os nós.
+    """
+
+    def __init__(self, positions, parents, center, band):
+        self.center = np.asarray(center, dtype=float)
+        self.band = float(band)
+        self.cut = -np.inf
+        self._positions = np.empty((1024, 2))
+        self._parents = np.empty(1024, dtype=np.int64)
+        self._radii = np.empty(1024)
+        self.node_count = 0
+        self.frontier = np.empty(0, dtype=np.intp)
+        self.append(positions, parents)
+
+    def append(self, positions, parents):
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        count = len(positions)
+        needed = self.node_count + count
+        if needed > len(self._positions):
+            capacity = max(needed, 2 * len(self._positions))
+            self._positions = np.resize(self._positions, (capacity, 2))
+            self._parents = np.resize(self._parents, capacity)
+            self._radii = np.resize(self._radii, capacity)
+        radii = np.sqrt(((positions - self.center) ** 2).sum(axis=1))
+        self._positions[self.node_count:needed] = positions
+        self._parents[self.node_count:needed] = parents
+        self._radii[self.node_count:needed] = radii
+        new_indices = np.arange(self.node_count, needed)
+        self.frontier = np.concatenate([self.frontier, new_indices[radii >= self.cut]])
+        self.node_count = needed
+
+    @property
+    def positions(self):
+        return self._positions[:self.node_count]
+
+    @property
+    def parents(self):
+        return self._parents[:self.node_count]
+
+    def tree(self):
+        return {'positions': self.positions.copy(), 'parents': self.parents.copy()}
+
+    def expand_to(self, current_radius):
+        """Aposenta os nós que ficaram a mais de `band` para dentro do raio atual."""
+        cut = current_radius - self.band
+        if cut > self.cut:
+            self.cut = cut
+            self.frontier = self.frontier[self._radii[self.frontier] >= cut]
+
+    def _slack(self, points):
+        """Distância mínima de cada ponto a qualquer nó aposentado (limite inferior)."""
+        return np.sqrt(((points - self.center) ** 2).sum(axis=1)) - self.cut
+
+    def nearest(self, points):
+        """Índice do nó mais próximo de cada ponto (em empate, o menor índice)."""
+        if len(points) == 0:
+            return np.empty(0, dtype=np.intp)
+        positions = self.positions
+        if len(self.frontier) == 0:
+            return fractal_growth.nearest_nodes(points, positions)[0]
+        local, dist2 = fractal_growth.nearest_nodes(points, positions[self.frontier])
+        closest = self.frontier[local]
+        unsure = np.flatnonzero(~(np.sqrt(dist2) < self._slack(points)))
+        if len(unsure):
+            closest[unsure] = fractal_growth.nearest_nodes(points[unsure], positions)[0]
+        return closest
+
+    def any_within(self, points, radius):
+        """Máscara dos pontos com algum nó a uma distância <= `radius`."""
+        positions = self.positions
+        hit = fractal_growth.any_within(points, positions[self.frontier], radius, inclusive=True)
+        unsure = np.flatnonzero(~hit & ~(self._slack(points) > radius))
+        if len(unsure):
+            hit[unsure] = fractal_growth.any_within(points[unsure], positions, radius, inclusive=True)
+        return hit
 
 
 # =============================================================================
 # NÚCLEO DO ALGORITMO DE GERAÇÃO
 # =============================================================================
-def run_fractal_generation(params, output_queue):
-    frame_folder = tempfile.mkdtemp()
+def run_fractal_generation(params, output_queue, profiler=None):
+    """
+    Simula a colônia e monta o vídeo; retorna a árvore final {'positions', 'parents'}
+    (ou None em caso de erro). As fases são medidas em `profiler` (um novo
+    fractal_profile.PhaseProfiler se não for informado). A simulação também
+    termina antes de max_nodes se convergir ou esgotar params['max_iterations']
+    ou params['time_budget'] (fractal_growth.GrowthGuard); o vídeo é montado
+    com o que cresceu até então.
+    """
+    guard = fractal_growth.GrowthGuard.from_params(params, CONVERGENCE_WINDOW)
+    frame_folder = None
+    checkpointer = None
     frame_files = []
+    if profiler is None:
+        profiler = fractal_profile.PhaseProfiler.from_params(params)
     
     try:
         width, height = params['width'], params['height']
@@ -54,115 +170,183 @@ def run_fractal_generation(params, output_queue):
         lobe_movement_factor = params['lobe_movement_factor']
         line_thickness = params['line_thickness']
         transparent_bg = params['transparent_bg']
+        # Largura da faixa de nós ativos para dentro do raio atual (só afeta a velocidade)
+        frontier_band = params.get('frontier_band') or 3 * radius_step_base
 
-        root = {'pos': center.copy(), 'parent': None}
-        nodes = [root]
-        attractors = []
-        current_radius = initial_radius
-        
-        perlin_seed = random.randint(0, 10000)
-        lobe_directions = [random.uniform(0, 2 * math.pi) for _ in range(num_growth_lobes)]
+        # Com checkpoint, os quadros ficam numa pasta persistente ao lado dele:
+        # uma queda (ou a janela fechada) não apaga o que já foi renderizado.
+        checkpointer = fractal_checkpoint.Checkpointer.from_params(params, 'colony', COLONY_KEYS)
+        if checkpointer is not None:
+            frame_folder = checkpointer.frames_dir
+            os.makedirs(frame_folder, exist_ok=True)
+        else:
+            frame_folder = tempfile.mkdtemp()
 
-        output_queue.put({'status': 'Iniciando simulação...'})
+        resumed = checkpointer.load() if checkpointer is not None and params.get('resume') else None
+        if resumed is not None:
+            arrays, state = resumed
+            seed = state['seed']
+            rng = random.Random()
+            rng.setstate(fractal_checkpoint.rng_state_from_json(state['rng_state']))
+            colony = ColonyFrontier(arrays['positions'], arrays['parents'], center, frontier_band)
+            attractors = arrays['attractors']
+            current_radius = state['current_radius']
+            perlin_seed = state['perlin_seed']
+            lobe_directions = state['lobe_directions']
+            frame_count = state['frame_count']
+            iterations = state['iteration']
+            if state.get('guard') is not None:
+                # Convergência e orçamento continuam de onde pararam
+                guard.restore(state['guard'])
+            frame_files = [os.path.join(frame_folder, f"frame_{i:05d}.png") for i in range(1, frame_count + 1)]
+            output_queue.put({'status': f'Retomando do checkpoint na iteração {iterations} ({colony.node_count} nós, {frame_count} frames)...'})
+        else:
+            # Semente explícita: a mesma semente com os mesmos params reproduz a mesma colônia
+            seed = params.get('seed')
+            if seed is None:
+                seed = random.randrange(2**32)
+            rng = random.Random(seed)
+
+            colony = ColonyFrontier(center[None, :], [-1], center, frontier_band)
+            attractors = np.empty((0, 2))
+            current_radius = initial_radius
+            
+            perlin_seed = rng.randint(0, 10000)
+            lobe_directions = [rng.uniform(0, 2 * math.pi) for _ in range(num_growth_lobes)]
 
-        frame_count = 0
-        while len(nodes) < max_nodes:
-            if len(attractors) < attractors_per_ring_base * 0.1:
-                actual_radius_step = radius_step_base * random.uniform(1 - expansion_variation, 1 + expansion_variation)
-                actual_radius_step = max(1, actual_radius_step)
+            output_queue.put({'status': 'Iniciando simulação...'})
+
+            frame_count = 0
+            iterations = 0
+
+        colony.expand_to(current_radius)
+        # Os quadros são desenhados de forma incremental numa mesma tela: cada
+        # quadro só desenha os galhos criados desde o anterior.
+        canvas = fractal_render.new_canvas((width, height), None if transparent_bg else params['bg_color'])
+        canvas_draw = ImageDraw.Draw(canvas)
+        drawn = 0
+
+        while colony.node_count < max_nodes:
+            iterations += 1
+            fresh = 0
+            with profiler.phase('ring'):
+                if len(attractors) < attractors_per_ring_base * 0.1:
+                    actual_radius_step = radius_step_base * rng.uniform(1 - expansion_variation, 1 + expansion_variation)
+                    actual_radius_step = max(1, actual_radius_step)
                 
-                output_queue.put({'status': f'Expandindo para o raio {current_radius:.0f} (passo {actual_radius_step:.1f})...'})
+                    output_queue.put({'status': f'Expandindo para o raio {current_radius:.0f} (passo {actual_radius_step:.1f})...'})
 
-                num_attractors_this_ring_base = int(attractors_per_ring_base * random.uniform(1 - attractor_density_variation, 1 + attractor_density_variation))
-                num_attractors_this_ring_base = max(1, num_attractors_this_ring_base)
+                    num_attractors_this_ring_base = int(attractors_per_ring_base * rng.uniform(1 - attractor_density_variation, 1 + attractor_density_variation))
+                    num_attractors_this_ring_base = max(1, num_attractors_this_ring_base)
 
-                angles = []
-                for _ in range(num_attractors_this_ring_base):
-                    base_angle = random.uniform(0, 2 * math.pi)
-                    cluster_factor = 0.5 * attractor_density_variation
-                    deviated_angle = base_angle + random.uniform(-cluster_factor, cluster_factor)
-                    angles.append(deviated_angle)
+                    angles = []
+                    for _ in range(num_attractors_this_ring_base):
+                        base_angle = rng.uniform(0, 2 * math.pi)
+                        cluster_factor = 0.5 * attractor_density_variation
+                        deviated_angle = base_angle + rng.uniform(-cluster_factor, cluster_factor)
+                        angles.append(deviated_angle)
 
-                for i in range(num_growth_lobes):
-                    if lobe_movement_factor > 0:
-                        lobe_directions[i] += random.uniform(-lobe_movement_factor, lobe_movement_factor) * math.pi / 180
-                        lobe_directions[i] %= (2 * math.pi)
+                    for i in range(num_growth_lobes):
+                        if lobe_movement_factor > 0:
+                            lobe_directions[i] += rng.uniform(-lobe_movement_factor, lobe_movement_factor) * math.pi / 180
+                            lobe_directions[i] %= (2 * math.pi)
 
-                    num_extra_attractors = int(attractors_per_ring_base * (lobe_attractor_multiplier - 1))
+                        num_extra_attractors = int(attractors_per_ring_base * (lobe_attractor_multiplier - 1))
                     
-                    for _ in range(num_extra_attractors):
-                        lobe_angle = lobe_directions[i] + random.uniform(-lobe_spread_angle / 2, lobe_spread_angle / 2)
-                        angles.append(lobe_angle)
+                        for _ in range(num_extra_attractors):
+                            lobe_angle = lobe_directions[i] + rng.uniform(-lobe_spread_angle / 2, lobe_spread_angle / 2)
+                            angles.append(lobe_angle)
 
-                for angle in angles:
-                    x_perlin = current_radius * math.cos(angle) / perlin_scale
-                    y_perlin = current_radius * math.sin(angle) / perlin_scale
-                    
-                    perlin_value = noise.pnoise3(x_perlin, y_perlin, current_radius / perlin_scale, 
-                                                octaves=4, persistence=0.5, lacunarity=2.0, repeatx=1024, repeaty=1024, base=perlin_seed)
-                    
-                    perlin_offset = (perlin_value + 1.0) / 2.0 * perlin_strength * radius_step_base
-                    random_ring_offset = random.uniform(-radius_step_base * ring_irregularity, radius_step_base * ring_irregularity)
-                    
-                    individual_radius = current_radius + perlin_offset + random_ring_offset
-                    individual_radius = max(1.0, individual_radius)
+                    # Ruído de Perlin de todos os ângulos do anel numa só chamada (fractal_noise.py)
+                    angles = np.array(angles)
+                    directions = np.column_stack([np.cos(angles), np.sin(angles)])
+                    perlin_values = fractal_noise.pnoise3(current_radius * directions[:, 0] / perlin_scale,
+                                                          current_radius * directions[:, 1] / perlin_scale,
+                                                          current_radius / perlin_scale,
+                                                          octaves=4, persistence=0.5, lacunarity=2.0, repeatx=1024, repeaty=1024, base=perlin_seed)
 
-                    pos = center + np.array([math.cos(angle), math.sin(angle)]) * individual_radius
-                    attractors.append(pos)
-                
-                current_radius += actual_radius_step
-
-            growth_vectors = {i: [] for i in range(len(nodes))}
-            for attractor in attractors:
-                closest_node_index = -1; min_dist = float('inf')
-                for i, node in enumerate(nodes):
-                    d = np.linalg.norm(attractor - node['pos'])
-                    if d < min_dist: min_dist = d; closest_node_index = i
-                direction = attractor - nodes[closest_node_index]['pos']
-                norm = np.linalg.norm(direction)
-                if norm > 0: growth_vectors[closest_node_index].append(direction / norm)
-            
-            new_nodes = []
-            for node_index, vectors in growth_vectors.items():
-                # =================== MUDANÇA (CORREÇÃO DO LIMITE DE NÓS) ===================
-                # Se a adição de mais nós for ultrapassar o limite, paramos de crescer nesta rodada.
-                if len(nodes) + len(new_nodes) >= max_nodes:
-                    break
-                # =========================================================================
-                if vectors:
-                    avg_direction = np.mean(vectors, axis=0); norm = np.linalg.norm(avg_direction)
-                    if norm > 0:
-                        avg_direction /= norm; parent_node = nodes[node_index]
-                        new_pos = parent_node['pos'] + avg_direction * step_size
-                        new_node = {'pos': new_pos, 'parent': parent_node}; new_nodes.append(new_node)
-            nodes.extend(new_nodes)
-            
-            surviving_attractors = []
-            for attractor in attractors:
-                closest_dist = min([np.linalg.norm(attractor - node['pos']) for node in nodes])
-                if closest_dist > kill_distance: surviving_attractors.append(attractor)
-            attractors = surviving_attractors
-
-            progress = 100 * len(nodes) / max_nodes
-            if len(nodes) // params['frame_interval'] > frame_count or len(nodes) >= max_nodes:
+                    perlin_offsets = (perlin_values.astype(float) + 1.0) / 2.0 * perlin_strength * radius_step_base
+                    random_ring_offsets = np.array([rng.uniform(-radius_step_base * ring_irregularity, radius_step_base * ring_irregularity)
+                                                    for _ in range(len(angles))])
+
+                    individual_radii = np.maximum(1.0, current_radius + perlin_offsets + random_ring_offsets)
+                    attractors = np.concatenate([attractors, center + directions * individual_radii[:, None]])
+                    fresh = len(angles)
+
+                    current_radius += actual_radius_step
+                    colony.expand_to(current_radius)
+
+            # a. Associação: nó mais próximo de cada atrator, buscado na fronteira ativa
+            with profiler.phase('associate'):
+                positions = colony.positions
+                closest = colony.nearest(attractors)
+                direction = attractors - positions[closest]
+                norm = np.sqrt((direction ** 2).sum(axis=1))
+                valid = norm > 0
+                unit = direction[valid] / norm[valid, None]
+                owners = closest[valid]
+
+            # b. Crescimento: um nó novo por nó atraído, em ordem de índice, até max_nodes
+            with profiler.phase('grow'):
+                sums, counts = fractal_growth.accumulate_directions(owners, unit, colony.node_count)
+                growing = np.flatnonzero(counts)
+                avg_direction = sums[growing] / counts[growing, None]
+                avg_norm = np.sqrt((avg_direction ** 2).sum(axis=1))
+                ok = avg_norm > 0
+                growing = growing[ok][:max_nodes - colony.node_count]
+                avg_direction = avg_direction[ok][:len(growing)] / avg_norm[ok][:len(growing), None]
+                new_positions = positions[growing] + avg_direction * step_size
+                colony.append(new_positions, growing)
+
+            # c. Poda por proximidade: os atratores antigos já foram testados contra
+            # os nós antigos, então basta testá-los contra os nós novos; os do anel
+            # recém-criado são testados contra a colônia (pela fronteira).
+            with profiler.phase('prune'):
+                tested = len(attractors) - fresh
+                killed = np.empty(len(attractors), dtype=bool)
+                killed[:tested] = fractal_growth.any_within(attractors[:tested], new_positions, kill_distance, inclusive=True)
+                killed[tested:] = colony.any_within(attractors[tested:], kill_distance)
+                profiler.count('removed_by_proximity', int(killed.sum()))
+                attractors = attractors[~killed]
+
+            profiler.count('new_nodes', len(growing))
+            node_count = colony.node_count
+            stop = guard.update(iterations, node_count, (len(attractors), current_radius))
+            progress = 100 * node_count / max_nodes
+            # O último quadro sempre é gravado, também quando a simulação para antes
+            if node_count // params['frame_interval'] > frame_count or node_count >= max_nodes or stop:
                 frame_count += 1
-                status_text = f"Nós: {len(nodes)}/{max_nodes} | Atratores: {len(attractors)}"
+                status_text = f"Nós: {node_count}/{max_nodes} | Atratores: {len(attractors)}"
                 output_queue.put({'status': status_text, 'progress': progress})
 
-                if transparent_bg:
-                    frame_image = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-                else:
-                    frame_image = Image.new('RGB', (width, height), params['bg_color'])
-                draw = ImageDraw.Draw(frame_image)
-                
-                for node in nodes:
-                    if node['parent']: p1 = node['parent']['pos']; p2 = node['pos']; draw.line((p1[0], p1[1], p2[0], p2[1]), fill=params['branch_color'], width=line_thickness)
-                
+                with profiler.phase('render'):
+                    fractal_render.draw_segments(canvas_draw, {'positions': colony.positions, 'parents': colony.parents},
+                                                 params['branch_color'], line_thickness, drawn, node_count)
+                    drawn = node_count
+                    frame_image = canvas.copy()
+
                 frame_path = os.path.join(frame_folder, f"frame_{frame_count:05d}.png")
-                frame_image.save(frame_path)
+                with profiler.phase('disk_write'):
+                    frame_image.save(frame_path)
                 frame_files.append(frame_path)
                 output_queue.put({'preview_frame': frame_image})
 
+            profiler.end_step('iteration', iterations, nodes=colony.node_count, attractors=len(attractors))
+            if iterations % fractal_profile.REPORT_INTERVAL == 0:
+                profiler.report(output_queue)
+
+            if checkpointer is not None and checkpointer.due(iterations):
+                checkpointer.save(
+                    {'positions': colony.positions, 'parents': colony.parents, 'attractors': attractors},
+                    {'seed': seed, 'iteration': iterations, 'frame_count': frame_count,
+                     'current_radius': current_radius, 'perlin_seed': perlin_seed,
+                     'lobe_directions': lobe_directions, 'guard': guard.state(),
+                     'rng_state': fractal_checkpoint.rng_state_to_json(rng.getstate())})
+
+            if stop:
+                output_queue.put({'status': f'Simulação encerrada na iteração {iterations}: {guard.describe()} ({node_count} nós).'})
+                break
+
         output_queue.put({'status': f'Simulação concluída. Montando vídeo com {len(frame_files)} frames...'})
         
         # Lógica de criação do vídeo ...
@@ -179,16 +363,29 @@ def run_fractal_generation(params, output_queue):
             writer_params = {'codec': 'libx264', 'quality': 8, 'fps': 30}
             
         with imageio.get_writer(params['output_path'], format=output_format, **writer_params) as writer:
-            for filename in frame_files: writer.append_data(imageio.imread(filename))
+            for index, filename in enumerate(frame_files):
+                with profiler.phase('encode'):
+                    writer.append_data(imageio.imread(filename))
+                profiler.end_step('frame', index)
         
-        output_queue.put({'status': f'Concluído! Vídeo salvo em:\n{params["output_path"]}', 'progress': 100})
+        stats = {'seed': seed, 'nodes': colony.node_count, 'iterations': iterations, 'frames': len(frame_files)}
+        if guard.reason is not None:
+            stats['stop_reason'] = guard.reason
+        stats['profile'] = profiler.finish(params, output_queue)
+        if checkpointer is not None:
+            checkpointer.clear()
+        output_queue.put({'status': f'Concluído! Vídeo salvo em:\n{params["output_path"]}', 'progress': 100, 'stats': stats})
+        return colony.tree()
 
     except Exception as e:
-        output_queue.put({'status': f'Erro: {e}', 'progress': 100})
+        output_queue.put({'status': f'Erro: {e}', 'progress': 100, 'error': str(e)})
         import traceback
         traceback.print_exc()
     finally:
-        shutil.rmtree(frame_folder)
+        # Sem checkpoint os quadros são temporários; com checkpoint eles só são
+        # apagados por checkpointer.clear() depois que o vídeo fica pronto.
+        if frame_folder is not None and checkpointer is None:
+            shutil.rmtree(frame_folder)
 
 
 # =============================================================================
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: fractal_glb.py
+#
+#   Descrição:
+#   Exportação compacta em GLB (glTF 2.0 binário) para a RA na web: posições
+#   quantizadas em int16 relativas à caixa envolvente (extensão
+#   KHR_mesh_quantization, desquantizadas pela escala e translação do nó) e
+#   primitivas indexadas (linhas para o esqueleto, triângulos para os tubos).
+#   Os arrays são gravados direto no arquivo, bloco a bloco, sem montar um
+#   buffer intermediário com tudo.
+#
+#   Com `births`, cada vértice leva a iteração em que nasceu no atributo
+#   próprio _BIRTH (float32) e o maior valor vai em mesh.extras.birth_max: um
+#   shader de RA pode animar o crescimento no aparelho, mostrando só os
+#   vértices com _BIRTH <= t * birth_max.
+#
+#   compare_with_obj lê o GLB e o OBJ equivalente com leitores mínimos e
+#   informa tamanho e tempo de leitura de cada um.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+GLB_MAGIC = 0x46546C67  # 'glTF'
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+# Modos de primitiva do glTF
+MODE_LINES = 1
+MODE_TRIANGLES = 4
+# Tipos de componente do glTF
+COMPONENT_TYPES = {np.dtype('int16'): 5122, np.dtype('uint16'): 5123,
+                   np.dtype('uint32'): 5125, np.dtype('float32'): 5126}
+ACCESSOR_TYPES = {1: 'SCALAR', 2: 'VEC2', 3: 'VEC3', 4: 'VEC4'}
+# Maior valor int16 usado na quantização (simétrico em torno do centro da caixa)
+QUANT_MAX = 32767
+
+
+def quantize_positions(positions):
+    """
+    Posições (N, 3) em int16 relativas ao centro da caixa envolvente.
+    Retorna (quantizadas (N, 4) com uma coluna de preenchimento para o
+    alinhamento de 4 bytes, translação, escala) com posição ≈ q * escala + translação.
+    """
+    positions = np.asarray(positions, dtype=float)
+    low, high = positions.min(axis=0), positions.max(axis=0)
+    center = (low + high) / 2
+    scale = max(float((high - low).max()) / (2 * QUANT_MAX), 1e-12)
+    quantized = np.zeros((len(positions), 4), dtype=np.int16)
+    quantized[:, :3] = np.rint((positions - center) / scale)
+    return quantized, center, scale
+
+
+def _index_array(indices, vertex_count):
+    dtype = np.uint16 if vertex_count < 65535 else np.uint32
+    return np.ascontiguousarray(np.asarray(indices).ravel(), dtype=dtype)
+
+
+def write_glb(filename, positions, indices, mode, attributes=None, births=None):
+    """
+    Grava uma malha indexada num GLB. `indices` tem 2 (linhas) ou 3
+    (triângulos) colunas conforme `mode`. `attributes` ({'_NOME': array})
+    acrescenta atributos de vértice próprios (float32, uint16 ou int16);
+    `births` vira o atributo _BIRTH.
+    """
+    attributes = dict(attributes or {})
+    mesh_extras = {}
+    if births is not None and len(births):
+        attributes['_BIRTH'] = np.asarray(births, dtype=np.float32)
+        mesh_extras['birth_max'] = int(np.max(births))
+    quantized, center, scale = quantize_positions(positions)
+    index_array = _index_array(indices, len(positions))
+
+    # (array, dtype do componente, nº de componentes, byteStride, alvo da bufferView)
+    blocks = [(quantized, np.dtype(np.int16), 3, 8, 34962),
+              (index_array, index_array.dtype, 1, None, 34963)]
+    attribute_names = []
+    for name, values in attributes.items():
+        values = np.asarray(values)
+        if values.dtype not in COMPONENT_TYPES:
+            values = values.astype(np.float32)
+        components = 1 if values.ndim == 1 else values.shape[1]
+        blocks.append((np.ascontiguousarray(values), values.dtype, components, None, 34962))
+        attribute_names.append(name)
+
+    buffer_views, accessors, offset = [], [], 0
+    for index, (array, dtype, components, stride, target) in enumerate(blocks):
+        view = {'buffer': 0, 'byteOffset': offset, 'byteLength': array.nbytes, 'target': target}
+        if stride:
+            view['byteStride'] = stride
+        buffer_views.append(view)
+        accessor = {'bufferView': index, 'componentType': COMPONENT_TYPES[dtype],
+                    'count': len(array), 'type': ACCESSOR_TYPES[components]}
+        if index == 0:
+            # POSITION exige min/max (nos valores inteiros gravados)
+            accessor['min'] = quantized[:, :3].min(axis=0).tolist()
+            accessor['max'] = quantized[:, :3].max(axis=0).tolist()
+        accessors.append(accessor)
+        offset += array.nbytes
+        offset += -offset % 4
+
+    primitive = {'attributes': {'POSITION': 0}, 'indices': 1, 'mode': mode}
+    for index, name in enumerate(attribute_names, start=2):
+        primitive['attributes'][name] = index
+    gltf = {
+        'asset': {'version': '2.0', 'generator': 'Existência Híbrida - Space Colonization'},
+        'extensionsUsed': ['KHR_mesh_quantization'],
+        'extensionsRequired': ['KHR_mesh_quantization'],
+        'scene': 0,
+        'scenes': [{'nodes': [0]}],
+        'nodes': [{'mesh': 0, 'translation': center.tolist(), 'scale': [scale] * 3}],
+        'meshes': [dict({'primitives': [primitive]}, **({'extras': mesh_extras} if mesh_extras else {}))],
+        'buffers': [{'byteLength': offset}],
+        'bufferViews': buffer_views,
+        'accessors': accessors,
+    }
+    json_bytes = json.dumps(gltf, separators=(',', ':')).encode('utf-8')
+    json_bytes += b' ' * (-len(json_bytes) % 4)
+
+    with open(filename, 'wb') as f:
+        f.write(struct.pack('<III', GLB_MAGIC, 2, 12 + 8 + len(json_bytes) + 8 + offset))
+        f.write(struct.pack('<II', len(json_bytes), CHUNK_JSON))
+        f.write(json_bytes)
+        f.write(struct.pack('<II', offset, CHUNK_BIN))
+        for array, *_ in blocks:
+            f.write(memoryview(array).cast('B'))
+            f.write(b'\0' * (-array.nbytes % 4))
+
+
+def read_glb(filename):
+    """Lê um GLB gravado por write_glb: {'positions' (desquantizadas), 'indices', 'mode', atributos próprios}."""
+    with open(filename, 'rb') as f:
+        data = f.read()
+    json_length, = struct.unpack_from('<I', data, 12)
+    gltf = json.loads(data[20:20 + json_length])
+    binary = memoryview(data)[20 + json_length + 8:]
+
+    def accessor_array(index):
+        accessor = gltf['accessors'][index]
+        view = gltf['bufferViews'][accessor['bufferView']]
+        dtype = next(dt for dt, code in COMPONENT_TYPES.items() if code == accessor['componentType'])
+        components = {v: k for k, v in ACCESSOR_TYPES.items()}[accessor['type']]
+        stride = view.get('byteStride', dtype.itemsize * components) // dtype.itemsize
+        array = np.frombuffer(binary, dtype=dtype, count=accessor['count'] * stride, offset=view['byteOffset'])
+        array = array.reshape(accessor['count'], stride)[:, :components]
+        return array[:, 0] if components == 1 else array
+
+    node = gltf['nodes'][0]
+    primitive = gltf['meshes'][0]['primitives'][0]
+    result = {'mode': primitive['mode'], 'indices': accessor_array(primitive['indices'])}
+    for name, index in primitive['attributes'].items():
+        values = accessor_array(index)
+        if name == 'POSITION':
+            values = values * np.array(node['scale']) + np.array(node['translation'])
+            name = 'positions'
+        result[name] = values
+    return result
+
+
+def read_obj(filename):
+    """Leitor mínimo de OBJ (linhas 'v', 'l' e 'f'), para comparar com o GLB."""
+    with open(filename) as f:
+        lines = f.read().split('\n')
+    vertices = np.array([line[2:].split() for line in lines if line.startswith('v ')], dtype=float)
+    elements = [line[2:].split() for line in lines if line.startswith(('l ', 'f '))]
+    return {'positions': vertices, 'indices': np.array(elements, dtype=np.int64) - 1}
+
+
+def compare_with_obj(glb_path, obj_path):
+    """Imprime e retorna o tamanho e o tempo de leitura do GLB e do OBJ equivalente."""
+    report = {}
+    for name, path, reader in (('glb', glb_path, read_glb), ('obj', obj_path, read_obj)):
+        start = time.perf_counter()
+        reader(path)
+        report[name] = {'bytes': os.path.getsize(path), 'load_seconds': time.perf_counter() - start}
+    glb, obj = report['glb'], report['obj']
+    print(f"GLB: {glb['bytes'] / 1024:.1f} KB, leitura {glb['load_seconds'] * 1000:.1f} ms | "
+          f"OBJ: {obj['bytes'] / 1024:.1f} KB, leitura {obj['load_seconds'] * 1000:.1f} ms | "
+          f"{obj['bytes'] / max(glb['bytes'], 1):.1f}x menor, "
+          f"{obj['load_seconds'] / max(glb['load_seconds'], 1e-9):.1f}x mais rápido")
+    return report
@@ -0,0 +1,863 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: fractal_growth.py
+#
+#   Descrição:
+#   Núcleo compartilhado do "Space Colonization Algorithm" usado pelos
+#   geradores por máscara (imagem, vídeo MP4 e WebM) e pelo gerador 3D.
+#   É a mesma lógica que antes estava copiada em cada script (associação
+#   ao nó mais próximo, crescimento pela direção média, poda por
+#   estagnação e por proximidade), mas vetorizada com NumPy e sem depender
+#   da dimensão (2D ou 3D).
+#
+#   A árvore é representada por arrays: posições (N, d), índice do pai de
+#   cada nó (-1 na raiz) e a iteração de nascimento de cada nó. Com o
+#   nascimento é possível redesenhar qualquer quadro do crescimento a
+#   partir da árvore final (vídeos e cache).
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import itertools
+import random
+import time
+
+import numpy as np
+from PIL import Image
+
+import fractal_cache
+import fractal_checkpoint
+import fractal_kernels
+import fractal_profile
+
+# Versão do núcleo: entra na chave do cache, para que mudanças no algoritmo
+# não reaproveitem árvores antigas.
+ENGINE_VERSION = 1
+
+# Parâmetros que afetam a árvore gerada por máscara (e portanto a chave do cache)
+MASK_TREE_KEYS = ('num_attractors', 'kill_distance', 'step_size', 'stagnation_limit',
+                  'width', 'height', 'root_x', 'root_y', 'influence_radius',
+                  'convergence_window', 'max_iterations', 'max_substeps', 'coarse_factor',
+                  'sample_fraction', 'dtype')
+
+# Número máximo de elementos das matrizes temporárias de distância
+CHUNK_ELEMENTS = 1 << 22
+
+
+# =============================================================================
+# DISTÂNCIAS EM BLOCOS
+# =============================================================================
+def _squared_distances(points, nodes):
+    """Distâncias ao quadrado (len(points), len(nodes)), somando dimensão a dimensão."""
+    d2 = (points[:, None, 0] - nodes[None, :, 0]) ** 2
+    for axis in range(1, points.shape[1]):
+        d2 += (points[:, None, axis] - nodes[None, :, axis]) ** 2
+    return d2
+
+
+def nearest_nodes(points, nodes):
+    """
+    Índice do nó mais próximo de cada ponto e a distância ao quadrado.
+    Em empate vence o menor índice, como no laço original.
+    """
+    if fractal_kernels.enabled():
+        return fractal_kernels.nearest_nodes(points, nodes)
+    indices = np.empty(len(points), dtype=np.intp)
+    dist2 = np.empty(len(points), dtype=nodes.dtype)
+    block = max(1, CHUNK_ELEMENTS // max(1, len(nodes)))
+    for start in range(0, len(points), block):
+        d2 = _squared_distances(points[start:start + block], nodes)
+        idx = d2.argmin(axis=1)
+        indices[start:start + block] = idx
+        dist2[start:start + block] = d2[np.arange(len(idx)), idx]
+    return indices, dist2
+
+
+def any_within(points, nodes, radius, inclusive=False):
+    """
+    Máscara dos pontos que têm algum nó a uma distância menor que `radius`
+    (ou menor ou igual, com `inclusive`).
+    """
+    hit = np.zeros(len(points), dtype=bool)
+    if len(nodes) == 0 or len(points) == 0:
+        return hit
+    radius2 = radius * radius
+    if fractal_kernels.enabled():
+        # O raio ao quadrado no mesmo tipo das distâncias, como na comparação NumPy
+        radius2 = np.result_type(points, nodes).type(radius2)
+        return fractal_kernels.any_within(points, nodes, radius2, inclusive)
+    block = max(1, CHUNK_ELEMENTS // len(nodes))
+    for start in range(0, len(points), block):
+        d2 = _squared_distances(points[start:start + block], nodes)
+        close = d2 <= radius2 if inclusive else d2 < radius2
+        hit[start:start + block] = close.any(axis=1)
+    return hit
+
+
+def accumulate_directions(owners, unit, count, dtype=float):
+    """Soma dos vetores `unit` e número de atratores de cada um dos `count` nós donos."""
+    sums = np.zeros((count, unit.shape[1]), dtype=dtype)
+    if fractal_kernels.enabled():
+        return fractal_kernels.accumulate_directions(owners, unit, count, sums)
+    np.add.at(sums, owners, unit)
+    return sums, np.bincount(owners, minlength=count)
+
+
+# =============================================================================
+# INICIALIZAÇÃO
+# =============================================================================
+def initial_trunk(root_pos, direction, step_size, length=5):
+    """Raiz mais `length` nós em linha reta (o "tronco" inicial dos scripts)."""
+    root_pos = np.asarray(root_pos, dtype=float)
+    direction = np.asarray(direction, dtype=float)
+    steps = np.arange(length + 1, dtype=float)[:, None]
+    positions = root_pos[None, :] + steps * direction[None, :] * step_size
+    parents = np.arange(-1, length, dtype=np.int64)
+    return positions, parents
+
+
+def load_mask(mask_path, width, height):
+    """Carrega a máscara em tons de cinza redimensionada para a imagem final."""
+    mask_img = Image.open(mask_path).convert('L')
+    return mask_img.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def generate_mask_attractors(mask_img, num_attractors, rng):
+    """
+    Sorteia `num_attractors` pontos nos pixels escuros (< 128) da máscara,
+    na mesma sequência de sorteios dos scripts originais.
+    """
+    width, height = mask_img.size
+    if not (np.asarray(mask_img) < 128).any():
+        return np.empty((0, 2))
+    mask_pixels = mask_img.load()
+    attractors = []
+    while len(attractors) < num_attractors:
+        x = rng.randint(0, width - 1)
+        y = rng.randint(0, height - 1)
+        # Verifica a cor do pixel na máscara: se for escuro (abaixo de 128), adiciona atrator
+        if mask_pixels[x, y] < 128:
+            attractors.append((x, y))
+    return np.array(attractors, dtype=float)
+
+
+# =============================================================================
+# ATRATORES ESTACIONADOS (RAIO DE INFLUÊNCIA)
+# =============================================================================
+class ParkedAttractors:
+    """
+    Atratores ainda fora do raio de influência de todos os nós, guardados numa
+    grade de baldes com células do tamanho do raio. Um atrator só precisa ser
+    testado quando um nó novo cai numa célula vizinha à dele, então ativar os
+    atratores alcançados custa proporcional aos nós novos, não ao total.
+    """
+
+    def __init__(self, positions, ids, radius):
+        self.radius = float(radius)
+        self.positions = np.asarray(positions)
+        self.ids = np.asarray(ids)
+        self.alive = np.ones(len(self.ids), dtype=bool)
+        self.count = len(self.ids)
+        self._cells = np.floor(self.positions / self.radius).astype(np.int64)
+        dim = self.positions.shape[1]
+        self._offsets = np.array(list(itertools.product((-1, 0, 1), repeat=dim)), dtype=np.int64)
+        self._buckets = {}
+        for index, cell in enumerate(map(tuple, self._cells)):
+            self._buckets.setdefault(cell, []).append(index)
+        self._buckets = {cell: np.array(members) for cell, members in self._buckets.items()}
+
+    def __len__(self):
+        return self.count
+
+    def activate_near(self, nodes):
+        """Retira e retorna (em ordem) os índices dos atratores a até `radius` de algum dos `nodes`."""
+        if self.count == 0 or len(nodes) == 0:
+            return np.empty(0, dtype=np.intp)
+        cells = np.unique(np.floor(nodes / self.radius).astype(np.int64), axis=0)
+        neighbors = np.unique((cells[:, None, :] + self._offsets[None, :, :]).reshape(-1, cells.shape[1]), axis=0)
+        keys = [cell for cell in map(tuple, neighbors) if cell in self._buckets]
+        if not keys:
+            return np.empty(0, dtype=np.intp)
+        candidates = np.concatenate([self._buckets[cell] for cell in keys])
+        hit = any_within(self.positions[candidates], nodes, self.radius, inclusive=True)
+        chosen = np.sort(candidates[hit])
+        if len(chosen):
+            self.alive[chosen] = False
+            self.count -= len(chosen)
+            for cell in keys:
+                members = self._buckets[cell]
+                members = members[self.alive[members]]
+                if len(members):
+                    self._buckets[cell] = members
+                else:
+                    del self._buckets[cell]
+        return chosen
+
+    def remaining(self):
+        """Posições e identificadores dos atratores ainda estacionados."""
+        return self.positions[self.alive], self.ids[self.alive]
+
+
+# =============================================================================
+# CONVERGÊNCIA E ORÇAMENTO
+# =============================================================================
+def _plain(value):
+    """Escalar NumPy como int/float do Python (para o JSON do checkpoint)."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class GrowthGuard:
+    """
+    Decide quando encerrar um laço de crescimento antes do fim natural. A
+    árvore no ponto de parada é o resultado final (o melhor até então).
+
+    - Convergência: `convergence_window` iterações seguidas sem nós novos
+      ('stalled') ou com o mesmo conjunto de atratores, isto é, galhos
+      crescendo sem alcançar nenhum atrator ('oscillating').
+    - Orçamento: `max_iterations` iterações ('max_iterations') ou
+      `time_budget` segundos de relógio desde a criação ('time_budget').
+
+    Os motivos ficam em `reason`; sem nenhum limite, `update` nunca para.
+    `state()` e `restore()` levam os contadores e o tempo já gasto para o
+    checkpoint, para que uma execução retomada pare no mesmo ponto.
+    """
+
+    MESSAGES = {
+        'stalled': 'nenhum nó novo em {window} iterações',
+        'oscillating': 'atratores inalterados em {window} iterações',
+        'max_iterations': 'limite de {max_iterations} iterações',
+        'time_budget': 'orçamento de {time_budget:g} s esgotado',
+    }
+
+    def __init__(self, convergence_window=None, max_iterations=None, time_budget=None):
+        self.window = convergence_window or None
+        self.max_iterations = max_iterations or None
+        self.time_budget = time_budget or None
+        self.reason = None
+        self._start = time.monotonic()
+        self._last = None
+        self._stalled = 0
+        self._unchanged = 0
+
+    @classmethod
+    def from_params(cls, params, convergence_window=None):
+        """Lê params['convergence_window'] (padrão `convergence_window`), params['max_iterations'] e params['time_budget']."""
+        return cls(params.get('convergence_window', convergence_window),
+                   params.get('max_iterations'), params.get('time_budget'))
+
+    def update(self, iteration, nodes, attractors):
+        """
+        Registra o estado ao fim de uma iteração (`nodes`: número de nós;
+        `attractors`: qualquer assinatura comparável do conjunto de atratores)
+        e retorna o motivo da parada, ou None para continuar.
+        """
+        if self._last is not None:
+            last_nodes, last_attractors = self._last
+            self._stalled = self._stalled + 1 if nodes == last_nodes else 0
+            self._unchanged = self._unchanged + 1 if attractors == last_attractors else 0
+        self._last = (nodes, attractors)
+
+        if self.window and self._stalled >= self.window:
+            self.reason = 'stalled'
+        elif self.window and self._unchanged >= self.window:
+            self.reason = 'oscillating'
+        elif self.max_iterations and iteration >= self.max_iterations:
+            self.reason = 'max_iterations'
+        elif self.time_budget and time.monotonic() - self._start >= self.time_budget:
+            self.reason = 'time_budget'
+        return self.reason
+
+    def state(self):
+        """Contadores e tempo decorrido, em tipos serializáveis em JSON (checkpoint)."""
+        last = None
+        if self._last is not None:
+            nodes, attractors = self._last
+            attractors = [_plain(value) for value in attractors] if isinstance(attractors, tuple) else _plain(attractors)
+            last = [_plain(nodes), attractors]
+        return {'last': last, 'stalled': self._stalled, 'unchanged': self._unchanged,
+                'elapsed': time.monotonic() - self._start}
+
+    def restore(self, state):
+        """Continua a contagem gravada por `state()` (o relógio segue do tempo já gasto)."""
+        last = state['last']
+        if last is not None:
+            nodes, attractors = last
+            # O JSON devolve listas; a assinatura é comparada com tuplas
+            last = (nodes, tuple(attractors) if isinstance(attractors, list) else attractors)
+        self._last = last
+        self._stalled = state['stalled']
+        self._unchanged = state['unchanged']
+        self._start = time.monotonic() - state['elapsed']
+
+    def describe(self):
+        """Motivo da parada em texto, para as mensagens de status."""
+        if self.reason is None:
+            return ''
+        return self.MESSAGES[self.reason].format(window=self.window, max_iterations=self.max_iterations,
+                                                 time_budget=self.time_budget or 0)
+
+
+# =============================================================================
+# MOTOR DE CRESCIMENTO
+# =============================================================================
+class SpaceColonization:
+    """
+    Estado de uma simulação de colonização do espaço (2D ou 3D).
+
+    Cada chamada a `step()` executa uma iteração completa do laço original:
+    a. associa cada atrator ao nó mais próximo e atualiza a estagnação;
+    b. cria um nó novo na direção média dos atratores de cada nó;
+    c. remove atratores estagnados e os que ficaram perto de algum nó.
+
+    Com `influence_radius`, como no algoritmo clássico, um atrator só atua
+    depois que algum nó chega a essa distância dele; até lá ele fica
+    estacionado (ParkedAttractors) e não entra nas contas de distância.
+
+    Com `max_substeps` > 1, uma ponta isolada, longe de todos os seus
+    atratores, avança até esse número de passos numa mesma iteração (veja
+    `_substeps`), sempre com o mesmo comprimento de galho.
+
+    Com `sample_fraction` < 1 (modo aproximado, para prévias e volumes 3D
+    grandes), cada iteração associa só um grupo de cerca dessa fração dos
+    atratores vivos, em rodízio pelo identificador: todo atrator é visto a
+    cada 1 / sample_fraction iterações. A direção média é normalizada e não
+    depende de quantos atratores entram na soma; o que precisa de nova
+    escala é a estagnação, que avança o número de iterações desde a última
+    visita.
+
+    Com `dtype='float32'`, nós e atratores são guardados em float32 e as
+    distâncias (sempre comparadas ao quadrado, sem raízes) são calculadas
+    em float32: metade do tráfego de memória das matrizes de distância. As
+    árvores ficam próximas das de float64 mas não idênticas (veja
+    fractal_benchmark.py --float32).
+
+    Com `constraint` (um fractal_volume.VolumeConstraint atribuído depois de
+    criar o motor), os nós novos que sairiam do volume são projetados de
+    volta ou descartados numa consulta em lote por iteração.
+    """
+
+    def __init__(self, attractors, positions, parents, step_size, kill_distance,
+                 stagnation_limit, births=None, influence_radius=None, max_substeps=1,
+                 sample_fraction=None, dtype=None):
+        self.dtype = np.dtype(dtype or float)
+        positions = np.asarray(positions, dtype=self.dtype)
+        self.dim = positions.shape[1]
+        self.step_size = float(step_size)
+        self.kill_distance = float(kill_distance)
+        self.stagnation_limit = stagnation_limit
+        self.max_substeps = max(1, int(max_substeps or 1))
+        self.sample_fraction = sample_fraction
+        self.sample_period = max(1, round(1 / sample_fraction)) if sample_fraction else 1
+
+        capacity = max(1024, 2 * len(positions))
+        self._positions = np.empty((capacity, self.dim), dtype=self.dtype)
+        self._parents = np.empty(capacity, dtype=np.int64)
+        self._births = np.empty(capacity, dtype=np.int32)
+        self.node_count = 0
+        if births is None:
+            births = np.zeros(len(positions), dtype=np.int32)
+        self._append_nodes(positions, parents, births)
+
+        attractors = np.asarray(attractors, dtype=self.dtype).reshape(-1, self.dim)
+        self.initial_attractors = len(attractors)
+        self.influence_radius = influence_radius
+        self.parked = None
+        if influence_radius:
+            # O raio de ativação nunca é menor que o de remoção: um atrator ao
+            # alcance da poda já precisa estar ativo para ser removido.
+            self.parked = ParkedAttractors(attractors, np.arange(len(attractors)),
+                                           max(float(influence_radius), self.kill_distance))
+            attractors = attractors[:0]
+        self.attractors = attractors
+        self.attractor_ids = np.arange(len(self.attractors))
+        self.closest = np.full(len(self.attractors), -1, dtype=np.intp)
+        self.stagnation = np.zeros(len(self.attractors), dtype=np.int64)
+        if self.parked is not None:
+            self._activate(self.positions)
+        self.iterations = 0
+        # Nós a partir deste índice ainda não foram testados na poda por proximidade
+        self._untested_from = 0
+        # fractal_profile.PhaseProfiler opcional (tempo por fase e contadores)
+        self.profiler = fractal_profile.NULL_PROFILER
+        # Restrição opcional dos nós novos a um volume (fractal_volume.VolumeConstraint);
+        # não faz parte do estado: quem retoma um checkpoint a recria
+        self.constraint = None
+
+    # --- Armazenamento dos nós -----------------------------------------------------
+    def _append_nodes(self, positions, parents, births):
+        count = len(positions)
+        needed = self.node_count + count
+        if needed > len(self._positions):
+            capacity = max(needed, 2 * len(self._positions))
+            self._positions = np.resize(self._positions, (capacity, self.dim))
+            self._parents = np.resize(self._parents, capacity)
+            self._births = np.resize(self._births, capacity)
+        self._positions[self.node_count:needed] = positions
+        self._parents[self.node_count:needed] = parents
+        self._births[self.node_count:needed] = births
+        self.node_count = needed
+
+    @property
+    def positions(self):
+        return self._positions[:self.node_count]
+
+    @property
+    def parents(self):
+        return self._parents[:self.node_count]
+
+    @property
+    def births(self):
+        return self._births[:self.node_count]
+
+    @property
+    def done(self):
+        # Atratores estacionados que nenhum nó alcançou não fazem mais crescer a árvore
+        return len(self.attractors) == 0
+
+    @property
+    def remaining_attractors(self):
+        """Atratores ainda não removidos (ativos e estacionados)."""
+        return len(self.attractors) + (len(self.parked) if self.parked is not None else 0)
+
+    def _activate(self, nodes):
+        """Ativa os atratores estacionados que entraram no raio de influência de `nodes`."""
+        chosen = self.parked.activate_near(nodes)
+        if len(chosen):
+            self.attractors = np.concatenate([self.attractors, self.parked.positions[chosen]])
+            self.attractor_ids = np.concatenate([self.attractor_ids, self.parked.ids[chosen]])
+            self.closest = np.concatenate([self.closest, np.full(len(chosen), -1, dtype=np.intp)])
+            self.stagnation = np.concatenate([self.stagnation, np.zeros(len(chosen), dtype=np.int64)])
+
+    def _origins(self, nodes):
+        """Nó que fez crescer cada nó de `nodes`: o pai, ou o início da cadeia de passos extras."""
+        origin = self._parents[nodes]
+        births = self._births[nodes]
+        for _ in range(self.max_substeps - 1):
+            chained = origin >= 0
+            chained[chained] = self._births[origin[chained]] == births[chained]
+            if not chained.any():
+                break
+            origin[chained] = self._parents[origin[chained]]
+        return origin
+
+    def _substeps(self, growing, closest, previous, dist2):
+        """
+        Número de passos de cada nó de `growing` nesta iteração. Uma ponta só
+        avança mais de um passo se herdou do nó que a fez crescer exatamente o
+        mesmo conjunto de atratores da iteração anterior (a direção média mal
+        muda) e, mesmo assim, só cobre metade da distância que falta até
+        `kill_distance` do atrator mais próximo; perto dos atratores volta a um
+        passo por iteração.
+        """
+        count = self.node_count
+        owners = np.unique(closest)
+        origin = np.full(count, -1, dtype=np.int64)
+        origin[owners] = self._origins(owners)
+        owned = np.bincount(closest, minlength=count)
+        had = previous >= 0
+        inherited = had.copy()
+        inherited[had] = previous[had] == origin[closest[had]]
+        inherited = np.bincount(closest[inherited], minlength=count)
+        before = np.bincount(previous[had], minlength=count)
+
+        parent = origin[growing]
+        isolated = (owned[growing] == inherited[growing]) & (parent >= 0)
+        isolated[isolated] = before[parent[isolated]] == owned[growing[isolated]]
+
+        nearest = np.full(count, np.inf, dtype=dist2.dtype)
+        np.minimum.at(nearest, closest, dist2)
+        gap = np.sqrt(nearest[growing]) - self.kill_distance
+        steps = np.floor(0.5 * gap / self.step_size)
+        return np.where(isolated, np.clip(steps, 1, self.max_substeps), 1).astype(np.int64)
+
+    def _contained_substeps(self, growing, step, extra):
+        """Corta as cadeias de passos extras antes do primeiro passo que sairia do volume."""
+        tips = np.repeat(np.arange(len(growing)), extra)
+        k = np.arange(len(tips)) - np.repeat(np.cumsum(extra) - extra, extra) + 2
+        chain = self.positions[growing[tips]] + step[tips] * k[:, None].astype(self.dtype)
+        outside = ~self.constraint.inside(chain)
+        first_outside = extra + 2
+        np.minimum.at(first_outside, tips[outside], k[outside])
+        return first_outside - 2
+
+    def tree(self):
+        """Cópia da árvore atual como arrays (posições, pais, nascimentos)."""
+        return {'positions': self.positions.copy(), 'parents': self.parents.copy(),
+                'births': self.births.copy()}
+
+    # --- Uma iteração --------------------------------------------------------------
+    def step(self):
+        """Executa uma iteração e retorna um resumo do que aconteceu."""
+        self.iterations += 1
+        profiler = self.profiler
+        positions = self.positions
+
+        # a. Associação e rastreamento de estagnação
+        with profiler.phase('associate'):
+            attractors = self.attractors
+            previous = self.closest
+            period = self.sample_period
+            if period > 1:
+                # Rodízio: nesta iteração só participa o grupo id % período
+                seen = np.flatnonzero(self.attractor_ids % period == self.iterations % period)
+                attractors = attractors[seen]
+                previous = previous[seen]
+            closest, dist2 = nearest_nodes(attractors, positions)
+            same = closest == previous
+            if period > 1:
+                self.stagnation[seen] = np.where(same, self.stagnation[seen] + period, period)
+                self.closest[seen] = closest
+            else:
+                self.stagnation = np.where(same, self.stagnation + 1, 1)
+                self.closest = closest
+
+            direction = attractors - positions[closest]
+            norm = np.sqrt((direction ** 2).sum(axis=1))
+            valid = norm > 0
+            unit = direction[valid] / norm[valid, None]
+            owners = closest[valid]
+
+        # b. Crescimento: direção média dos atratores de cada nó
+        with profiler.phase('grow'):
+            sums, counts = accumulate_directions(owners, unit, self.node_count, self.dtype)
+            growing = np.flatnonzero(counts)
+            # Contagens no tipo do motor: int64 promoveria as somas em float32 para float64
+            avg_direction = sums[growing] / counts[growing, None].astype(self.dtype)
+            avg_norm = np.sqrt((avg_direction ** 2).sum(axis=1))
+            ok = avg_norm > 0
+            growing = growing[ok]
+            step = avg_direction[ok] / avg_norm[ok, None] * self.step_size
+            new_positions = positions[growing] + step
+            if self.constraint is not None and len(growing):
+                # Nós que sairiam do volume são projetados de volta ou descartados
+                new_positions, kept = self.constraint.apply(positions[growing], new_positions, self.step_size)
+                step = (new_positions - positions[growing])[kept]
+                growing, new_positions = growing[kept], new_positions[kept]
+            new_parents = growing
+            if self.max_substeps > 1 and len(growing):
+                # Passos extras das pontas isoladas, calculados de uma vez: o nó do
+                # passo k é filho do passo k-1 e fica depois de todos os primeiros passos.
+                extra = self._substeps(growing, closest, previous, dist2) - 1
+                if self.constraint is not None:
+                    extra = self._contained_substeps(growing, step, extra)
+                tips = np.repeat(np.arange(len(growing)), extra)
+                if len(tips):
+                    k = np.arange(len(tips)) - np.repeat(np.cumsum(extra) - extra, extra) + 2
+                    first = self.node_count + tips
+                    index = self.node_count + len(growing) + np.arange(len(tips))
+                    chain = positions[growing[tips]] + step[tips] * k[:, None].astype(self.dtype)
+                    new_positions = np.concatenate([new_positions, chain])
+                    new_parents = np.concatenate([new_parents, np.where(k == 2, first, index - 1)])
+            self._append_nodes(new_positions, new_parents,
+                               np.full(len(new_positions), self.iterations, dtype=np.int32))
+            if self.parked is not None:
+                self._activate(new_positions)
+
+        # c. Poda: estagnação primeiro, depois proximidade física. Nós já testados
+        # numa iteração anterior não mudam de lugar, então basta testar os novos.
+        with profiler.phase('prune'):
+            stagnated = self.stagnation >= self.stagnation_limit
+            untested = self.positions[self._untested_from:]
+            near = np.zeros(len(self.attractors), dtype=bool)
+            near[~stagnated] = any_within(self.attractors[~stagnated], untested, self.kill_distance)
+            self._untested_from = self.node_count
+
+            removed = stagnated | near
+            if removed.any():
+                keep = ~removed
+                self.attractors = self.attractors[keep]
+                self.attractor_ids = self.attractor_ids[keep]
+                self.closest = self.closest[keep]
+                self.stagnation = self.stagnation[keep]
+
+        info = {'iteration': self.iterations, 'new_nodes': len(new_positions),
+                'removed_by_proximity': int(near.sum()),
+                'removed_by_stagnation': int(stagnated.sum())}
+        profiler.count('new_nodes', info['new_nodes'])
+        profiler.count('removed_by_proximity', info['removed_by_proximity'])
+        profiler.count('removed_by_stagnation', info['removed_by_stagnation'])
+        profiler.end_step('iteration', self.iterations, nodes=self.node_count,
+                          attractors=len(self.attractors),
+                          parked=len(self.parked) if self.parked is not None else 0)
+        return info
+
+    def run(self, on_iteration=None, checkpointer=None, extra_state=None, guard=None):
+        """
+        Itera até acabarem os atratores; `on_iteration(engine, info)` a cada passo.
+        Com um `fractal_checkpoint.Checkpointer`, grava o estado completo (mais
+        `extra_state`, como a semente) a cada `checkpointer.interval` iterações.
+        Com um `GrowthGuard`, para antes se ele detectar convergência ou
+        esgotar o orçamento (o motivo fica em `guard.reason`); os contadores
+        do guard vão no checkpoint (veja resume_engine).
+        """
+        while not self.done:
+            info = self.step()
+            if on_iteration is not None:
+                on_iteration(self, info)
+            # O guard é atualizado antes de gravar: o checkpoint da iteração N
+            # guarda os contadores já com a iteração N
+            if guard is not None and guard.update(self.iterations, self.node_count,
+                                                  (len(self.attractors), self.remaining_attractors)):
+                break
+            if checkpointer is not None and checkpointer.due(self.iterations):
+                arrays, state = self.state()
+                if guard is not None:
+                    state['guard'] = guard.state()
+                checkpointer.save(arrays, dict(state, **(extra_state or {})))
+        return self.tree()
+
+    # --- Checkpoints ---------------------------------------------------------------
+    def state(self):
+        """Estado completo da simulação como (arrays, escalares)."""
+        arrays = {'positions': self.positions, 'parents': self.parents, 'births': self.births,
+                  'attractors': self.attractors, 'attractor_ids': self.attractor_ids,
+                  'closest': self.closest, 'stagnation': self.stagnation}
+        scalars = {'iteration': self.iterations, 'initial_attractors': self.initial_attractors,
+                   'untested_from': self._untested_from, 'step_size': self.step_size,
+                   'kill_distance': self.kill_distance, 'stagnation_limit': self.stagnation_limit,
+                   'influence_radius': self.influence_radius, 'max_substeps': self.max_substeps,
+                   'sample_fraction': self.sample_fraction, 'dtype': self.dtype.name}
+        if self.parked is not None:
+            arrays['parked_attractors'], arrays['parked_ids'] = self.parked.remaining()
+        return arrays, scalars
+
+    @classmethod
+    def from_state(cls, arrays, scalars):
+        """Reconstrói o motor exatamente no ponto em que `state()` foi chamado."""
+        engine = cls(arrays['attractors'], arrays['positions'], arrays['parents'],
+                     scalars['step_size'], scalars['kill_distance'], scalars['stagnation_limit'],
+                     births=arrays['births'], max_substeps=scalars.get('max_substeps', 1),
+                     sample_fraction=scalars.get('sample_fraction'), dtype=scalars.get('dtype'))
+        engine.attractor_ids = arrays['attractor_ids']
+        engine.closest = arrays['closest']
+        engine.stagnation = arrays['stagnation']
+        engine.initial_attractors = scalars['initial_attractors']
+        engine.iterations = scalars['iteration']
+        engine._untested_from = scalars['untested_from']
+        engine.influence_radius = scalars.get('influence_radius')
+        if engine.influence_radius:
+            engine.parked = ParkedAttractors(arrays['parked_attractors'], arrays['parked_ids'],
+                                             max(float(engine.influence_radius), engine.kill_distance))
+        return engine
+
+
+# =============================================================================
+# MULTIRRESOLUÇÃO (GROSSO -> FINO)
+# =============================================================================
+def upsample_tree(tree, factor):
+    """
+    Amplia uma árvore simulada numa resolução `factor` vezes menor: as
+    posições são multiplicadas por `factor` e cada galho é dividido em
+    `factor` segmentos, o que devolve o comprimento de galho original.
+    O segmento j do galho nascido na iteração b nasce na iteração
+    (b - 1) * factor + j, de modo que os quadros do vídeo continuam
+    mostrando o esqueleto crescendo passo a passo. Os nós saem ordenados
+    por nascimento e cada pai vem antes dos seus filhos.
+    Retorna (positions, parents, births).
+    """
+    positions = np.asarray(tree['positions'], dtype=float) * factor
+    parents = np.asarray(tree['parents'])
+    births = np.asarray(tree['births'], dtype=np.int64)
+    count = len(parents)
+
+    # Uma entrada (nó grosso i, segmento j) por segmento; a raiz só tem o j = factor
+    node = np.repeat(np.arange(count), factor)
+    j = np.tile(np.arange(1, factor + 1), count)
+    root = parents[node] < 0
+    keep = ~root | (j == factor)
+    node, j = node[keep], j[keep]
+    parent = np.maximum(parents[node], 0)
+    fraction = (j / factor)[:, None]
+    new_positions = positions[parent] + (positions[node] - positions[parent]) * fraction
+    new_births = np.where(births[node] > 0, (births[node] - 1) * factor + j, 0)
+
+    order = np.lexsort((j, node, new_births))
+    node, j, new_positions, new_births = node[order], j[order], new_positions[order], new_births[order]
+    index = np.full((count, factor + 1), -1, dtype=np.int64)
+    index[node, j] = np.arange(len(node))
+    previous = np.where(j > 1, index[node, j - 1], -1)
+    from_parent = (j == 1) & (parents[node] >= 0)
+    previous[from_parent] = index[parents[node[from_parent]], factor]
+    return new_positions, previous, new_births.astype(np.int32)
+
+
+# =============================================================================
+# GERAÇÃO POR MÁSCARA (compartilhada pelas GUIs de imagem e de vídeo)
+# =============================================================================
+def resolve_seed(params):
+    """Semente explícita dos params, ou uma nova sorteada (sempre informada nos stats)."""
+    seed = params.get('seed')
+    if seed is None:
+        seed = random.randrange(2**32)
+    return int(seed)
+
+
+def resume_engine(params, checkpointer, guard=None):
+    """
+    Se params['resume'] estiver ativo e houver checkpoint, retorna (motor, semente)
+    restaurados dele; senão (None, None). Com `guard`, restaura também os seus
+    contadores de convergência e o tempo já gasto.
+    """
+    if checkpointer is None or not params.get('resume'):
+        return None, None
+    loaded = checkpointer.load()
+    if loaded is None:
+        return None, None
+    arrays, state = loaded
+    if guard is not None and state.get('guard') is not None:
+        guard.restore(state['guard'])
+    return SpaceColonization.from_state(arrays, state), state['seed']
+
+
+def coarse_to_fine_engine(params, mask_img, rng, output_queue):
+    """
+    Modo multirresolução (params['coarse_factor'] > 1): simula primeiro um
+    esqueleto na máscara reduzida `coarse_factor` vezes, com num_attractors /
+    coarse_factor² atratores (em escala cheia, passos e distância de remoção
+    `coarse_factor` vezes maiores), amplia esse esqueleto (upsample_tree) e
+    devolve o motor da resolução cheia partindo dele, só com os atratores
+    densos que ficam perto do esqueleto. O crescimento fino só preenche os
+    detalhes em volta dos galhos principais.
+    """
+    factor = int(params['coarse_factor'])
+    width, height = params['width'], params['height']
+    coarse_mask = mask_img.resize((max(1, width // factor), max(1, height // factor)),
+                                  Image.Resampling.LANCZOS)
+    attractors = generate_mask_attractors(coarse_mask, max(1, params['num_attractors'] // factor ** 2), rng)
+    if len(attractors) == 0:
+        raise ValueError('Nenhum atrator gerado a partir da máscara.')
+    root_pos = np.array((params.get('root_x', width / 2), params.get('root_y', height))) / factor
+    positions, parents = initial_trunk(root_pos, (0.0, -1.0), params['step_size'])
+    influence_radius = params.get('influence_radius')
+    coarse = SpaceColonization(attractors, positions, parents, params['step_size'],
+                               params['kill_distance'], params['stagnation_limit'],
+                               influence_radius=influence_radius / factor if influence_radius else None,
+                               max_substeps=params.get('max_substeps'),
+                               sample_fraction=params.get('sample_fraction'), dtype=params.get('dtype'))
+    output_queue.put({'status': f'Esqueleto em 1/{factor} da resolução com {len(attractors)} atratores...'})
+    coarse.run()
+
+    positions, parents, births = upsample_tree(coarse.tree(), factor)
+    attractors = generate_mask_attractors(mask_img, params['num_attractors'], rng)
+    near = any_within(attractors, positions, factor * (params['step_size'] + params['kill_distance']))
+    output_queue.put({'status': f'Esqueleto com {len(positions)} nós em {coarse.iterations} iterações; '
+                                f'refinando com {int(near.sum())} atratores...'})
+    engine = SpaceColonization(attractors[near], positions, parents, params['step_size'],
+                               params['kill_distance'], params['stagnation_limit'], births=births,
+                               influence_radius=influence_radius, max_substeps=params.get('max_substeps'),
+                               sample_fraction=params.get('sample_fraction'), dtype=params.get('dtype'))
+    # As iterações do esqueleto contam em passos da resolução cheia (como os nascimentos)
+    engine.iterations = coarse.iterations * factor
+    return engine
+
+
+def grow_mask_tree(params, output_queue, profiler=None):
+    """
+    Simula a árvore dentro da máscara de `params['mask_path']`.
+    Retorna (tree, stats). Se o cache estiver ativo, uma simulação já feita
+    com os mesmos params, semente e máscara é lida do disco em vez de refeita.
+    Com params['influence_radius'], os atratores só atuam quando algum nó
+    chega a essa distância e, com params['max_substeps'], pontas isoladas
+    avançam vários passos por iteração (veja SpaceColonization). Com
+    params['coarse_factor'] > 1, a árvore parte de um esqueleto simulado em
+    resolução reduzida (coarse_to_fine_engine). params['convergence_window'],
+    params['max_iterations'] e params['time_budget'] encerram o crescimento
+    antes do fim (veja GrowthGuard); uma árvore cortada pelo relógio não vai
+    para o cache, porque não é reprodutível.
+    Com params['checkpoint_path'], o estado é gravado periodicamente e
+    params['resume'] continua do último checkpoint. Com um `profiler`
+    (fractal_profile.PhaseProfiler), o tempo de cada fase é medido e um
+    resumo é enviado para a fila a cada fractal_profile.REPORT_INTERVAL iterações.
+    Com params['partitions'], o crescimento é repartido em processos por
+    fatias da imagem (fractal_partition), com a mesma árvore.
+    """
+    guard = GrowthGuard.from_params(params)
+    checkpointer = fractal_checkpoint.Checkpointer.from_params(
+        params, f'mask_tree_v{ENGINE_VERSION}', MASK_TREE_KEYS, files=[params['mask_path']])
+    engine, seed = resume_engine(params, checkpointer, guard)
+    if seed is None:
+        seed = resolve_seed(params)
+    cache = fractal_cache.cache_from_params(params)
+    key = None
+    if cache is not None:
+        key = fractal_cache.make_key(f'mask_tree_v{ENGINE_VERSION}', params, MASK_TREE_KEYS,
+                                     seed, files=[params['mask_path']])
+        cached = cache.get_tree(key)
+        if cached is not None:
+            tree, stats = cached
+            output_queue.put({'status': f"Árvore encontrada no cache ({stats['nodes']} nós).",
+                              'progress': 99})
+            return tree, dict(stats, cache_key=key, cached=True)
+
+    if engine is not None:
+        output_queue.put({'status': f'Retomando do checkpoint na iteração {engine.iterations}...'})
+    else:
+        # 1. INICIALIZAÇÃO E GERAÇÃO DE ATRATORES
+        output_queue.put({'status': 'Carregando máscara e gerando atratores...'})
+        rng = random.Random(seed)
+        mask_img = load_mask(params['mask_path'], params['width'], params['height'])
+        if (params.get('coarse_factor') or 1) > 1:
+            # 2. ESQUELETO EM BAIXA RESOLUÇÃO, AMPLIADO COMO ÁRVORE INICIAL
+            engine = coarse_to_fine_engine(params, mask_img, rng, output_queue)
+        else:
+            attractors = generate_mask_attractors(mask_img, params['num_attractors'], rng)
+            if len(attractors) == 0:
+                raise ValueError('Nenhum atrator gerado a partir da máscara.')
+
+            # 2. INICIALIZAÇÃO DA ÁRVORE
+            root_pos = (params.get('root_x', params['width'] / 2), params.get('root_y', params['height']))
+            positions, parents = initial_trunk(root_pos, (0.0, -1.0), params['step_size'])
+            engine = SpaceColonization(attractors, positions, parents, params['step_size'],
+                                       params['kill_distance'], params['stagnation_limit'],
+                                       influence_radius=params.get('influence_radius'),
+                                       max_substeps=params.get('max_substeps'),
+                                       sample_fraction=params.get('sample_fraction'),
+                                       dtype=params.get('dtype'))
+
+    if params.get('partitions') is not None:
+        # fractal_partition importa este módulo: importado só aqui
+        import fractal_partition
+        engine = fractal_partition.PartitionedColonization.from_engine(engine, params['partitions'])
+        output_queue.put({'status': f'Crescimento particionado em {engine.workers} processos...'})
+        checkpointer = None
+
+    # 3. PROCESSO DE CRESCIMENTO (LOOP PRINCIPAL)
+    if profiler is not None:
+        engine.profiler = profiler
+
+    def report(engine, info):
+        if profiler is not None and engine.iterations % fractal_profile.REPORT_INTERVAL == 0:
+            profiler.report(output_queue)
+        removed_by_proximity = info['removed_by_proximity']
+        removed_by_stagnation = info['removed_by_stagnation']
+        if engine.iterations % 5 == 0 or engine.done or removed_by_proximity or removed_by_stagnation:
+            remaining = engine.remaining_attractors
+            progress = 100 * (engine.initial_attractors - remaining) / engine.initial_attractors
+            status_text = f"Iteração {engine.iterations}: {remaining} atratores restantes..."
+            if removed_by_stagnation > 0 or removed_by_proximity > 0:
+                status_text += f" (Removidos: {removed_by_proximity} prox, {removed_by_stagnation} estag)"
+            output_queue.put({'status': status_text, 'progress': progress})
+
+    tree = engine.run(on_iteration=report, checkpointer=checkpointer, extra_state={'seed': seed},
+                      guard=guard)
+    stats = {'seed': seed, 'nodes': engine.node_count, 'iterations': engine.iterations,
+             'attractors': engine.initial_attractors}
+    if guard.reason is not None:
+        stats['stop_reason'] = guard.reason
+        output_queue.put({'status': f"Crescimento encerrado na iteração {engine.iterations}: "
+                                    f"{guard.describe()} ({engine.node_count} nós)."})
+        if guard.reason == 'time_budget':
+            key = None
+    if cache is not None and key is not None:
+        cache.put_tree(key, tree, stats)
+    if checkpointer is not None:
+        checkpointer.clear()
+    return tree, dict(stats, cache_key=key, cached=False)
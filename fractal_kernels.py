@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: fractal_kernels.py
+#
+#   Descrição:
+#   Versões compiladas com Numba (JIT) dos três laços quentes do núcleo de
+#   fractal_growth.py: busca do nó mais próximo, acumulação das direções de
+#   crescimento e teste de remoção por proximidade. Percorrem os pontos um a
+#   um, sem as matrizes temporárias de distância do caminho NumPy, o que
+#   importa nas máscaras com muitos atratores concentrados.
+#
+#   O Numba é opcional: sem ele (ou com FRACTAL_JIT=0 no ambiente) o núcleo
+#   usa o caminho NumPy. As contas são feitas na mesma ordem e no mesmo tipo
+#   do caminho NumPy, então as árvores são idênticas nos dois caminhos.
+#   Carregar os kernels custa cerca de 0,3 s por processo: em simulações
+#   de poucas centenas de iterações pequenas o caminho NumPy pode ganhar.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import os
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # sem Numba: fractal_growth usa o caminho NumPy
+    numba = None
+
+
+def enabled():
+    """True se os kernels compilados devem ser usados (Numba instalado e FRACTAL_JIT != 0)."""
+    return numba is not None and os.environ.get('FRACTAL_JIT', '1') != '0'
+
+
+if numba is not None:
+    if 'NUMBA_THREADING_LAYER' not in os.environ:
+        # Com o TBB (escolhido por padrão quando instalado), um processo que já
+        # rodou os kernels paralelos e depois faz fork (ffmpeg do imageio,
+        # fractal_batch) fica preso ao sair; a fila de trabalho própria do
+        # Numba não tem esse problema, e os kernels nunca rodam em duas threads
+        # ao mesmo tempo
+        numba.config.THREADING_LAYER = 'workqueue'
+
+    # cache=True guarda o código compilado em __pycache__: só a primeira
+    # execução paga a compilação.
+    @numba.njit(cache=True, parallel=True)
+    def nearest_nodes(points, nodes):
+        """Índice do nó mais próximo de cada ponto e a distância ao quadrado (empate: menor índice)."""
+        count = points.shape[0]
+        dim = points.shape[1]
+        indices = np.empty(count, dtype=np.intp)
+        # Começa em infinito no tipo dos nós: um np.inf solto tornaria best_d2
+        # float64 e converteria cada distância em float32 antes de comparar
+        dist2 = np.full(count, np.inf, dtype=nodes.dtype)
+        for i in numba.prange(count):
+            best = -1
+            best_d2 = dist2[i]
+            for j in range(nodes.shape[0]):
+                diff = points[i, 0] - nodes[j, 0]
+                d2 = diff * diff
+                for axis in range(1, dim):
+                    diff = points[i, axis] - nodes[j, axis]
+                    d2 += diff * diff
+                if d2 < best_d2:
+                    best_d2 = d2
+                    best = j
+            indices[i] = best
+            dist2[i] = best_d2
+        return indices, dist2
+
+    @numba.njit(cache=True, parallel=True)
+    def any_within(points, nodes, radius2, inclusive):
+        """Máscara dos pontos com algum nó a distância ao quadrado < radius2 (<= com `inclusive`)."""
+        count = points.shape[0]
+        dim = points.shape[1]
+        hit = np.zeros(count, dtype=np.bool_)
+        for i in numba.prange(count):
+            for j in range(nodes.shape[0]):
+                diff = points[i, 0] - nodes[j, 0]
+                d2 = diff * diff
+                for axis in range(1, dim):
+                    diff = points[i, axis] - nodes[j, axis]
+                    d2 += diff * diff
+                if d2 < radius2 or (inclusive and d2 == radius2):
+                    hit[i] = True
+                    break
+        return hit
+
+    @numba.njit(cache=True)
+    def accumulate_directions(owners, unit, count, sums):
+        """Soma em `sums` os vetores `unit` de cada dono (na ordem, como np.add.at) e conta os atratores."""
+        counts = np.zeros(count, dtype=np.int64)
+        for k in range(owners.shape[0]):
+            owner = owners[k]
+            counts[owner] += 1
+            for axis in range(unit.shape[1]):
+                sums[owner, axis] += unit[k, axis]
+        return sums, counts
@@ -0,0 +1,394 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: fractal_mesh.py
+#
+#   Descrição:
+#   Transforma o esqueleto 3D (arrays 'positions'/'parents' da árvore) numa
+#   malha de tubos pronta para visualizadores de RA, que em geral não
+#   desenham linhas. Tudo é calculado em lote sobre todos os segmentos:
+#   profundidade e folhas de cada subárvore, anéis de vértices e faces.
+#
+#   Cada galho é varrido como um tubo fechado (com tampas): a partir de cada
+#   nó o tubo segue o filho com mais folhas; os outros filhos começam um
+#   tubo novo na posição do pai. Cada tubo é "watertight"; nas bifurcações
+#   os tubos se sobrepõem, sem união booleana. O raio segue o modelo de
+#   Leonardo: raio ∝ (folhas da subárvore) ^ (1 / radius_exponent).
+#
+#   Para os celulares da exposição, lod_chain gera de uma só simulação
+#   vários níveis de detalhe: esqueletos simplificados (trechos quase retos
+#   colapsados e galhos com poucas folhas podados) e tubos com menos
+#   vértices por anel, cada nível dentro de um orçamento de triângulos.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import os
+
+import numpy as np
+
+import fractal_glb
+
+DEFAULT_SEGMENTS = 8
+DEFAULT_RADIUS_EXPONENT = 2.0
+# Raio mínimo, como fração do raio do tronco
+DEFAULT_MIN_RADIUS_FRACTION = 0.1
+# Vértices por anel de cada nível de detalhe (o último se repete)
+LOD_SEGMENTS = (8, 6, 4, 3)
+# Rodadas de simplificação por nível antes de desistir do orçamento
+LOD_MAX_ROUNDS = 40
+# Fator de aumento da tolerância e do mínimo de folhas a cada rodada
+LOD_GROWTH = 1.5
+# A poda de galhos começa quando a tolerância passa desta fração do passo
+LOD_PRUNE_TOLERANCE = 0.5
+
+
+# =============================================================================
+# ANÁLISE DO ESQUELETO
+# =============================================================================
+def node_depths(parents):
+    """Profundidade de cada nó (raiz = 0), por saltos de ponteiro (log2 da altura passos)."""
+    parents = np.asarray(parents)
+    ids = np.arange(len(parents))
+    ancestors = np.where(parents >= 0, parents, ids)
+    depths = (parents >= 0).astype(np.int64)
+    while np.any(ancestors != ancestors[ancestors]):
+        depths = depths + depths[ancestors] * (ancestors != ids)
+        ancestors = ancestors[ancestors]
+    return depths
+
+
+def subtree_leaves(parents, depths=None):
+    """Número de folhas na subárvore de cada nó (acumulado nível a nível, das folhas à raiz)."""
+    parents = np.asarray(parents)
+    if depths is None:
+        depths = node_depths(parents)
+    leaves = np.ones(len(parents), dtype=np.int64)
+    leaves[parents[parents >= 0]] = 0
+    order = np.argsort(depths, kind='stable')
+    bounds = np.searchsorted(depths[order], np.arange(depths.max() + 2 if len(depths) else 1))
+    for level in range(len(bounds) - 2, 0, -1):
+        nodes = order[bounds[level]:bounds[level + 1]]
+        np.add.at(leaves, parents[nodes], leaves[nodes])
+    return leaves
+
+
+def main_children(parents, weights):
+    """Filho de maior peso de cada nó (empate: menor índice), ou -1 nas folhas."""
+    parents = np.asarray(parents)
+    children = np.nonzero(parents >= 0)[0]
+    main = np.full(len(parents), -1, dtype=np.int64)
+    order = children[np.lexsort((children, -weights[children], parents[children]))]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = parents[order[1:]] != parents[order[:-1]]
+    main[parents[order[first]]] = order[first]
+    return main
+
+
+def branch_weights(parents, leaves, main, depths=None):
+    """
+    Peso do galho de cada nó: as folhas do nó onde o galho começa (a raiz ou
+    um filho secundário); o galho segue pelos filhos principais (`main`).
+    """
+    parents = np.asarray(parents)
+    if depths is None:
+        depths = node_depths(parents)
+    starts = np.ones(len(parents), dtype=bool)
+    children = np.nonzero(parents >= 0)[0]
+    starts[children] = main[parents[children]] != children
+    weights = leaves.copy()
+    order = np.argsort(depths, kind='stable')
+    bounds = np.searchsorted(depths[order], np.arange(depths.max() + 2 if len(depths) else 1))
+    for level in range(1, len(bounds) - 1):
+        nodes = order[bounds[level]:bounds[level + 1]]
+        nodes = nodes[~starts[nodes]]
+        weights[nodes] = weights[parents[nodes]]
+    return weights
+
+
+def branch_radii(parents, root_radius, min_radius=None, exponent=DEFAULT_RADIUS_EXPONENT, leaves=None):
+    """Raio do galho que chega a cada nó: root_radius * (folhas / folhas da raiz) ^ (1 / exponent)."""
+    if leaves is None:
+        leaves = subtree_leaves(parents)
+    if min_radius is None:
+        min_radius = root_radius * DEFAULT_MIN_RADIUS_FRACTION
+    radii = root_radius * (leaves / leaves.max()) ** (1.0 / exponent)
+    return np.maximum(radii, min_radius)
+
+
+def _normalize(vectors):
+    lengths = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(lengths, 1e-12)
+
+
+def _ring_frames(tangents):
+    """Dois eixos (u, v) perpendiculares a cada tangente, com (u, v, t) orientado à direita."""
+    reference = np.zeros_like(tangents)
+    near_z = np.abs(tangents[:, 2]) > 0.9
+    reference[~near_z, 2] = 1.0
+    reference[near_z, 0] = 1.0
+    u = _normalize(np.cross(tangents, reference))
+    v = np.cross(tangents, u)
+    return u, v
+
+
+# =============================================================================
+# MALHA DE TUBOS
+# =============================================================================
+def tube_mesh(tree, segments=DEFAULT_SEGMENTS, root_radius=1.0, min_radius=None,
+              exponent=DEFAULT_RADIUS_EXPONENT, radii=None):
+    """
+    Varre o esqueleto `tree` num conjunto de tubos fechados com `segments`
+    vértices por anel. `radii` (um raio por nó) substitui o raio calculado
+    pelas folhas. Retorna {'vertices': (V, 3), 'faces': (F, 3)} com as faces
+    orientadas para fora e, se a árvore tiver 'births', a iteração de
+    nascimento de cada vértice em 'births'.
+    """
+    positions = np.asarray(tree['positions'], dtype=float)
+    parents = np.asarray(tree['parents'])
+    count = len(positions)
+    if count < 2:
+        return {'vertices': np.zeros((0, 3)), 'faces': np.zeros((0, 3), dtype=np.int64)}
+
+    leaves = subtree_leaves(parents)
+    if radii is None:
+        radii = branch_radii(parents, root_radius, min_radius, exponent, leaves)
+    main = main_children(parents, leaves)
+    children = np.nonzero(parents >= 0)[0]
+    is_main = main[parents[children]] == children
+
+    # Tangente de cada anel de nó: média das direções de chegada e de saída (filho principal)
+    incoming = np.zeros((count, 3))
+    incoming[children] = _normalize(positions[children] - positions[parents[children]])
+    outgoing = np.zeros((count, 3))
+    has_main = main >= 0
+    outgoing[has_main] = _normalize(positions[main[has_main]] - positions[has_main])
+    tangents = _normalize(incoming + outgoing)
+
+    # Anéis extras: início dos tubos dos filhos secundários, na posição do pai
+    branch_starts = children[~is_main]
+    ring_centers = np.concatenate([positions, positions[parents[branch_starts]]])
+    ring_tangents = np.concatenate([tangents, incoming[branch_starts]])
+    ring_radii = np.concatenate([radii, radii[branch_starts]])
+    ring_count = len(ring_centers)
+    u, v = _ring_frames(ring_tangents)
+
+    angles = 2 * np.pi * np.arange(segments) / segments
+    ring_vertices = (ring_centers[:, None, :]
+                     + ring_radii[:, None, None] * (np.cos(angles)[None, :, None] * u[:, None, :]
+                                                    + np.sin(angles)[None, :, None] * v[:, None, :]))
+
+    # Lados: cada nó (menos a raiz) liga o anel anterior do seu tubo ao próprio anel
+    previous = parents[children].copy()
+    previous[~is_main] = count + np.arange(len(branch_starts))
+    current = children
+    # Desloca os índices do anel para minimizar a torção entre anéis com eixos independentes
+    twist = np.arctan2(np.einsum('ij,ij->i', u[previous], v[current]),
+                       np.einsum('ij,ij->i', u[previous], u[current]))
+    shift = np.rint(twist / (2 * np.pi / segments)).astype(np.int64)
+    i = np.arange(segments)
+    prev_a = previous[:, None] * segments + i[None, :]
+    prev_b = previous[:, None] * segments + (i[None, :] + 1) % segments
+    cur_a = current[:, None] * segments + (i[None, :] + shift[:, None]) % segments
+    cur_b = current[:, None] * segments + (i[None, :] + 1 + shift[:, None]) % segments
+    sides = np.concatenate([np.stack([prev_a, prev_b, cur_b], axis=-1).reshape(-1, 3),
+                            np.stack([prev_a, cur_b, cur_a], axis=-1).reshape(-1, 3)])
+
+    # Tampas: no começo de cada tubo (raiz e anéis extras) e em cada folha
+    start_rings = np.concatenate([[0], count + np.arange(len(branch_starts))])
+    end_rings = np.nonzero(~has_main)[0]
+    cap_rings = np.concatenate([start_rings, end_rings])
+    cap_centers = ring_count * segments + np.arange(len(cap_rings))
+    cap_a = cap_rings[:, None] * segments + i[None, :]
+    cap_b = cap_rings[:, None] * segments + (i[None, :] + 1) % segments
+    center = np.broadcast_to(cap_centers[:, None], cap_a.shape)
+    is_start = np.arange(len(cap_rings)) < len(start_rings)
+    caps = np.where(is_start[:, None, None],
+                    np.stack([center, cap_b, cap_a], axis=-1),
+                    np.stack([center, cap_a, cap_b], axis=-1)).reshape(-1, 3)
+
+    vertices = np.concatenate([ring_vertices.reshape(-1, 3), ring_centers[cap_rings]])
+    mesh = {'vertices': vertices, 'faces': np.concatenate([sides, caps]).astype(np.int64)}
+    if 'births' in tree:
+        # Iteração de nascimento por vértice: o anel de cada nó nasce com o nó; o
+        # anel extra de um galho nasce com o pai, então o tubo cresce do pai ao filho
+        births = np.asarray(tree['births'])
+        ring_births = np.concatenate([births, births[parents[branch_starts]]])
+        mesh['births'] = np.concatenate([np.repeat(ring_births, segments), ring_births[cap_rings]])
+    return mesh
+
+
+# =============================================================================
+# NÍVEIS DE DETALHE (LOD)
+# =============================================================================
+def subset_tree(tree, keep, parents=None):
+    """
+    Árvore só com os nós de `keep` (máscara), reindexada. `parents` (no índice
+    original) substitui tree['parents'] e deve levar cada nó mantido a um pai
+    mantido. tree['ids'] guarda o índice de cada nó na árvore original.
+    """
+    if parents is None:
+        parents = np.asarray(tree['parents'])
+    new_index = np.cumsum(keep) - 1
+    kept_parents = parents[keep]
+    subset = {name: np.asarray(values)[keep] for name, values in tree.items() if name != 'parents'}
+    subset['parents'] = np.where(kept_parents >= 0, new_index[np.maximum(kept_parents, 0)], -1)
+    if 'ids' not in tree:
+        subset['ids'] = np.nonzero(keep)[0]
+    return subset
+
+
+def prune_small_branches(tree, min_leaves):
+    """Remove os galhos laterais cuja subárvore tem menos de `min_leaves` folhas."""
+    parents = np.asarray(tree['parents'])
+    depths = node_depths(parents)
+    leaves = subtree_leaves(parents, depths)
+    weights = branch_weights(parents, leaves, main_children(parents, leaves), depths)
+    return subset_tree(tree, weights >= min_leaves)
+
+
+def collapse_collinear(tree, tolerance):
+    """
+    Remove os nós de passagem (um só filho) que estão a menos de `tolerance`
+    do segmento entre o pai e o filho. Cada rodada remove só nós de mesma
+    paridade de profundidade (nunca dois vizinhos) e recalcula os segmentos.
+    """
+    while True:
+        removed_any = False
+        for parity in (0, 1):
+            parents = np.asarray(tree['parents'])
+            positions = np.asarray(tree['positions'], dtype=float)
+            children = np.nonzero(parents >= 0)[0]
+            child_count = np.bincount(parents[children], minlength=len(parents))
+            only_child = np.full(len(parents), -1, dtype=np.int64)
+            single = children[child_count[parents[children]] == 1]
+            only_child[parents[single]] = single
+            depths = node_depths(parents)
+            candidates = np.nonzero((parents >= 0) & (only_child >= 0) & (depths % 2 == parity))[0]
+            if len(candidates) == 0:
+                continue
+
+            start = positions[parents[candidates]]
+            end = positions[only_child[candidates]]
+            point = positions[candidates]
+            segment = end - start
+            length2 = np.maximum(np.einsum('ij,ij->i', segment, segment), 1e-24)
+            t = np.clip(np.einsum('ij,ij->i', point - start, segment) / length2, 0.0, 1.0)
+            deviation = np.linalg.norm(start + t[:, None] * segment - point, axis=1)
+            removed = candidates[deviation < tolerance]
+            if len(removed) == 0:
+                continue
+
+            new_parents = parents.copy()
+            new_parents[only_child[removed]] = parents[removed]
+            keep = np.ones(len(parents), dtype=bool)
+            keep[removed] = False
+            tree = subset_tree(tree, keep, new_parents)
+            removed_any = True
+        if not removed_any:
+            return tree
+
+
+def _tube_triangles(parents, segments):
+    """Número de triângulos de tube_mesh sem montar a malha (lados + tampas)."""
+    parents = np.asarray(parents)
+    if len(parents) < 2:
+        return 0
+    leaves = subtree_leaves(parents)
+    main = main_children(parents, leaves)
+    children = np.nonzero(parents >= 0)[0]
+    starts = 1 + np.count_nonzero(main[parents[children]] != children)
+    ends = np.count_nonzero(main < 0)
+    return 2 * segments * len(children) + segments * (starts + ends)
+
+
+def lod_chain(tree, budgets, root_radius=1.0, min_radius=None, exponent=DEFAULT_RADIUS_EXPONENT,
+              step_size=None, segments=LOD_SEGMENTS):
+    """
+    Gera um nível de detalhe por orçamento de triângulos em `budgets` (do
+    mais detalhado ao mais leve). Em cada nível, enquanto a malha passar do
+    orçamento, a tolerância do colapso de trechos retos cresce e, passada
+    metade do passo, também o mínimo de folhas dos galhos laterais. Os raios
+    vêm sempre da árvore completa, então os níveis têm a mesma silhueta.
+    Retorna uma lista de dicionários {'tree', 'mesh', 'segments',
+    'min_leaves', 'tolerance'}.
+    """
+    full_radii = branch_radii(tree['parents'], root_radius, min_radius, exponent)
+    if step_size is None:
+        parents = np.asarray(tree['parents'])
+        children = np.nonzero(parents >= 0)[0]
+        positions = np.asarray(tree['positions'], dtype=float)
+        step_size = float(np.median(np.linalg.norm(positions[children] - positions[parents[children]], axis=1)))
+
+    levels = []
+    min_leaves = 1
+    tolerance = 0.0
+    for level, budget in enumerate(budgets):
+        ring_segments = segments[min(level, len(segments) - 1)]
+        for _ in range(LOD_MAX_ROUNDS):
+            simplified = prune_small_branches(tree, min_leaves)
+            if tolerance > 0:
+                simplified = collapse_collinear(simplified, tolerance)
+            if _tube_triangles(simplified['parents'], ring_segments) <= budget or len(simplified['parents']) <= 2:
+                break
+            # Primeiro só endireita os trechos quase retos; depois poda também os galhos menores
+            tolerance = max(LOD_GROWTH * tolerance, 0.1 * step_size)
+            if tolerance > LOD_PRUNE_TOLERANCE * step_size:
+                min_leaves = int(np.ceil(LOD_GROWTH * min_leaves))
+        mesh = tube_mesh(simplified, ring_segments, radii=full_radii[simplified['ids']])
+        levels.append({'tree': simplified, 'mesh': mesh, 'segments': ring_segments,
+                       'min_leaves': min_leaves, 'tolerance': tolerance})
+    return levels
+
+
+# =============================================================================
+# EXPORTAÇÃO
+# =============================================================================
+def export_mesh_to_obj(mesh, filename):
+    """Exporta a malha de triângulos para .obj (blocos formatados de uma vez)."""
+    vertices = np.asarray(mesh['vertices'], dtype=float)
+    faces = np.asarray(mesh['faces']) + 1
+    with open(filename, 'w') as f:
+        f.write("# Fractal 3D Gerado com Space Colonization (tubos)\n")
+        f.write(("v %.6f %.6f %.6f\n" * len(vertices)) % tuple(vertices.ravel().tolist()))
+        f.write(("f %d %d %d\n" * len(faces)) % tuple(faces.ravel().tolist()))
+
+
+def export_mesh_to_stl(mesh, filename):
+    """Exporta a malha de triângulos para STL binário."""
+    vertices = np.asarray(mesh['vertices'], dtype=float)
+    triangles = vertices[np.asarray(mesh['faces'])]
+    normals = _normalize(np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0]))
+    record = np.dtype([('normal', '<f4', 3), ('vertices', '<f4', (3, 3)), ('attribute', '<u2')])
+    data = np.zeros(len(triangles), dtype=record)
+    data['normal'] = normals
+    data['vertices'] = triangles
+    with open(filename, 'wb') as f:
+        f.write(b'Fractal 3D Gerado com Space Colonization (tubos)'.ljust(80, b' '))
+        f.write(np.uint32(len(data)).tobytes())
+        f.write(data.tobytes())
+
+
+def export_mesh_to_glb(mesh, filename):
+    """Exporta a malha de triângulos para GLB quantizado (fractal_glb), com o atributo _BIRTH se houver."""
+    fractal_glb.write_glb(filename, mesh['vertices'], mesh['faces'], fractal_glb.MODE_TRIANGLES,
+                          births=mesh.get('births'))
+
+
+# Extensão do arquivo de saída -> exportador da malha de tubos
+MESH_EXPORTERS = {'.obj': export_mesh_to_obj, '.stl': export_mesh_to_stl, '.glb': export_mesh_to_glb}
+
+
+def export_mesh(mesh, filename):
+    """Exporta a malha no formato indicado pela extensão de `filename` (.obj, .stl ou .glb)."""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in MESH_EXPORTERS:
+        raise ValueError(f"Formato de malha não suportado: '{extension}' (use {', '.join(MESH_EXPORTERS)})")
+    MESH_EXPORTERS[extension](mesh, filename)
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: fractal_noise.py
+#
+#   Descrição:
+#   Ruído de Perlin 3D ("improved noise") e fBm em NumPy, avaliando um array
+#   inteiro de pontos numa só chamada. Substitui o `noise.pnoise3` da
+#   biblioteca `noise` na geração dos anéis da colônia: a mesma tabela de
+#   permutação, os mesmos gradientes e a mesma soma de oitavas, em float32
+#   como a extensão em C, para manter o mesmo visual com o mesmo `base`.
+#
+#   Diferença conhecida: a extensão em C soma `base` aos índices sem dar a
+#   volta na tabela (lê memória além dela quando base + coordenada > 511).
+#   Aqui os índices dão a volta na tabela; o resultado é idêntico sempre que
+#   a extensão em C lê dentro da tabela.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import numpy as np
+
+# Permutação de referência de Ken Perlin (a mesma da biblioteca `noise`)
+PERMUTATION = np.array([
+    151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225, 140, 36, 103, 30, 69, 142,
+    8, 99, 37, 240, 21, 10, 23, 190, 6, 148, 247, 120, 234, 75, 0, 26, 197, 62, 94, 252, 219, 203,
+    117, 35, 11, 32, 57, 177, 33, 88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168, 68, 175, 74,
+    165, 71, 134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122, 60, 211, 133, 230, 220,
+    105, 92, 41, 55, 46, 245, 40, 244, 102, 143, 54, 65, 25, 63, 161, 1, 216, 80, 73, 209, 76, 132,
+    187, 208, 89, 18, 169, 200, 196, 135, 130, 116, 188, 159, 86, 164, 100, 109, 198, 173, 186, 3,
+    64, 52, 217, 226, 250, 124, 123, 5, 202, 38, 147, 118, 126, 255, 82, 85, 212, 207, 206, 59, 227,
+    47, 16, 58, 17, 182, 189, 28, 42, 223, 183, 170, 213, 119, 248, 152, 2, 44, 154, 163, 70, 221,
+    153, 101, 155, 167, 43, 172, 9, 129, 22, 39, 253, 19, 98, 108, 110, 79, 113, 224, 232, 178, 185,
+    112, 104, 218, 246, 97, 228, 251, 34, 242, 193, 238, 210, 144, 12, 191, 179, 162, 241, 81, 51,
+    145, 235, 249, 14, 239, 107, 49, 192, 214, 31, 181, 199, 106, 157, 184, 84, 204, 176, 115, 121,
+    50, 45, 127, 4, 150, 254, 138, 236, 205, 93, 222, 114, 67, 29, 24, 72, 243, 141, 128, 195, 78,
+    66, 215, 61, 156, 180], dtype=np.int64)
+
+# Gradientes das 12 arestas do cubo (mais 4 repetidos para completar 16)
+GRADIENTS = np.array([
+    [1, 1, 0], [-1, 1, 0], [1, -1, 0], [-1, -1, 0],
+    [1, 0, 1], [-1, 0, 1], [1, 0, -1], [-1, 0, -1],
+    [0, 1, 1], [0, -1, 1], [0, 1, -1], [0, -1, -1],
+    [1, 0, -1], [-1, 0, -1], [0, -1, 1], [0, 1, 1]], dtype=np.float32)
+# Uma coluna por eixo: indexar três vetores é mais barato que indexar linhas da matriz
+_GRAD_X, _GRAD_Y, _GRAD_Z = (np.ascontiguousarray(GRADIENTS[:, axis]) for axis in range(3))
+
+
+def _perm(index):
+    return PERMUTATION[index & 255]
+
+
+def _grad(hash_value, x, y, z):
+    h = hash_value & 15
+    return x * _GRAD_X[h] + y * _GRAD_Y[h] + z * _GRAD_Z[h]
+
+
+def _lerp(t, a, b):
+    return a + t * (b - a)
+
+
+def _fade(t):
+    return t * t * t * (t * (t * np.float32(6) - np.float32(15)) + np.float32(10))
+
+
+def noise3(x, y, z, repeatx=1024, repeaty=1024, repeatz=1024, base=0):
+    """Uma oitava de ruído de Perlin nos pontos (x, y, z) (arrays float32 de mesmo tamanho)."""
+    i = np.floor(np.fmod(x, np.float32(repeatx))).astype(np.int64)
+    j = np.floor(np.fmod(y, np.float32(repeaty))).astype(np.int64)
+    k = np.floor(np.fmod(z, np.float32(repeatz))).astype(np.int64)
+    ii = np.fmod(i + 1, repeatx)
+    jj = np.fmod(j + 1, repeaty)
+    kk = np.fmod(k + 1, repeatz)
+    i, j, k = (i & 255) + base, (j & 255) + base, (k & 255) + base
+    ii, jj, kk = (ii & 255) + base, (jj & 255) + base, (kk & 255) + base
+
+    x = x - np.floor(x)
+    y = y - np.floor(y)
+    z = z - np.floor(z)
+    fx, fy, fz = _fade(x), _fade(y), _fade(z)
+    one = np.float32(1)
+
+    a = _perm(i)
+    aa = _perm(a + j)
+    ab = _perm(a + jj)
+    b = _perm(ii)
+    ba = _perm(b + j)
+    bb = _perm(b + jj)
+
+    near = _lerp(fy, _lerp(fx, _grad(_perm(aa + k), x, y, z), _grad(_perm(ba + k), x - one, y, z)),
+                 _lerp(fx, _grad(_perm(ab + k), x, y - one, z), _grad(_perm(bb + k), x - one, y - one, z)))
+    far = _lerp(fy, _lerp(fx, _grad(_perm(aa + kk), x, y, z - one), _grad(_perm(ba + kk), x - one, y, z - one)),
+                _lerp(fx, _grad(_perm(ab + kk), x, y - one, z - one),
+                      _grad(_perm(bb + kk), x - one, y - one, z - one)))
+    return _lerp(fz, near, far)
+
+
+def pnoise3(x, y, z, octaves=1, persistence=0.5, lacunarity=2.0,
+            repeatx=1024, repeaty=1024, repeatz=1024, base=0):
+    """
+    fBm de ruído de Perlin com a mesma assinatura de `noise.pnoise3`, mas
+    vetorizado: `x`, `y` e `z` podem ser arrays (ou escalares) e o resultado
+    tem o formato deles.
+    """
+    x, y, z = np.broadcast_arrays(*(np.asarray(value, dtype=np.float32) for value in (x, y, z)))
+    shape = x.shape
+    x, y, z = x.ravel(), y.ravel(), z.ravel()
+    base = int(base)
+    if octaves <= 1:
+        return noise3(x, y, z, repeatx, repeaty, repeatz, base).reshape(shape)
+
+    freq = np.float32(1)
+    amp = np.float32(1)
+    total = np.zeros(len(x), dtype=np.float32)
+    max_amp = np.float32(0)
+    for _ in range(octaves):
+        total += noise3(x * freq, y * freq, z * freq, int(repeatx * freq), int(repeaty * freq),
+                        int(repeatz * freq), base) * amp
+        max_amp += amp
+        freq *= np.float32(lacunarity)
+        amp *= np.float32(persistence)
+    return (total / max_amp).reshape(shape)
@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: fractal_partition.py
+#
+#   Descrição:
+#   Crescimento com decomposição do domínio em processos. O espaço dos
+#   atratores é cortado em fatias ao longo do eixo mais comprido da caixa
+#   envolvente, com o mesmo número de atratores em cada uma. Cada fatia
+#   pertence a um processo, que guarda os seus atratores (ativos e
+#   estacionados) e uma cópia local dos nós que caem na fatia ou no halo em
+#   volta dela. O halo tem a largura do raio de ativação (o maior entre
+#   influence_radius e kill_distance): um atrator ativo sempre tem um nó a
+#   essa distância, então o nó mais próximo dele está na cópia local.
+#
+#   A cada iteração há uma única troca de mensagens: o coordenador manda a
+#   cada processo os nós novos que caem no seu halo; o processo ativa os
+#   atratores alcançados, poda, associa os atratores aos nós e devolve as
+#   direções unitárias. O coordenador soma as direções na mesma ordem do
+#   motor serial (ordem de ativação, depois ordem original do atrator) e
+#   cria os nós novos, então a árvore é idêntica à de
+#   fractal_growth.SpaceColonization com qualquer número de processos.
+#
+#   Só o modo com raio de influência é particionado (sem ele todo atrator
+#   enxerga todos os nós e não há halo finito). Passos extras
+#   (max_substeps), amostragem em rodízio e restrição a volume continuam
+#   só no motor serial.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import multiprocessing
+import os
+
+import numpy as np
+
+import fractal_growth
+import fractal_profile
+
+# Folga relativa do halo: um nó a exatamente o raio de ativação (com
+# arredondamento na distância ao quadrado) ainda entra na cópia local
+HALO_SLACK = 1e-6
+
+
+# =============================================================================
+# FATIAS
+# =============================================================================
+def split_slabs(points, workers):
+    """
+    Eixo de corte (o mais comprido da caixa envolvente) e os `workers` - 1
+    limites entre fatias, nos quantis da coordenada dos `points`.
+    """
+    axis = int(np.argmax(np.ptp(points, axis=0))) if len(points) else 0
+    if workers <= 1 or len(points) == 0:
+        return axis, np.empty(0)
+    return axis, np.quantile(points[:, axis], np.arange(1, workers) / workers)
+
+
+def slab_of(points, axis, bounds):
+    """Índice da fatia de cada ponto (a fatia k vai de bounds[k-1] inclusive a bounds[k])."""
+    return np.searchsorted(bounds, points[:, axis], side='right')
+
+
+# =============================================================================
+# PROCESSO DE UMA FATIA
+# =============================================================================
+class _Slab:
+    """
+    Estado de uma fatia dentro do seu processo: atratores ativos (com a chave
+    de ordem serial), atratores estacionados e a cópia local dos nós do halo
+    com os seus índices globais.
+    """
+
+    def __init__(self, setup):
+        self.dtype = np.dtype(setup['dtype'])
+        self.kill_distance = setup['kill_distance']
+        self.stagnation_limit = setup['stagnation_limit']
+        dim = setup['dim']
+
+        self.attractors = setup['attractors']
+        self.closest = setup['closest']
+        self.stagnation = setup['stagnation']
+        # Chave da ordem serial: iteração de ativação e posição na ativação
+        self.when = setup['when']
+        self.rank = setup['rank']
+        self.parked = fractal_growth.ParkedAttractors(setup['parked'], setup['parked_rank'],
+                                                      setup['activation_radius'])
+
+        self._positions = np.empty((max(1024, len(setup['node_ids'])), dim), dtype=self.dtype)
+        self._ids = np.empty(len(self._positions), dtype=np.int64)
+        self.count = 0
+        self._append(setup['node_ids'], setup['node_positions'])
+        # Nós locais ainda não testados na poda por proximidade
+        self._untested_from = int(np.searchsorted(self._ids[:self.count], setup['untested_from']))
+
+    def _append(self, ids, positions):
+        needed = self.count + len(ids)
+        if needed > len(self._positions):
+            capacity = max(needed, 2 * len(self._positions))
+            self._positions = np.resize(self._positions, (capacity, self._positions.shape[1]))
+            self._ids = np.resize(self._ids, capacity)
+        self._positions[self.count:needed] = positions
+        self._ids[self.count:needed] = ids
+        self.count = needed
+
+    def _activate(self, nodes, iteration):
+        chosen = self.parked.activate_near(nodes)
+        if len(chosen):
+            self.attractors = np.concatenate([self.attractors, self.parked.positions[chosen]])
+            self.closest = np.concatenate([self.closest, np.full(len(chosen), -1, dtype=np.int64)])
+            self.stagnation = np.concatenate([self.stagnation, np.zeros(len(chosen), dtype=np.int64)])
+            self.when = np.concatenate([self.when, np.full(len(chosen), iteration, dtype=np.int64)])
+            self.rank = np.concatenate([self.rank, self.parked.ids[chosen]])
+
+    def update(self, iteration, ids, positions):
+        """Parte das etapas b e c do motor serial: recebe os nós novos, ativa e poda."""
+        self._append(ids, positions)
+        self._activate(positions, iteration)
+        stagnated = self.stagnation >= self.stagnation_limit
+        untested = self._positions[self._untested_from:self.count]
+        near = np.zeros(len(self.attractors), dtype=bool)
+        near[~stagnated] = fractal_growth.any_within(self.attractors[~stagnated], untested, self.kill_distance)
+        self._untested_from = self.count
+        removed = stagnated | near
+        if removed.any():
+            keep = ~removed
+            self.attractors = self.attractors[keep]
+            self.closest = self.closest[keep]
+            self.stagnation = self.stagnation[keep]
+            self.when = self.when[keep]
+            self.rank = self.rank[keep]
+        return int(near.sum()), int(stagnated.sum())
+
+    def associate(self):
+        """Etapa a do motor serial: direções unitárias dos atratores ativos e os nós donos (globais)."""
+        local, _ = fractal_growth.nearest_nodes(self.attractors, self._positions[:self.count])
+        closest = self._ids[local]
+        self.stagnation = np.where(closest == self.closest, self.stagnation + 1, 1)
+        self.closest = closest
+        direction = self.attractors - self._positions[local]
+        norm = np.sqrt((direction ** 2).sum(axis=1))
+        valid = norm > 0
+        return {'owners': closest[valid], 'unit': direction[valid] / norm[valid, None],
+                'when': self.when[valid], 'rank': self.rank[valid],
+                'active': len(self.attractors), 'parked': len(self.parked)}
+
+
+def _serve(conn):
+    """Laço do processo de uma fatia: ('update', iteração, ids, posições) até receber None."""
+    slab = None
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        if message[0] == 'setup':
+            slab = _Slab(message[1])
+            reply = slab.associate()
+        else:
+            _, iteration, ids, positions = message
+            removed = slab.update(iteration, ids, positions)
+            reply = slab.associate()
+            reply['removed'] = removed
+        conn.send(reply)
+    conn.close()
+
+
+# =============================================================================
+# COORDENADOR
+# =============================================================================
+class PartitionedColonization:
+    """
+    Mesma interface de fractal_growth.SpaceColonization (step, run, tree,
+    done, node_count, iterations, remaining_attractors), com os atratores
+    repartidos em `workers` processos por fatias do espaço. O coordenador
+    guarda só a árvore; cada processo guarda os atratores da sua fatia e os
+    nós do seu halo. Checkpoints não são gravados neste modo.
+
+    Use `from_engine` para particionar um motor serial recém-criado (ou
+    retomado de checkpoint) e `close()` (ou `with`) para encerrar os
+    processos; `run()` os encerra ao terminar.
+    """
+
+    def __init__(self, attractors, positions, parents, step_size, kill_distance,
+                 stagnation_limit, influence_radius, workers=None, births=None, dtype=None):
+        engine = fractal_growth.SpaceColonization(attractors, positions, parents, step_size, kill_distance,
+                                                  stagnation_limit, births=births,
+                                                  influence_radius=influence_radius, dtype=dtype)
+        self._setup(engine, workers)
+
+    @classmethod
+    def from_engine(cls, engine, workers=None):
+        """Reparte o estado de um SpaceColonization (o motor serial não deve mais ser usado)."""
+        partitioned = cls.__new__(cls)
+        partitioned._setup(engine, workers)
+        return partitioned
+
+    def _setup(self, engine, workers):
+        if not engine.influence_radius:
+            raise ValueError("O crescimento particionado exige raio de influência (influence_radius).")
+        if engine.max_substeps > 1 or engine.sample_period > 1 or engine.constraint is not None:
+            raise ValueError("O crescimento particionado não aceita passos extras, amostragem "
+                             "nem restrição a volume.")
+        self.dtype = engine.dtype
+        self.dim = engine.dim
+        self.step_size = engine.step_size
+        self.kill_distance = engine.kill_distance
+        self.initial_attractors = engine.initial_attractors
+        self.iterations = engine.iterations
+        self.profiler = fractal_profile.NULL_PROFILER
+        self._positions = engine._positions.copy()
+        self._parents = engine._parents.copy()
+        self._births = engine._births.copy()
+        self.node_count = engine.node_count
+
+        # Ordem serial: os ativos já estão em ordem; os estacionados entram
+        # depois, pela posição deles entre os estacionados
+        parked, _ = engine.parked.remaining()
+        everything = np.concatenate([engine.attractors, parked])
+        self.workers = max(1, min(int(workers or os.cpu_count() or 1), max(1, len(everything))))
+        self.axis, self.bounds = split_slabs(everything, self.workers)
+        radius = engine.parked.radius
+        self.halo = radius * (1 + HALO_SLACK)
+        active_slab = slab_of(engine.attractors, self.axis, self.bounds)
+        parked_slab = slab_of(parked, self.axis, self.bounds)
+
+        # 'spawn' em todas as plataformas: os processos partem limpos, sem
+        # herdar as threads dos kernels do Numba nem a memória do coordenador
+        context = multiprocessing.get_context('spawn')
+        self._connections, self._processes = [], []
+        self._ranges = []
+        node_axis = self.positions[:, self.axis]
+        for slab in range(self.workers):
+            mine, mine_parked = active_slab == slab, parked_slab == slab
+            coordinate = everything[:, self.axis][np.concatenate([mine, mine_parked])]
+            low, high = (coordinate.min(), coordinate.max()) if len(coordinate) else (np.inf, -np.inf)
+            self._ranges.append((low - self.halo, high + self.halo))
+            in_halo = np.flatnonzero((node_axis >= low - self.halo) & (node_axis <= high + self.halo))
+            setup = {'dtype': self.dtype.name, 'dim': self.dim, 'kill_distance': self.kill_distance,
+                     'stagnation_limit': engine.stagnation_limit, 'activation_radius': radius,
+                     'attractors': engine.attractors[mine], 'closest': engine.closest[mine].astype(np.int64),
+                     'stagnation': engine.stagnation[mine],
+                     'when': np.full(int(mine.sum()), -1, dtype=np.int64),
+                     'rank': np.flatnonzero(mine).astype(np.int64),
+                     'parked': parked[mine_parked], 'parked_rank': np.flatnonzero(mine_parked),
+                     'node_ids': in_halo, 'node_positions': self.positions[in_halo],
+                     'untested_from': engine._untested_from}
+            parent_end, child_end = context.Pipe()
+            process = context.Process(target=_serve, args=(child_end,), daemon=True)
+            process.start()
+            child_end.close()
+            parent_end.send(('setup', setup))
+            self._connections.append(parent_end)
+            self._processes.append(process)
+        self._replies = [conn.recv() for conn in self._connections]
+
+    # --- Estado --------------------------------------------------------------------
+    # Nós guardados como no motor serial, em arrays com folga
+    _append_nodes = fractal_growth.SpaceColonization._append_nodes
+    positions = fractal_growth.SpaceColonization.positions
+    parents = fractal_growth.SpaceColonization.parents
+    births = fractal_growth.SpaceColonization.births
+
+    @property
+    def active_attractors(self):
+        return sum(reply['active'] for reply in self._replies)
+
+    @property
+    def done(self):
+        return self.active_attractors == 0
+
+    @property
+    def remaining_attractors(self):
+        return sum(reply['active'] + reply['parked'] for reply in self._replies)
+
+    def tree(self):
+        """Cópia da árvore atual como arrays (posições, pais, nascimentos)."""
+        return {'positions': self.positions.copy(), 'parents': self.parents.copy(),
+                'births': self.births.copy()}
+
+    # --- Uma iteração --------------------------------------------------------------
+    def step(self):
+        """Executa uma iteração e retorna um resumo do que aconteceu."""
+        self.iterations += 1
+        profiler = self.profiler
+
+        # a. Junta as associações das fatias na ordem do motor serial
+        with profiler.phase('associate'):
+            replies = self._replies
+            when = np.concatenate([reply['when'] for reply in replies])
+            rank = np.concatenate([reply['rank'] for reply in replies])
+            order = np.lexsort((rank, when))
+            owners = np.concatenate([reply['owners'] for reply in replies])[order]
+            unit = np.concatenate([reply['unit'].reshape(-1, self.dim) for reply in replies])[order]
+
+        # b. Crescimento: direção média dos atratores de cada nó
+        with profiler.phase('grow'):
+            sums, counts = fractal_growth.accumulate_directions(owners, unit, self.node_count, self.dtype)
+            growing = np.flatnonzero(counts)
+            avg_direction = sums[growing] / counts[growing, None]
+            avg_norm = np.sqrt((avg_direction ** 2).sum(axis=1))
+            ok = avg_norm > 0
+            growing = growing[ok]
+            new_positions = self.positions[growing] + avg_direction[ok] / avg_norm[ok, None] * self.step_size
+            new_ids = self.node_count + np.arange(len(growing))
+            self._append_nodes(new_positions, growing, np.full(len(growing), self.iterations, dtype=np.int32))
+
+        # c. Troca de halos: cada fatia recebe os nós novos ao seu alcance, ativa,
+        # poda e já associa para a próxima iteração
+        with profiler.phase('exchange'):
+            coordinate = new_positions[:, self.axis]
+            for conn, (low, high) in zip(self._connections, self._ranges):
+                sent = (coordinate >= low) & (coordinate <= high)
+                conn.send(('update', self.iterations, new_ids[sent], new_positions[sent]))
+            self._replies = [conn.recv() for conn in self._connections]
+
+        near = sum(reply['removed'][0] for reply in self._replies)
+        stagnated = sum(reply['removed'][1] for reply in self._replies)
+        info = {'iteration': self.iterations, 'new_nodes': len(growing),
+                'removed_by_proximity': near, 'removed_by_stagnation': stagnated}
+        profiler.count('new_nodes', info['new_nodes'])
+        profiler.count('removed_by_proximity', near)
+        profiler.count('removed_by_stagnation', stagnated)
+        profiler.end_step('iteration', self.iterations, nodes=self.node_count,
+                          attractors=self.active_attractors,
+                          parked=self.remaining_attractors - self.active_attractors)
+        return info
+
+    def run(self, on_iteration=None, checkpointer=None, extra_state=None, guard=None):
+        """
+        Itera até acabarem os atratores (ou o `guard` parar) e encerra os
+        processos. `checkpointer` e `extra_state` existem só pela mesma
+        assinatura de SpaceColonization.run: este modo não grava checkpoints.
+        """
+        try:
+            while not self.done:
+                info = self.step()
+                if on_iteration is not None:
+                    on_iteration(self, info)
+                if guard is not None and guard.update(self.iterations, self.node_count,
+                                                      (self.active_attractors, self.remaining_attractors)):
+                    break
+        finally:
+            self.close()
+        return self.tree()
+
+    def close(self):
+        """Encerra os processos das fatias."""
+        for conn in self._connections:
+            try:
+                conn.send(None)
+                conn.close()
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join()
+        self._connections, self._processes = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: fractal_profile.py
+#
+#   Descrição:
+#   Instrumentação leve dos laços principais: mede o tempo de cada fase por
+#   iteração (associate, grow, prune, render, disk_write, encode) e conta
+#   nós, atratores e remoções por proximidade e por estagnação.
+#
+#   Os resumos são enviados pela mesma `output_queue` do progresso (aparecem
+#   no log da GUI e no console do fractal_cli.py) e, com
+#   params['profile_path'], o perfil completo da execução é gravado em JSON
+#   ou CSV (conforme a extensão).
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import collections
+import contextlib
+import csv
+import json
+import time
+
+# De quantas em quantas iterações o resumo do perfil é enviado para a fila
+REPORT_INTERVAL = 25
+
+# 'ring' só existe na colônia (geração de um novo anel de atratores) e
+# 'exchange' no crescimento particionado (troca de halos com os processos)
+PHASES = ('ring', 'associate', 'grow', 'prune', 'exchange', 'render', 'disk_write', 'encode')
+
+
+class PhaseProfiler:
+    """
+    Acumula o tempo por fase e os contadores de cada passo (iteração ou quadro).
+
+    Os resumos usam só totais acumulados e uma janela com os últimos
+    REPORT_INTERVAL passos, então o custo por passo é constante mesmo em
+    execuções de horas. A lista completa de passos (`rows`) só é guardada com
+    `keep_rows` (params['profile_path'], veja `from_params`).
+    """
+
+    def __init__(self, keep_rows=False):
+        self.rows = [] if keep_rows else None
+        self.totals = {}
+        self.counters = {}
+        # Passos de cada tipo, passos em que cada fase apareceu e totais por tipo
+        self.steps = {}
+        self._phase_steps = {}
+        self._kind_totals = {}
+        self._recent = {}
+        self._step_times = {}
+        self._step_counts = {}
+        self._start = time.perf_counter()
+
+    @classmethod
+    def from_params(cls, params):
+        """Perfilador que guarda todos os passos só se houver params['profile_path']."""
+        return cls(keep_rows=bool(params.get('profile_path')))
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._step_times[name] = self._step_times.get(name, 0.0) + elapsed
+            self.totals[name] = self.totals.get(name, 0.0) + elapsed
+
+    def count(self, name, amount=1):
+        self._step_counts[name] = self._step_counts.get(name, 0) + amount
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def end_step(self, kind, index, **gauges):
+        """Fecha o passo atual (kind = 'iteration' ou 'frame') com medidas instantâneas."""
+        row = {'kind': kind, 'index': index}
+        row.update({f'{name}_ms': round(seconds * 1000, 4) for name, seconds in self._step_times.items()})
+        row.update(self._step_counts)
+        row.update(gauges)
+        self.steps[kind] = self.steps.get(kind, 0) + 1
+        kind_totals = self._kind_totals.setdefault(kind, {})
+        for name, seconds in self._step_times.items():
+            self._phase_steps[name] = self._phase_steps.get(name, 0) + 1
+            kind_totals[name] = kind_totals.get(name, 0.0) + seconds
+        self._recent.setdefault(kind, collections.deque(maxlen=REPORT_INTERVAL)).append(row)
+        if self.rows is not None:
+            self.rows.append(row)
+        self._step_times = {}
+        self._step_counts = {}
+
+    def summary(self):
+        """Totais por fase (segundos, média por passo e fração do total medido)."""
+        measured = sum(self.totals.values()) or 1.0
+        phases = {}
+        for name, seconds in self.totals.items():
+            steps = self._phase_steps.get(name) or 1
+            phases[name] = {'total_s': round(seconds, 4),
+                            'mean_ms': round(1000 * seconds / steps, 4),
+                            'share': round(seconds / measured, 4)}
+        return {'wall_s': round(time.perf_counter() - self._start, 4),
+                'phases': phases, 'counters': dict(self.counters)}
+
+    def status_text(self, last=REPORT_INTERVAL, kind='iteration'):
+        """
+        Linha de log com a média por fase dos últimos `last` passos (no máximo
+        REPORT_INTERVAL) ou, com `last=None`, da execução inteira.
+        """
+        recent = self._recent.get(kind)
+        if not recent:
+            return "Perfil: sem dados."
+        if last is None:
+            count = self.steps[kind]
+            means = {name: 1000 * seconds / count for name, seconds in self._kind_totals[kind].items()}
+        else:
+            rows = list(recent)[-last:]
+            count = len(rows)
+            means = {}
+            for row in rows:
+                for name in PHASES:
+                    if f'{name}_ms' in row:
+                        means[name] = means.get(name, 0.0) + row[f'{name}_ms'] / count
+        parts = [f"{name} {means[name]:.2f} ms" for name in PHASES if name in means]
+        last_row = recent[-1]
+        gauges = [f"{key} {last_row[key]}" for key in ('nodes', 'attractors') if key in last_row]
+        removed = [f"{key} {self.counters[key]}" for key in ('removed_by_proximity', 'removed_by_stagnation')
+                   if key in self.counters]
+        return f"Perfil ({count} {kind}s): " + ", ".join(parts) + " | " + ", ".join(gauges + removed)
+
+    def report(self, output_queue, kind='iteration'):
+        output_queue.put({'status': self.status_text(kind=kind), 'profile': self.summary()})
+
+    def write(self, path):
+        """Grava o perfil completo em JSON ou CSV (pela extensão de `path`)."""
+        rows = self.rows or []
+        if path.lower().endswith('.csv'):
+            fields = []
+            for row in rows:
+                fields.extend(key for key in row if key not in fields)
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'summary': self.summary(), 'steps': rows}, f, indent=1)
+
+    def finish(self, params, output_queue=None):
+        """Envia o resumo final e grava o arquivo de params['profile_path'], se houver."""
+        summary = self.summary()
+        phases = ", ".join(f"{name} {data['total_s']:.2f} s ({100 * data['share']:.0f}%)"
+                           for name, data in summary['phases'].items())
+        if output_queue is not None:
+            output_queue.put({'status': f"Perfil total: {phases}", 'profile': summary})
+        if params.get('profile_path'):
+            self.write(params['profile_path'])
+        return summary
+
+
+class NullProfiler:
+    """Perfilador que não mede nada (padrão quando nenhum é informado)."""
+
+    def phase(self, name):
+        return contextlib.nullcontext()
+
+    def count(self, name, amount=1):
+        pass
+
+    def end_step(self, kind, index, **gauges):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
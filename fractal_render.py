@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: fractal_render.py
+#
+#   Descrição:
+#   Desenho da árvore (arrays de fractal_growth.py) com Pillow: imagem final
+#   e quadros do crescimento para os vídeos. Os quadros são reconstruídos a
+#   partir da iteração de nascimento de cada nó, desenhando de forma
+#   incremental na mesma tela apenas os galhos novos de cada quadro.
+#
+#   Para a árvore 3D, um "turntable" em software (só CPU, NumPy): a câmera
+#   orbita a árvore em perspectiva, os galhos são amostrados em pixels todos
+#   de uma vez, com z-buffer, e escurecem com a profundidade. Os quadros
+#   (crescimento, rotação ou os dois) saem no mesmo formato de
+#   iter_growth_frames e vão para o mesmo codificador dos vídeos 2D.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import math
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+import fractal_profile
+
+
+def new_canvas(size, bg_color=None):
+    """Tela RGB com a cor de fundo, ou RGBA transparente se `bg_color` for None."""
+    if bg_color is None:
+        return Image.new('RGBA', size, (0, 0, 0, 0))
+    return Image.new('RGB', size, bg_color)
+
+
+def draw_segments(draw, tree, color, width, start=0, end=None):
+    """Desenha os galhos (pai -> filho) dos nós no intervalo [start, end)."""
+    positions = tree['positions']
+    parents = tree['parents']
+    end = len(parents) if end is None else end
+    for i in range(start, end):
+        parent = parents[i]
+        if parent >= 0:
+            p1 = positions[parent]
+            p2 = positions[i]
+            draw.line((p1[0], p1[1], p2[0], p2[1]), fill=color, width=width)
+
+
+def render_tree_image(tree, size, bg_color, color, width):
+    """Imagem com a árvore completa."""
+    image = new_canvas(size, bg_color)
+    draw_segments(ImageDraw.Draw(image), tree, color, width)
+    return image
+
+
+def frame_iterations(total_iterations, frame_interval):
+    """Iterações em que os scripts de vídeo capturavam quadros (múltiplos do intervalo e a última)."""
+    frames = list(range(frame_interval, total_iterations + 1, frame_interval))
+    if not frames or frames[-1] != total_iterations:
+        frames.append(total_iterations)
+    return frames
+
+
+def iter_growth_frames(tree, iterations, size, bg_color, color, width, frame_interval,
+                       profiler=fractal_profile.NULL_PROFILER):
+    """
+    Gera (índice, imagem) de cada quadro do crescimento. Os nós estão em ordem
+    de nascimento, então o quadro da iteração k contém os nós com nascimento <= k
+    e cada quadro só precisa desenhar os galhos nascidos desde o anterior.
+    A imagem entregue é uma cópia: a tela continua sendo desenhada. O desenho
+    é medido na fase 'render' do `profiler`.
+    """
+    canvas = new_canvas(size, bg_color)
+    draw = ImageDraw.Draw(canvas)
+    births = tree['births']
+    drawn = 0
+    for index, iteration in enumerate(frame_iterations(iterations, frame_interval)):
+        with profiler.phase('render'):
+            upto = int(np.searchsorted(births, iteration, side='right'))
+            draw_segments(draw, tree, color, width, drawn, upto)
+            drawn = upto
+            frame = canvas.copy()
+        yield index, frame
+
+
+# =============================================================================
+# TURNTABLE 3D
+# =============================================================================
+# Modos do turntable: o que muda de um quadro para o outro
+TURNTABLE_MODES = ('growth', 'rotation', 'both')
+# Abertura vertical da câmera em graus e distância em raios da esfera envolvente
+CAMERA_FOV = 40.0
+CAMERA_DISTANCE = 3.2
+# Brilho do galho mais distante (o mais próximo tem brilho 1)
+FAR_SHADE = 0.3
+
+
+def orbit_camera(tree, azimuth, elevation):
+    """Câmera em órbita (eixo z para cima) olhando o centro da caixa envolvente da árvore."""
+    positions = np.asarray(tree['positions'], dtype=float)
+    low, high = positions.min(axis=0), positions.max(axis=0)
+    target = (low + high) / 2
+    radius = max(float(np.linalg.norm(high - low)) / 2, 1e-9)
+    distance = CAMERA_DISTANCE * radius
+    eye = target + distance * np.array([math.cos(elevation) * math.cos(azimuth),
+                                        math.cos(elevation) * math.sin(azimuth), math.sin(elevation)])
+    forward = (target - eye) / distance
+    right = np.cross(forward, (0.0, 0.0, 1.0))
+    right /= max(np.linalg.norm(right), 1e-12)
+    return {'eye': eye, 'right': right, 'up': np.cross(right, forward), 'forward': forward,
+            'near': distance - radius, 'far': distance + radius}
+
+
+def project_points(points, camera, size):
+    """Coordenadas de tela (x, y) e profundidade dos pontos, em perspectiva."""
+    relative = np.asarray(points, dtype=float) - camera['eye']
+    depth = relative @ camera['forward']
+    focal = (size[1] / 2) / math.tan(math.radians(CAMERA_FOV) / 2)
+    safe = np.maximum(depth, 1e-9)
+    x = size[0] / 2 + focal * (relative @ camera['right']) / safe
+    y = size[1] / 2 - focal * (relative @ camera['up']) / safe
+    return x, y, depth
+
+
+def render_tree_3d(tree, camera, size, bg_color, color, width=1, upto=None):
+    """
+    Desenha os galhos dos nós [0, upto) vistos por `camera`. Cada segmento
+    vira amostras de ~1 pixel, geradas em lote; o z-buffer fica com a mais
+    próxima de cada pixel, sombreada pela profundidade. Fundo transparente
+    se `bg_color` for None.
+    """
+    parents = np.asarray(tree['parents'])
+    upto = len(parents) if upto is None else upto
+    children = np.nonzero(parents[:upto] >= 0)[0]
+    x, y, depth = project_points(np.asarray(tree['positions'])[:upto], camera, size)
+    a, b = parents[children], children
+    visible = (depth[a] > 0) & (depth[b] > 0)
+    a, b = a[visible], b[visible]
+
+    # Amostras ao longo de cada segmento (uma por pixel do eixo mais longo)
+    samples = np.ceil(np.maximum(np.abs(x[b] - x[a]), np.abs(y[b] - y[a]))).astype(np.int64) + 1
+    segment = np.repeat(np.arange(len(a)), samples)
+    t = (np.arange(len(segment)) - np.repeat(np.cumsum(samples) - samples, samples)) / np.repeat(
+        np.maximum(samples - 1, 1), samples)
+    sa, sb = a[segment], b[segment]
+    px = x[sa] + t * (x[sb] - x[sa])
+    py = y[sa] + t * (y[sb] - y[sa])
+    pz = depth[sa] + t * (depth[sb] - depth[sa])
+    # Espessura: repete as amostras num quadrado width x width
+    if width > 1:
+        offsets = np.arange(width) - (width - 1) // 2
+        dx, dy = (grid.ravel() for grid in np.meshgrid(offsets, offsets))
+        px = (px[:, None] + dx[None, :]).ravel()
+        py = (py[:, None] + dy[None, :]).ravel()
+        pz = np.repeat(pz, len(dx))
+    ix, iy = np.rint(px).astype(np.int64), np.rint(py).astype(np.int64)
+    inside = (ix >= 0) & (ix < size[0]) & (iy >= 0) & (iy < size[1])
+    pixel = (iy * size[0] + ix)[inside]
+    pz = pz[inside]
+
+    # z-buffer: ordena por profundidade e fica com a primeira amostra de cada pixel
+    order = np.argsort(pz, kind='stable')
+    pixel, first = np.unique(pixel[order], return_index=True)
+    nearest = pz[order][first]
+    span = max(camera['far'] - camera['near'], 1e-12)
+    shade = 1.0 - (1.0 - FAR_SHADE) * np.clip((nearest - camera['near']) / span, 0.0, 1.0)
+
+    rgb = np.array(Image.new('RGB', (1, 1), color).getpixel((0, 0)), dtype=float)
+    if bg_color is None:
+        frame = np.zeros((size[1] * size[0], 4), dtype=np.uint8)
+        frame[pixel, :3] = np.rint(rgb * shade[:, None])
+        frame[pixel, 3] = 255
+        return Image.fromarray(frame.reshape(size[1], size[0], 4), 'RGBA')
+    background = np.array(Image.new('RGB', (1, 1), bg_color).getpixel((0, 0)), dtype=float)
+    frame = np.empty((size[1] * size[0], 3), dtype=np.uint8)
+    frame[:] = background.astype(np.uint8)
+    frame[pixel] = np.rint(background + (rgb - background) * shade[:, None])
+    return Image.fromarray(frame.reshape(size[1], size[0], 3), 'RGB')
+
+
+def turntable_plan(iterations, frames, mode, turns=1.0, azimuth=0.0):
+    """
+    (iteração, azimute) de cada quadro: 'growth' cresce com a câmera parada,
+    'rotation' gira a árvore completa e 'both' cresce enquanto gira.
+    """
+    if mode not in TURNTABLE_MODES:
+        raise ValueError(f"Modo de turntable inválido: '{mode}' (use {', '.join(TURNTABLE_MODES)})")
+    plan = []
+    for index in range(frames):
+        fraction = (index + 1) / frames
+        iteration = iterations if mode == 'rotation' else math.ceil(iterations * fraction)
+        angle = azimuth if mode == 'growth' else azimuth + 2 * math.pi * turns * index / frames
+        plan.append((iteration, angle))
+    return plan
+
+
+def iter_turntable_frames(tree, iterations, size, bg_color, color, width, frames, mode,
+                          turns=1.0, elevation=20.0, profiler=fractal_profile.NULL_PROFILER):
+    """
+    Gera (índice, imagem) de cada quadro do turntable da árvore 3D, como
+    iter_growth_frames. Os nós estão em ordem de nascimento: o quadro da
+    iteração k desenha os nós com nascimento <= k. `elevation` em graus.
+    """
+    births = np.asarray(tree['births'])
+    for index, (iteration, azimuth) in enumerate(turntable_plan(iterations, frames, mode, turns)):
+        with profiler.phase('render'):
+            upto = int(np.searchsorted(births, iteration, side='right'))
+            camera = orbit_camera(tree, azimuth, math.radians(elevation))
+            frame = render_tree_3d(tree, camera, size, bg_color, color, width, upto)
+        yield index, frame
@@ -32,143 +32,39 @@
 # Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
 #                                   em Realidade Aumentada
 # =============================================================================
-import tkinter as tk
-from tkinter import ttk, filedialog, colorchooser
-import numpy as np
-from PIL import Image, ImageDraw, ImageTk
-import random
-import time
+from PIL import Image
+try:
+    import tkinter as tk
+    from tkinter import ttk, filedialog, colorchooser
+    from PIL import ImageTk
+except ImportError:
+    # Nós de renderização sem Tk: o núcleo continua disponível via fractal_cli.py
+    tk = ttk = filedialog = colorchooser = ImageTk = None
 import threading
 import queue
+import fractal_growth
+import fractal_profile
+import fractal_render
 
 # =============================================================================
 # NÚCLEO DO ALGORITMO DE GERAÇÃO DO FRACTAL
 # =============================================================================
 def run_fractal_generation(params, output_queue):
     try:
-        # 1. INICIALIZAÇÃO E GERAÇÃO DE ATRATORES
-        output_queue.put({'status': 'Carregando máscara e gerando atratores...'})
-        
-        # Carrega a máscara original para uso na amostragem e para o canal alpha final
-        original_mask_img = Image.open(params['mask_path']).convert('L')
-        mask_img_for_sampling = original_mask_img.resize((params['width'], params['height']), Image.Resampling.LANCZOS)
-        mask_pixels = mask_img_for_sampling.load()
-
-        attractors = []
-        while len(attractors) < params['num_attractors']:
-            x = random.randint(0, params['width'] - 1)
-            y = random.randint(0, params['height'] - 1)
-            # Verifica a cor do pixel na máscara: se for escuro (abaixo de 128), adiciona atrator
-            if mask_pixels[x, y] < 128: 
-                attractors.append({'id': len(attractors), 'pos': np.array([x, y], dtype=float)})
-        
-        if not attractors:
-            output_queue.put({'status': 'Erro: Nenhum atrator gerado a partir da máscara.', 'progress': 100})
-            return
-
-        # 2. INICIALIZAÇÃO DA ÁRVORE
-        root_pos_x = params.get('root_x', params['width'] / 2)
-        root_pos_y = params.get('root_y', params['height'])
-        root = {'pos': np.array([root_pos_x, root_pos_y], dtype=float), 'parent': None}
-        nodes = [root]
-        current = root
-        for _ in range(5):
-            new_node = {'pos': np.array([current['pos'][0], current['pos'][1] - params['step_size']], dtype=float), 'parent': current}
-            nodes.append(new_node)
-            current = new_node
-
-        stagnation_tracker = {att['id']: {'closest_node_idx': -1, 'count': 0} for att in attractors}
-        initial_attractors = len(attractors)
-
-        # 3. PROCESSO DE CRESCIMENTO (LOOP PRINCIPAL)
-        iterations = 0
-        while attractors:
-            iterations += 1
-            
-            growth_vectors = {i: [] for i in range(len(nodes))}
-            for attractor in attractors:
-                att_pos = attractor['pos']
-                att_id = attractor['id']
-                closest_node_index = -1
-                min_dist = float('inf')
-                for i, node in enumerate(nodes):
-                    d = np.linalg.norm(att_pos - node['pos'])
-                    if d < min_dist:
-                        min_dist = d
-                        closest_node_index = i
-                
-                if stagnation_tracker[att_id]['closest_node_idx'] == closest_node_index:
-                    stagnation_tracker[att_id]['count'] += 1
-                else:
-                    stagnation_tracker[att_id]['closest_node_idx'] = closest_node_index
-                    stagnation_tracker[att_id]['count'] = 1
-                
-                direction = att_pos - nodes[closest_node_index]['pos']
-                norm = np.linalg.norm(direction)
-                if norm > 0:
-                    growth_vectors[closest_node_index].append(direction / norm)
-            
-            new_nodes = []
-            for node_index, vectors in growth_vectors.items():
-                if vectors:
-                    avg_direction = np.mean(vectors, axis=0)
-                    norm = np.linalg.norm(avg_direction)
-                    if norm > 0:
-                        avg_direction /= norm
-                        parent_node = nodes[node_index]
-                        new_pos = parent_node['pos'] + avg_direction * params['step_size']
-                        new_node = {'pos': new_pos, 'parent': parent_node}
-                        new_nodes.append(new_node)
-            nodes.extend(new_nodes)
-            
-            # Poda
-            ids_to_remove = set()
-            removed_by_proximity = 0
-            removed_by_stagnation = 0
-            for attractor in attractors:
-                att_id = attractor['id']
-                att_pos = attractor['pos']
-                if stagnation_tracker[att_id]['count'] >= params['stagnation_limit']:
-                    ids_to_remove.add(att_id)
-                    removed_by_stagnation += 1
-                    continue
-                
-                is_killed_by_proximity = False
-                for node in nodes:
-                    if np.linalg.norm(att_pos - node['pos']) < params['kill_distance']:
-                        is_killed_by_proximity = True
-                        break
-
-                if is_killed_by_proximity:
-                    ids_to_remove.add(att_id)
-                    removed_by_proximity += 1
-                    continue
-
-            if ids_to_remove:
-                attractors = [att for att in attractors if att['id'] not in ids_to_remove]
-                for att_id in ids_to_remove:
-                    if att_id in stagnation_tracker: del stagnation_tracker[att_id]
-
-            if iterations % 5 == 0 or not attractors or ids_to_remove:
-                progress = 100 * (initial_attractors - len(attractors)) / initial_attractors
-                status_text = f"Iteração {iterations}: {len(attractors)} atratores restantes..."
-                if removed_by_stagnation > 0 or removed_by_proximity > 0:
-                    status_text += f" (Removidos: {removed_by_proximity} prox, {removed_by_stagnation} estag)"
-                output_queue.put({'status': status_text, 'progress': progress})
+        # 1-3. ATRATORES, TRONCO INICIAL E CRESCIMENTO (núcleo em fractal_growth.py)
+        profiler = fractal_profile.PhaseProfiler.from_params(params)
+        tree, stats = fractal_growth.grow_mask_tree(params, output_queue, profiler)
 
         # 4. DESENHO DA IMAGEM FINAL
         output_queue.put({'status': 'Renderizando imagem final...', 'progress': 99})
-        image = Image.new('RGB', (params['width'], params['height']), params['bg_color'])
-        draw = ImageDraw.Draw(image)
-        for node in nodes:
-            if node['parent']:
-                p1 = node['parent']['pos']
-                p2 = node['pos']
-                draw.line((p1[0], p1[1], p2[0], p2[1]), fill=params['tree_color'], width=params['line_width'])
+        with profiler.phase('render'):
+            image = fractal_render.render_tree_image(tree, (params['width'], params['height']),
+                                                     params['bg_color'], params['tree_color'], params['line_width'])
+        profiler.end_step('frame', 0)
         
         # =================== MUDANÇA: APLICAR MÁSCARA ALPHA ===================
         # Redimensiona a máscara original para as dimensões finais da imagem do fractal
-        alpha_mask = original_mask_img.resize((params['width'], params['height']), Image.Resampling.LANCZOS)
+        alpha_mask = fractal_growth.load_mask(params['mask_path'], params['width'], params['height'])
         
         # O Pillow usa 255 para opaco e 0 para transparente no canal alpha.
         # Nossos atratores são gerados em áreas escuras (abaixo de 128), 
@@ -184,10 +80,11 @@ def run_fractal_generation(params, output_queue):
         image.putalpha(alpha_mask)
         # ======================================================================
         
-        output_queue.put({'status': 'Concluído!', 'progress': 100, 'image': image})
+        stats['profile'] = profiler.finish(params, output_queue)
+        output_queue.put({'status': 'Concluído!', 'progress': 100, 'image': image, 'stats': stats})
 
     except Exception as e:
-        output_queue.put({'status': f'Erro: {e}', 'progress': 100})
+        output_queue.put({'status': f'Erro: {e}', 'progress': 100, 'error': str(e)})
 
 # =============================================================================
 # CLASSE DA APLICAÇÃO TKINTER (GUI)
@@ -207,6 +104,8 @@ class FractalApp:
         self.kill_distance = tk.IntVar(value=10)
         self.step_size = tk.IntVar(value=5)
         self.stagnation_limit = tk.IntVar(value=10)
+        self.influence_radius = tk.IntVar(value=0)
+        self.max_substeps = tk.IntVar(value=1)
         self.bg_color = '#0a0a14'
         self.tree_color = '#ffffd0'
         self.line_width = tk.IntVar(value=1)
@@ -243,26 +142,28 @@ class FractalApp:
         self.create_slider(controls_inner_frame, "Distância de Remoção:", self.kill_distance, 2, 30, 3)
         self.create_slider(controls_inner_frame, "Tamanho do Passo:", self.step_size, 1, 20, 4)
         self.create_slider(controls_inner_frame, "Limite de Estagnação:", self.stagnation_limit, 5, 50, 5)
-        self.create_slider(controls_inner_frame, "Espessura da Linha:", self.line_width, 1, 10, 6)
+        self.create_slider(controls_inner_frame, "Raio de Influência (0 = todos):", self.influence_radius, 0, 300, 6)
+        self.create_slider(controls_inner_frame, "Passos por Iteração (pontas):", self.max_substeps, 1, 20, 7)
+        self.create_slider(controls_inner_frame, "Espessura da Linha:", self.line_width, 1, 10, 8)
 
         # Color Pickers
-        ttk.Label(controls_inner_frame, text="Cor do Fundo:").grid(row=7, column=0, sticky="w", pady=10)
+        ttk.Label(controls_inner_frame, text="Cor do Fundo:").grid(row=9, column=0, sticky="w", pady=10)
         self.bg_color_btn = tk.Button(controls_inner_frame, text="Escolher", bg=self.bg_color, command=lambda: self.pick_color('bg'))
-        self.bg_color_btn.grid(row=7, column=1, sticky="ew")
+        self.bg_color_btn.grid(row=9, column=1, sticky="ew")
 
-        ttk.Label(controls_inner_frame, text="Cor da Árvore:").grid(row=8, column=0, sticky="w", pady=5)
+        ttk.Label(controls_inner_frame, text="Cor da Árvore:").grid(row=10, column=0, sticky="w", pady=5)
         self.tree_color_btn = tk.Button(controls_inner_frame, text="Escolher", bg=self.tree_color, command=lambda: self.pick_color('tree'))
-        self.tree_color_btn.grid(row=8, column=1, sticky="ew")
+        self.tree_color_btn.grid(row=10, column=1, sticky="ew")
 
         # Action Buttons and Progress Bar
         self.run_button = ttk.Button(controls_inner_frame, text="Gerar Fractal", command=self.start_generation)
-        self.run_button.grid(row=9, column=0, columnspan=2, sticky="ew", pady=(20, 5))
+        self.run_button.grid(row=11, column=0, columnspan=2, sticky="ew", pady=(20, 5))
         
         self.save_button = ttk.Button(controls_inner_frame, text="Salvar Imagem...", command=self.save_image, state=tk.DISABLED)
-        self.save_button.grid(row=10, column=0, columnspan=2, sticky="ew", pady=5)
+        self.save_button.grid(row=12, column=0, columnspan=2, sticky="ew", pady=5)
 
         self.progress_bar = ttk.Progressbar(controls_inner_frame, orient='horizontal', mode='determinate')
-        self.progress_bar.grid(row=11, column=0, columnspan=2, sticky="ew", pady=5)
+        self.progress_bar.grid(row=13, column=0, columnspan=2, sticky="ew", pady=5)
         
         log_frame = ttk.Frame(self.controls_frame)
         log_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
@@ -322,6 +223,8 @@ class FractalApp:
             'kill_distance': self.kill_distance.get(),
             'step_size': self.step_size.get(),
             'stagnation_limit': self.stagnation_limit.get(),
+            'influence_radius': self.influence_radius.get() or None,
+            'max_substeps': self.max_substeps.get() if self.max_substeps.get() > 1 else None,
             'bg_color': self.bg_color,
             'tree_color': self.tree_color,
             'line_width': self.line_width.get(),
@@ -19,129 +19,78 @@
 #                   Carvalho
 # (e contribuições da IA)
 # =============================================================================
-import tkinter as tk
-from tkinter import ttk, filedialog, colorchooser
 import numpy as np
-from PIL import Image, ImageDraw, ImageTk
-import random
-import time
+from PIL import Image
+try:
+    import tkinter as tk
+    from tkinter import ttk, filedialog, colorchooser
+    from PIL import ImageTk
+except ImportError:
+    # Nós de renderização sem Tk: o núcleo continua disponível via fractal_cli.py
+    tk = ttk = filedialog = colorchooser = ImageTk = None
 import threading
 import queue
 # =================== MUDANÇA 1: IMPORTAÇÃO CORRIGIDA ===================
 import imageio.v2 as imageio
 # =====================================================================
-import os
-import tempfile
 import shutil
+import fractal_cache
+import fractal_growth
+import fractal_profile
+import fractal_render
+
+# Parâmetros de desenho que distinguem dois vídeos da mesma árvore
+VIDEO_RENDER_KEYS = ('bg_color', 'tree_color', 'line_width', 'frame_interval', 'width', 'height')
 
 # =============================================================================
 # NÚCLEO DO ALGORITMO DE GERAÇÃO DO FRACTAL E VÍDEO
 # =============================================================================
 def run_fractal_generation(params, output_queue):
-    frame_folder = tempfile.mkdtemp()
-    frame_files = []
-    
     try:
-        output_queue.put({'status': 'Carregando máscara e gerando atratores...'})
-        
-        mask_img = Image.open(params['mask_path']).convert('L')
-        mask_img = mask_img.resize((params['width'], params['height']), Image.Resampling.LANCZOS)
-        mask_pixels = mask_img.load()
-
-        attractors = []
-        while len(attractors) < params['num_attractors']:
-            x = random.randint(0, params['width'] - 1)
-            y = random.randint(0, params['height'] - 1)
-            if mask_pixels[x, y] < 128:
-                attractors.append({'id': len(attractors), 'pos': np.array([x, y], dtype=float)})
-        
-        if not attractors:
-            output_queue.put({'status': 'Erro: Nenhum atrator gerado a partir da máscara.', 'progress': 100})
-            return
-
-        root = {'pos': np.array([params['width'] / 2, params['height']], dtype=float), 'parent': None}
-        nodes = [root]
-        current = root
-        for _ in range(5):
-            new_node = {'pos': np.array([current['pos'][0], current['pos'][1] - params['step_size']], dtype=float), 'parent': current}
-            nodes.append(new_node)
-            current = new_node
-
-        stagnation_tracker = {att['id']: {'closest_node_idx': -1, 'count': 0} for att in attractors}
-        initial_attractors = len(attractors)
-
-        iterations = 0
-        while attractors:
-            iterations += 1
-            
-            growth_vectors = {i: [] for i in range(len(nodes))}
-            for attractor in attractors:
-                att_pos = attractor['pos']; att_id = attractor['id']
-                closest_node_index = -1; min_dist = float('inf')
-                for i, node in enumerate(nodes):
-                    d = np.linalg.norm(att_pos - node['pos'])
-                    if d < min_dist: min_dist = d; closest_node_index = i
-                if stagnation_tracker[att_id]['closest_node_idx'] == closest_node_index:
-                    stagnation_tracker[att_id]['count'] += 1
-                else:
-                    stagnation_tracker[att_id]['closest_node_idx'] = closest_node_index; stagnation_tracker[att_id]['count'] = 1
-                direction = att_pos - nodes[closest_node_index]['pos']; norm = np.linalg.norm(direction)
-                if norm > 0: growth_vectors[closest_node_index].append(direction / norm)
-            
-            new_nodes = []
-            for node_index, vectors in growth_vectors.items():
-                if vectors:
-                    avg_direction = np.mean(vectors, axis=0); norm = np.linalg.norm(avg_direction)
-                    if norm > 0:
-                        avg_direction /= norm; parent_node = nodes[node_index]
-                        new_pos = parent_node['pos'] + avg_direction * params['step_size']
-                        new_node = {'pos': new_pos, 'parent': parent_node}; new_nodes.append(new_node)
-            nodes.extend(new_nodes)
-            
-            ids_to_remove = set()
-            for attractor in attractors:
-                att_id = attractor['id']; att_pos = attractor['pos']
-                if stagnation_tracker[att_id]['count'] >= params['stagnation_limit']: ids_to_remove.add(att_id); continue
-                for node in nodes:
-                    if np.linalg.norm(att_pos - node['pos']) < params['kill_distance']: ids_to_remove.add(att_id); break
-            
-            if ids_to_remove:
-                attractors = [att for att in attractors if att['id'] not in ids_to_remove]
-                for att_id in ids_to_remove:
-                    if att_id in stagnation_tracker: del stagnation_tracker[att_id]
-
-            progress = 100 * (initial_attractors - len(attractors)) / initial_attractors
-            status_text = f"Iteração {iterations}: {len(attractors)} atratores restantes..."
-            output_queue.put({'status': status_text, 'progress': progress})
-
-            if iterations % params['frame_interval'] == 0 or not attractors:
-                frame_image = Image.new('RGB', (params['width'], params['height']), params['bg_color'])
-                draw = ImageDraw.Draw(frame_image)
-                for node in nodes:
-                    if node['parent']:
-                        p1 = node['parent']['pos']; p2 = node['pos']
-                        draw.line((p1[0], p1[1], p2[0], p2[1]), fill=params['tree_color'], width=params['line_width'])
-                
-                frame_path = os.path.join(frame_folder, f"frame_{len(frame_files):05d}.png")
-                frame_image.save(frame_path)
-                frame_files.append(frame_path)
-                
-                output_queue.put({'preview_frame': frame_image})
-
-        output_queue.put({'status': f'Crescimento concluído. Montando vídeo com {len(frame_files)} frames...'})
+        # Atratores, tronco inicial e crescimento (núcleo em fractal_growth.py, com cache)
+        profiler = fractal_profile.PhaseProfiler.from_params(params)
+        tree, stats = fractal_growth.grow_mask_tree(params, output_queue, profiler)
+        frame_count = len(fractal_render.frame_iterations(stats['iterations'], params['frame_interval']))
+        stats['frames'] = frame_count
+        output_path = params['output_path']
+
+        # Um vídeo idêntico (mesma árvore e mesmo desenho) já codificado é só copiado
+        cache = fractal_cache.cache_from_params(params)
+        video_name = None
+        if cache is not None and stats['cache_key'] and params.get('cache_outputs', True):
+            video_name = fractal_cache.render_file_name('mp4', params, VIDEO_RENDER_KEYS, '.mp4')
+            cached_video = cache.get_file(stats['cache_key'], video_name)
+            if cached_video is not None:
+                shutil.copyfile(cached_video, output_path)
+                stats['profile'] = profiler.finish(params, output_queue)
+                output_queue.put({'status': f'Concluído! Vídeo salvo em:\n{output_path} (cache)', 'progress': 100, 'stats': stats})
+                return
+
+        output_queue.put({'status': f'Crescimento concluído. Montando vídeo com {frame_count} frames...'})
         
-        with imageio.get_writer(params['output_path'], fps=30, macro_block_size=None) as writer:
-            for filename in frame_files:
-                image = imageio.imread(filename)
-                writer.append_data(image)
-
-        output_queue.put({'status': f'Concluído! Vídeo salvo em:\n{params["output_path"]}', 'progress': 100})
+        # Os quadros são redesenhados a partir da iteração de nascimento de cada nó
+        # e enviados direto ao codificador, sem passar por PNGs temporários.
+        frames = fractal_render.iter_growth_frames(tree, stats['iterations'], (params['width'], params['height']),
+                                                   params['bg_color'], params['tree_color'], params['line_width'],
+                                                   params['frame_interval'], profiler)
+        with imageio.get_writer(output_path, fps=30, macro_block_size=None) as writer:
+            for index, frame_image in frames:
+                with profiler.phase('encode'):
+                    writer.append_data(np.asarray(frame_image))
+                profiler.end_step('frame', index)
+                output_queue.put({'preview_frame': frame_image,
+                                  'progress': 99 * (index + 1) / frame_count})
+                if (index + 1) % fractal_profile.REPORT_INTERVAL == 0:
+                    profiler.report(output_queue, kind='frame')
+
+        if video_name is not None:
+            cache.put_file(stats['cache_key'], video_name, output_path)
+
+        stats['profile'] = profiler.finish(params, output_queue)
+        output_queue.put({'status': f'Concluído! Vídeo salvo em:\n{output_path}', 'progress': 100, 'stats': stats})
 
     except Exception as e:
-        output_queue.put({'status': f'Erro: {e}', 'progress': 100})
-    finally:
-        shutil.rmtree(frame_folder)
-
+        output_queue.put({'status': f'Erro: {e}', 'progress': 100, 'error': str(e)})
 
 # =============================================================================
 # CLASSE DA APLICAÇÃO TKINTER (GUI)
@@ -158,6 +107,8 @@ class FractalApp:
         self.kill_distance = tk.IntVar(value=10)
         self.step_size = tk.IntVar(value=5)
         self.stagnation_limit = tk.IntVar(value=10)
+        self.influence_radius = tk.IntVar(value=0)
+        self.max_substeps = tk.IntVar(value=1)
         self.line_width = tk.IntVar(value=1)
         self.frame_interval = tk.IntVar(value=5)
         self.bg_color = '#0a0a14'
@@ -182,14 +133,16 @@ class FractalApp:
         self.create_slider(f, "Distância de Remoção:", self.kill_distance, 2, 30, 3)
         self.create_slider(f, "Tamanho do Passo:", self.step_size, 1, 20, 4)
         self.create_slider(f, "Limite de Estagnação:", self.stagnation_limit, 5, 50, 5)
-        self.create_slider(f, "Espessura da Linha:", self.line_width, 1, 10, 6)
-        self.create_slider(f, "Intervalo de Frames:", self.frame_interval, 1, 50, 7)
-        ttk.Label(f, text="Cor do Fundo:").grid(row=8, column=0, sticky="w", pady=10)
-        self.bg_color_btn = tk.Button(f, text="Escolher", bg=self.bg_color, command=lambda: self.pick_color('bg')); self.bg_color_btn.grid(row=8, column=1, columnspan=2, sticky="ew")
-        ttk.Label(f, text="Cor da Árvore:").grid(row=9, column=0, sticky="w", pady=5)
-        self.tree_color_btn = tk.Button(f, text="Escolher", bg=self.tree_color, command=lambda: self.pick_color('tree')); self.tree_color_btn.grid(row=9, column=1, columnspan=2, sticky="ew")
-        self.run_button = ttk.Button(f, text="Gerar Vídeo...", command=self.start_generation); self.run_button.grid(row=10, column=0, columnspan=3, sticky="ew", pady=(20, 5))
-        self.progress_bar = ttk.Progressbar(f, orient='horizontal', mode='determinate'); self.progress_bar.grid(row=11, column=0, columnspan=3, sticky="ew", pady=5)
+        self.create_slider(f, "Raio de Influência (0 = todos):", self.influence_radius, 0, 300, 6)
+        self.create_slider(f, "Passos por Iteração (pontas):", self.max_substeps, 1, 20, 7)
+        self.create_slider(f, "Espessura da Linha:", self.line_width, 1, 10, 8)
+        self.create_slider(f, "Intervalo de Frames:", self.frame_interval, 1, 50, 9)
+        ttk.Label(f, text="Cor do Fundo:").grid(row=10, column=0, sticky="w", pady=10)
+        self.bg_color_btn = tk.Button(f, text="Escolher", bg=self.bg_color, command=lambda: self.pick_color('bg')); self.bg_color_btn.grid(row=10, column=1, columnspan=2, sticky="ew")
+        ttk.Label(f, text="Cor da Árvore:").grid(row=11, column=0, sticky="w", pady=5)
+        self.tree_color_btn = tk.Button(f, text="Escolher", bg=self.tree_color, command=lambda: self.pick_color('tree')); self.tree_color_btn.grid(row=11, column=1, columnspan=2, sticky="ew")
+        self.run_button = ttk.Button(f, text="Gerar Vídeo...", command=self.start_generation); self.run_button.grid(row=12, column=0, columnspan=3, sticky="ew", pady=(20, 5))
+        self.progress_bar = ttk.Progressbar(f, orient='horizontal', mode='determinate'); self.progress_bar.grid(row=13, column=0, columnspan=3, sticky="ew", pady=5)
         log_frame = ttk.Frame(self.controls_frame); log_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
         self.log_box = tk.Text(log_frame, height=8, wrap=tk.WORD, state=tk.DISABLED, bg="#2b2b2b", fg="white", relief=tk.SOLID, borderwidth=1); self.log_box.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar = ttk.Scrollbar(log_frame, orient='vertical', command=self.log_box.yview); scrollbar.pack(side=tk.RIGHT, fill=tk.Y); self.log_box['yscrollcommand'] = scrollbar.set
@@ -212,6 +165,8 @@ class FractalApp:
             'mask_path': self.mask_path.get(), 'num_attractors': self.num_attractors.get(),
             'kill_distance': self.kill_distance.get(), 'step_size': self.step_size.get(),
             'stagnation_limit': self.stagnation_limit.get(), 'bg_color': self.bg_color,
+            'influence_radius': self.influence_radius.get() or None,
+            'max_substeps': self.max_substeps.get() if self.max_substeps.get() > 1 else None,
             'tree_color': self.tree_color, 'line_width': self.line_width.get(),
             'frame_interval': self.frame_interval.get(), 'output_path': output_path,
             # =================== MUDANÇA 2: DIMENSÃO CORRIGIDA ===================
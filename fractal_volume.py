@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: fractal_volume.py
+#
+#   Descrição:
+#   Consultas ao volume de uma malha 3D fechada em NumPy puro (sem rtree nem
+#   embree): teste em lote de pontos dentro da malha e amostragem uniforme
+#   dos atratores por rejeição, em lotes, sem montar a grade de voxels.
+#
+#   O teste de dentro/fora lança de cada ponto um raio no sentido +z e conta
+#   os triângulos cruzados (paridade). Os triângulos ficam em baldes de uma
+#   grade no plano xy, então cada ponto só é testado contra os triângulos
+#   da sua coluna. Pontos exatamente sobre uma aresta (medida nula para
+#   pontos sorteados) podem ser classificados para qualquer lado.
+#
+#   SignedDistanceGrid pré-calcula a distância com sinal (negativa dentro)
+#   numa grade regular, e VolumeConstraint a usa para manter os galhos
+#   dentro da malha: cada iteração faz uma consulta em lote (interpolação
+#   trilinear na grade) em vez de testar cada nó contra a malha.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import math
+
+import numpy as np
+
+# Memória de trabalho padrão da amostragem por rejeição
+DEFAULT_MAX_MB = 64
+# Bytes por par (ponto, triângulo) testado: ~12 arrays temporários de 8 bytes
+PAIR_BYTES = 96
+# Bytes por ponto candidato do lote (coordenadas, célula, paridade, máscara)
+CANDIDATE_BYTES = 64
+# Desiste se nenhum candidato cair dentro após este múltiplo do esperado
+MAX_CANDIDATE_FACTOR = 100
+# Células da grade de distância no maior eixo da malha
+DEFAULT_SDF_RESOLUTION = 64
+# Células de folga em volta da malha (para haver "fora" em todas as bordas)
+SDF_PADDING = 2
+# Modos da restrição ao volume
+CONTAINMENT_MODES = ('reject', 'project')
+
+
+class MeshVolume:
+    """Malha triangular fechada com os triângulos agrupados em colunas de uma grade xy."""
+
+    def __init__(self, vertices, faces, max_mb=DEFAULT_MAX_MB):
+        self.triangles = np.asarray(vertices, dtype=float)[np.asarray(faces)]
+        self.bounds = np.array([self.triangles.reshape(-1, 3).min(axis=0),
+                                self.triangles.reshape(-1, 3).max(axis=0)])
+        self.max_pairs = max(1, int(max_mb * 1024 * 1024 / PAIR_BYTES))
+
+        # ~1 triângulo por coluna em média (grade quadrada no plano xy)
+        cells = max(1, int(math.sqrt(len(self.triangles))))
+        extent = np.maximum(self.bounds[1, :2] - self.bounds[0, :2], 1e-12)
+        self.grid_shape = (cells, cells)
+        self.cell_size = extent / cells
+
+        tri_min = self._cell_of(self.triangles[:, :, :2].min(axis=1))
+        tri_max = self._cell_of(self.triangles[:, :, :2].max(axis=1))
+        spans = tri_max - tri_min + 1
+        per_tri = spans[:, 0] * spans[:, 1]
+        tri_ids = np.repeat(np.arange(len(self.triangles)), per_tri)
+        # Posição de cada célula dentro do retângulo de células do seu triângulo
+        offsets = np.arange(len(tri_ids)) - np.repeat(np.cumsum(per_tri) - per_tri, per_tri)
+        cx = tri_min[tri_ids, 0] + offsets % spans[tri_ids, 0]
+        cy = tri_min[tri_ids, 1] + offsets // spans[tri_ids, 0]
+        cell_ids = cx * cells + cy
+        order = np.argsort(cell_ids, kind='stable')
+        self.cell_triangles = tri_ids[order]
+        self.cell_start = np.searchsorted(cell_ids[order], np.arange(cells * cells + 1))
+
+    def _cell_of(self, xy):
+        cells = np.floor((xy - self.bounds[0, :2]) / self.cell_size).astype(np.int64)
+        return np.clip(cells, 0, np.array(self.grid_shape) - 1)
+
+    def contains(self, points):
+        """Máscara booleana dos pontos (N, 3) que estão dentro da malha."""
+        points = np.asarray(points, dtype=float)
+        inside = np.zeros(len(points), dtype=bool)
+        in_box = np.all((points >= self.bounds[0]) & (points <= self.bounds[1]), axis=1)
+        candidates = np.nonzero(in_box)[0]
+        if len(candidates) == 0:
+            return inside
+
+        cell = self._cell_of(points[candidates, :2])
+        cell = cell[:, 0] * self.grid_shape[1] + cell[:, 1]
+        counts = self.cell_start[cell + 1] - self.cell_start[cell]
+        # Pontos em blocos: o número de pares (ponto, triângulo) cabe em max_pairs
+        ends = np.cumsum(counts)
+        start = 0
+        while start < len(candidates):
+            base = ends[start - 1] if start else 0
+            stop = max(start + 1, int(np.searchsorted(ends, base + self.max_pairs, side='right')))
+            block = slice(start, stop)
+            crossings = self._crossings(points[candidates[block]], cell[block], counts[block])
+            inside[candidates[block]] = crossings % 2 == 1
+            start = stop
+        return inside
+
+    def _crossings(self, points, cell, counts):
+        """Número de triângulos cruzados pelo raio +z de cada ponto."""
+        total = int(counts.sum())
+        pair_point = np.repeat(np.arange(len(points)), counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        tri = self.triangles[self.cell_triangles[self.cell_start[cell][pair_point] + offsets]]
+        p = points[pair_point]
+
+        # Funções de aresta no plano xy: o ponto está dentro do triângulo projetado
+        # se as três têm o mesmo sinal; com elas, interpola o z do cruzamento
+        a, b, c = tri[:, 0], tri[:, 1], tri[:, 2]
+        w0 = (b[:, 0] - p[:, 0]) * (c[:, 1] - p[:, 1]) - (b[:, 1] - p[:, 1]) * (c[:, 0] - p[:, 0])
+        w1 = (c[:, 0] - p[:, 0]) * (a[:, 1] - p[:, 1]) - (c[:, 1] - p[:, 1]) * (a[:, 0] - p[:, 0])
+        w2 = (a[:, 0] - p[:, 0]) * (b[:, 1] - p[:, 1]) - (a[:, 1] - p[:, 1]) * (b[:, 0] - p[:, 0])
+        area = w0 + w1 + w2
+        orientation = np.sign(area)
+        # Ponto exatamente sobre uma aresta (ou vértice) compartilhada: a aresta
+        # pertence a só um dos triângulos vizinhos, pela direção dela no sentido
+        # anti-horário (regra "top-left"), e o cruzamento é contado uma vez só
+        hit = area != 0
+        for w, start, end in ((w0, b, c), (w1, c, a), (w2, a, b)):
+            edge_x = (end[:, 0] - start[:, 0]) * orientation
+            edge_y = (end[:, 1] - start[:, 1]) * orientation
+            owned = (edge_y > 0) | ((edge_y == 0) & (edge_x < 0))
+            side = w * orientation
+            hit &= (side > 0) | ((side == 0) & owned)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            z = (w0 * a[:, 2] + w1 * b[:, 2] + w2 * c[:, 2]) / area
+        hit &= z > p[:, 2]
+        return np.bincount(pair_point[hit], minlength=len(points))
+
+
+def sample_volume(volume, count, rng, expected_volume=None, max_mb=DEFAULT_MAX_MB):
+    """
+    Sorteia `count` pontos uniformes dentro de `volume` (MeshVolume) por
+    rejeição: candidatos em lotes na caixa envolvente, testados em lote e
+    aceitos na ordem do sorteio até completar `count`. A memória de cada lote
+    fica em torno de `max_mb`; como `rng.uniform` consome a mesma sequência em
+    lotes de qualquer tamanho, o resultado não depende de `max_mb`.
+    Retorna um array (count, 3), ou None se nenhum ponto cair dentro.
+    """
+    low, high = volume.bounds
+    box_volume = float(np.prod(high - low))
+    ratio = min(1.0, expected_volume / box_volume) if expected_volume and box_volume > 0 else 0.5
+    max_batch = max(1, int(max_mb * 1024 * 1024 / CANDIDATE_BYTES))
+    candidate_limit = MAX_CANDIDATE_FACTOR * count / ratio
+
+    accepted = []
+    found = 0
+    drawn = 0
+    while found < count:
+        if drawn > candidate_limit:
+            return None
+        batch = min(max_batch, int((count - found) / ratio * 1.2) + 16)
+        candidates = rng.uniform(low, high, size=(batch, 3))
+        drawn += batch
+        inside = candidates[volume.contains(candidates)]
+        accepted.append(inside[:count - found])
+        found += len(accepted[-1])
+    return np.concatenate(accepted)
+
+
+# =============================================================================
+# DISTÂNCIA COM SINAL E RESTRIÇÃO AO VOLUME
+# =============================================================================
+def _chamfer_distance(seeds):
+    """
+    Distância (em células) de cada célula até a semente mais próxima, por
+    relaxação com os 26 vizinhos (pesos 1, √2 e √3) até estabilizar.
+    """
+    distance = np.where(seeds, 0.0, np.inf)
+    offsets = [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+               if (dx, dy, dz) > (0, 0, 0)]
+    while True:
+        before = distance.copy()
+        for offset in offsets:
+            weight = math.sqrt(sum(o * o for o in offset))
+            for sign in (1, -1):
+                src, dst = [], []
+                for o in offset:
+                    o *= sign
+                    src.append(slice(max(-o, 0), distance.shape[len(src)] - max(o, 0)))
+                    dst.append(slice(max(o, 0), distance.shape[len(dst)] - max(-o, 0)))
+                np.minimum(distance[tuple(dst)], distance[tuple(src)] + weight, out=distance[tuple(dst)])
+        if np.array_equal(before, distance):
+            return distance
+
+
+class SignedDistanceGrid:
+    """
+    Distância com sinal à superfície de um MeshVolume (negativa dentro),
+    amostrada no centro das células de uma grade regular. A distância é a
+    de chanfro entre células (erro de poucos % e no máximo meia célula na
+    superfície), suficiente para manter os galhos dentro do volume.
+    """
+
+    def __init__(self, origin, cell, values):
+        self.origin = np.asarray(origin, dtype=float)
+        self.cell = float(cell)
+        self.values = np.asarray(values, dtype=float)
+        self.gradients = np.stack(np.gradient(self.values, self.cell), axis=-1)
+
+    @classmethod
+    def from_volume(cls, volume, resolution=DEFAULT_SDF_RESOLUTION):
+        low, high = volume.bounds
+        cell = float((high - low).max()) / resolution
+        origin = low - SDF_PADDING * cell
+        shape = tuple(np.ceil((high - low) / cell).astype(int) + 2 * SDF_PADDING)
+        centers = np.stack(np.meshgrid(*(origin[axis] + (np.arange(shape[axis]) + 0.5) * cell
+                                         for axis in range(3)), indexing='ij'), axis=-1)
+        inside = volume.contains(centers.reshape(-1, 3)).reshape(shape)
+        # A superfície fica a meia célula entre uma célula de dentro e uma de fora
+        values = np.where(inside, -(_chamfer_distance(~inside) - 0.5), _chamfer_distance(inside) - 0.5)
+        return cls(origin, cell, values * cell)
+
+    def _interpolate(self, grid, points):
+        shape = np.array(self.values.shape)
+        position = np.clip((np.asarray(points, dtype=float) - self.origin) / self.cell - 0.5, 0, shape - 1)
+        base = np.minimum(np.floor(position).astype(np.int64), shape - 2)
+        t = position - base
+        result = 0.0
+        for corner in range(8):
+            bits = np.array([(corner >> axis) & 1 for axis in range(3)])
+            weight = np.prod(np.where(bits, t, 1 - t), axis=1)
+            index = base + bits
+            value = grid[index[:, 0], index[:, 1], index[:, 2]]
+            result = result + (weight[:, None] * value if value.ndim > 1 else weight * value)
+        return result
+
+    def distance(self, points):
+        """Distância com sinal interpolada nos pontos (N, 3)."""
+        return self._interpolate(self.values, points)
+
+    def gradient(self, points):
+        """Gradiente interpolado da distância (aponta para fora da malha)."""
+        return self._interpolate(self.gradients, points)
+
+
+class VolumeConstraint:
+    """
+    Mantém os nós novos dentro do volume. Com mode='reject' os nós que saem
+    são descartados; com 'project' são empurrados de volta para dentro pelo
+    gradiente da distância (a `margin` da superfície), refeitos com o
+    comprimento do passo e descartados só se ainda ficarem fora. Um nó
+    descartado não cresce nesta iteração; se insistir, seus atratores acabam
+    removidos por estagnação.
+    """
+
+    def __init__(self, grid, mode='project', margin=None):
+        if mode not in CONTAINMENT_MODES:
+            raise ValueError(f"Modo de contenção inválido: '{mode}' (use {', '.join(CONTAINMENT_MODES)})")
+        self.grid = grid
+        self.mode = mode
+        self.margin = 0.5 * grid.cell if margin is None else float(margin)
+
+    def inside(self, points):
+        return self.grid.distance(points) <= 0
+
+    def apply(self, origins, positions, step_size):
+        """Retorna (posições ajustadas, máscara dos nós mantidos) dos nós novos que saem de `origins`."""
+        distance = self.grid.distance(positions)
+        outside = distance > 0
+        keep = ~outside
+        if self.mode == 'reject' or not outside.any():
+            return positions, keep
+
+        positions = positions.copy()
+        gradient = self.grid.gradient(positions[outside])
+        normal = gradient / np.maximum(np.linalg.norm(gradient, axis=1, keepdims=True), 1e-12)
+        pushed = positions[outside] - (distance[outside] + self.margin)[:, None] * normal
+        direction = pushed - origins[outside]
+        length = np.linalg.norm(direction, axis=1, keepdims=True)
+        pushed = origins[outside] + direction / np.maximum(length, 1e-12) * step_size
+        positions[outside] = pushed
+        keep[outside] = self.inside(pushed) & (length[:, 0] > 0)
+        return positions, keep
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: tests/conftest.py
+#
+#   Descrição:
+#   Configuração comum dos testes (pytest): coloca a raiz do projeto no
+#   sys.path (e a pasta versao3d) e oferece os parâmetros de uma máscara e
+#   de uma malha pequenas, rápidas o bastante para rodar o crescimento
+#   inteiro em poucos segundos.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import os
+import sys
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(BASE_DIR, 'versao3d'), BASE_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+CUBE_PATH = os.path.join(BASE_DIR, 'versao3d', 'cubo_bom.obj')
+
+# Parâmetros de `run_fractal_generation_3d` para o cubo de lado 2 centrado na origem
+CUBE_PARAMS = {
+    'input_file': CUBE_PATH,
+    'num_attractors': 400, 'step_size': 0.15, 'kill_distance': 0.1,
+    'stagnation_limit': 20, 'seed': 3, 'use_cache': False,
+}
+
+
+class SilentQueue:
+    """Substitui a fila da GUI: descarta as mensagens de status."""
+
+    def put(self, message, block=True, timeout=None):
+        pass
+
+
+@pytest.fixture
+def mask_params(tmp_path, monkeypatch):
+    """Parâmetros de `grow_mask_tree` para a máscara da mão, sem cache em disco."""
+    monkeypatch.setenv('FRACTAL_CACHE_DIR', str(tmp_path / 'cache'))
+    return {
+        'mask_path': os.path.join(BASE_DIR, 'mao.png'),
+        'width': 400, 'height': 400,
+        'num_attractors': 1500, 'kill_distance': 5, 'step_size': 5,
+        'stagnation_limit': 20, 'seed': 3, 'use_cache': False,
+    }
+
+
+@pytest.fixture
+def cube_params():
+    return dict(CUBE_PARAMS)
+
+
+@pytest.fixture(scope='session')
+def cube_tree():
+    """Árvore 3D do cubo, gerada uma vez por sessão (não deve ser alterada)."""
+    import Fractal3d
+    return Fractal3d.run_fractal_generation_3d(dict(CUBE_PARAMS))
+
+
+@pytest.fixture
+def cube_volume():
+    """O cubo de `cube_params` como fractal_volume.MeshVolume."""
+    import trimesh
+    import fractal_volume
+    mesh = trimesh.load(CUBE_PATH)
+    return fractal_volume.MeshVolume(mesh.vertices, mesh.faces)
+
+
+@pytest.fixture
+def output_queue():
+    return SilentQueue()
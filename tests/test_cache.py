@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: tests/test_cache.py
+#
+#   Descrição:
+#   Chaves do cache de resultados (fractal_cache) e a ordem de remoção LRU.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import os
+
+import numpy as np
+import pytest
+
+import fractal_cache
+
+KEYS = ('num_attractors', 'step_size', 'kill_distance')
+
+
+@pytest.fixture
+def mask_file(tmp_path):
+    path = tmp_path / 'mascara.png'
+    path.write_bytes(b'mascara-original')
+    return str(path)
+
+
+def _key(params, seed, mask_file):
+    return fractal_cache.make_key('mask_tree', params, KEYS, seed, files=[mask_file])
+
+
+def test_make_key_is_stable(mask_file):
+    params = {'num_attractors': 500, 'step_size': 5, 'kill_distance': 10}
+    same = {'num_attractors': 500.0, 'step_size': 5.0, 'kill_distance': 10, 'bg_color': '#000'}
+    assert _key(params, 1, mask_file) == _key(same, 1, mask_file)
+
+
+@pytest.mark.parametrize('change', [{'num_attractors': 501}, {'step_size': 4.5},
+                                    {'kill_distance': None}])
+def test_make_key_changes_with_params(mask_file, change):
+    params = {'num_attractors': 500, 'step_size': 5, 'kill_distance': 10}
+    assert _key(params, 1, mask_file) != _key(dict(params, **change), 1, mask_file)
+
+
+def test_make_key_changes_with_seed(mask_file):
+    params = {'num_attractors': 500}
+    assert _key(params, 1, mask_file) != _key(params, 2, mask_file)
+    assert _key(params, None, mask_file) != _key(params, 0, mask_file)
+
+
+def test_make_key_changes_with_mask_bytes(mask_file):
+    params = {'num_attractors': 500}
+    before = _key(params, 1, mask_file)
+    with open(mask_file, 'wb') as f:
+        f.write(b'mascara-editada')
+    # O memo do hash usa o mtime; força um mtime diferente para o mesmo caminho
+    stat = os.stat(mask_file)
+    os.utime(mask_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert _key(params, 1, mask_file) != before
+
+
+def _tree(values):
+    return {'positions': np.zeros((values, 2)), 'parents': np.full(values, -1)}
+
+
+def _age(cache, key, seconds_ago):
+    when = os.path.getmtime(cache._entry_dir(key)) - seconds_ago
+    os.utime(cache._entry_dir(key), (when, when))
+
+
+def test_evict_removes_least_recently_used_first(tmp_path):
+    cache = fractal_cache.ResultCache(str(tmp_path), max_mb=1)
+    for age, key in ((30, 'aa01'), (20, 'bb02'), (10, 'cc03')):
+        cache.put_tree(key, _tree(13000), {'nodes': 13000})
+        _age(cache, key, age)
+    # Ler 'aa01' o torna o mais recente; 'bb02' passa a ser o mais antigo
+    assert cache.get_tree('aa01') is not None
+    cache.put_tree('dd04', _tree(13000), {'nodes': 13000})
+
+    assert cache.get_tree('bb02') is None
+    for key in ('aa01', 'cc03', 'dd04'):
+        assert cache.get_tree(key) is not None
+
+
+def test_evict_keeps_the_entry_just_written(tmp_path):
+    cache = fractal_cache.ResultCache(str(tmp_path), max_mb=0.1)
+    cache.put_tree('aa01', _tree(100), {'nodes': 100})
+    # Uma entrada maior que o limite inteiro continua disponível logo depois de gravada
+    cache.put_tree('bb02', _tree(20000), {'nodes': 20000})
+    arrays, meta = cache.get_tree('bb02')
+    assert meta == {'nodes': 20000}
+    assert arrays['positions'].shape == (20000, 2)
+    assert cache.get_tree('aa01') is None
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: tests/test_colony.py
+#
+#   Descrição:
+#   A fronteira ativa da colônia (ColonyFrontier) deve responder às buscas
+#   de vizinho exatamente como uma busca por força bruta em todos os nós.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import numpy as np
+import pytest
+
+from fractal_crescimento_colonia_filme import ColonyFrontier
+
+CENTER = np.array([200.0, 200.0])
+
+
+def _ring(rng, count, inner, outer):
+    """Pontos uniformes no anel [inner, outer) em volta de CENTER."""
+    angle = rng.uniform(0, 2 * np.pi, count)
+    radius = np.sqrt(rng.uniform(inner ** 2, outer ** 2, count))
+    return CENTER + radius[:, None] * np.stack([np.cos(angle), np.sin(angle)], axis=1)
+
+
+def _grown_colony(rng, band):
+    """Colônia crescendo em anéis, com a fronteira acompanhando o raio."""
+    colony = ColonyFrontier(CENTER[None, :], [-1], CENTER, band)
+    for radius in range(10, 110, 10):
+        nodes = _ring(rng, 40, radius - 10, radius)
+        colony.append(nodes, rng.integers(0, colony.node_count, len(nodes)))
+        colony.expand_to(radius)
+    return colony
+
+
+def _brute_force(points, nodes):
+    d2 = ((points[:, None, :] - nodes[None, :, :]) ** 2).sum(axis=-1)
+    return d2.argmin(axis=1), np.sqrt(d2.min(axis=1))
+
+
+@pytest.mark.parametrize('band', [5.0, 30.0])
+def test_nearest_matches_brute_force(band):
+    rng = np.random.default_rng(0)
+    colony = _grown_colony(rng, band)
+    assert len(colony.frontier) < colony.node_count
+    # Atratores no anel externo (o caso comum) e alguns lá dentro (caem na busca completa)
+    points = np.concatenate([_ring(rng, 300, 100, 140), _ring(rng, 50, 0, 90)])
+    expected, _ = _brute_force(points, colony.positions)
+    np.testing.assert_array_equal(colony.nearest(points), expected)
+
+
+def test_nearest_breaks_ties_by_lowest_index():
+    colony = ColonyFrontier(CENTER[None, :], [-1], CENTER, 5.0)
+    colony.append([CENTER + [50, 0], CENTER + [50, 0], CENTER + [60, 0]], [0, 0, 1])
+    colony.expand_to(60)
+    assert colony.nearest(np.array([CENTER + [55, 0], CENTER + [48, 0]])).tolist() == [1, 1]
+    assert colony.nearest(np.empty((0, 2))).shape == (0,)
+
+
+@pytest.mark.parametrize('radius', [2.0, 8.0, 25.0])
+def test_any_within_matches_brute_force(radius):
+    rng = np.random.default_rng(1)
+    colony = _grown_colony(rng, 5.0)
+    points = np.concatenate([_ring(rng, 300, 95, 130), _ring(rng, 50, 0, 90)])
+    _, distance = _brute_force(points, colony.positions)
+    np.testing.assert_array_equal(colony.any_within(points, radius), distance <= radius)
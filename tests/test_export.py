@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: tests/test_export.py
+#
+#   Descrição:
+#   Exportação da árvore 3D (Fractal3d.export_tree): o .obj e o .ply binário
+#   lidos de volta têm os mesmos vértices e arestas da árvore.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import numpy as np
+import pytest
+
+import Fractal3d
+
+
+def read_obj(filename):
+    """Vértices e arestas (índices a partir de 0) de um .obj de linhas."""
+    vertices, edges = [], []
+    with open(filename) as f:
+        for line in f:
+            fields = line.split()
+            if fields and fields[0] == 'v':
+                vertices.append([float(value) for value in fields[1:4]])
+            elif fields and fields[0] == 'l':
+                edges.append([int(value) - 1 for value in fields[1:3]])
+    return np.array(vertices), np.array(edges)
+
+
+def read_ply(filename):
+    """Vértices (x, y, z, birth) e arestas de um .ply binário gravado por export_tree_to_ply."""
+    with open(filename, 'rb') as f:
+        counts = {}
+        while True:
+            line = f.readline().decode('ascii').strip()
+            if line.startswith('element'):
+                _, name, count = line.split()
+                counts[name] = int(count)
+            if line == 'end_header':
+                break
+        vertex = np.dtype([('x', '<f4'), ('y', '<f4'), ('z', '<f4'), ('birth', '<i4')])
+        vertices = np.frombuffer(f.read(vertex.itemsize * counts['vertex']), dtype=vertex)
+        edges = np.frombuffer(f.read(8 * counts['edge']), dtype='<i4').reshape(-1, 2)
+        assert f.read() == b''
+    return vertices, edges
+
+
+@pytest.fixture
+def expected(cube_tree):
+    """Arestas (pai, filho) esperadas da árvore do cubo."""
+    return Fractal3d._tree_edges(cube_tree['parents'])
+
+
+def test_obj_reads_back_the_tree(cube_tree, expected, tmp_path):
+    filename = str(tmp_path / 'arvore.obj')
+    Fractal3d.export_tree(cube_tree, filename)
+    vertices, edges = read_obj(filename)
+
+    assert len(vertices) == len(cube_tree['positions'])
+    assert len(edges) == len(cube_tree['positions']) - 1
+    np.testing.assert_array_equal(edges, expected)
+    np.testing.assert_allclose(vertices, cube_tree['positions'], atol=5e-7)
+
+
+def test_ply_reads_back_the_tree(cube_tree, expected, tmp_path):
+    filename = str(tmp_path / 'arvore.ply')
+    Fractal3d.export_tree(cube_tree, filename)
+    vertices, edges = read_ply(filename)
+
+    assert len(vertices) == len(cube_tree['positions'])
+    np.testing.assert_array_equal(edges, expected)
+    positions = np.column_stack([vertices['x'], vertices['y'], vertices['z']])
+    np.testing.assert_allclose(positions, cube_tree['positions'], atol=1e-6)
+    np.testing.assert_array_equal(vertices['birth'], cube_tree['births'])
+
+
+def test_obj_and_ply_agree(cube_tree, tmp_path):
+    obj_file, ply_file = str(tmp_path / 'arvore.obj'), str(tmp_path / 'arvore.ply')
+    Fractal3d.export_tree(cube_tree, obj_file)
+    Fractal3d.export_tree(cube_tree, ply_file)
+    obj_vertices, obj_edges = read_obj(obj_file)
+    ply_vertices, ply_edges = read_ply(ply_file)
+
+    assert len(obj_vertices) == len(ply_vertices)
+    np.testing.assert_array_equal(obj_edges, ply_edges)
+
+
+def test_unknown_extension_is_rejected(cube_tree, tmp_path):
+    with pytest.raises(ValueError):
+        Fractal3d.export_tree(cube_tree, str(tmp_path / 'arvore.stl'))
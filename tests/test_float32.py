@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: tests/test_float32.py
+#
+#   Descrição:
+#   Modo float32 do motor (dtype='float32'): os nós novos já saem do passo de
+#   crescimento em float32, sem passar por float64 no caminho, com e sem os
+#   kernels compilados.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import numpy as np
+import pytest
+
+import fractal_growth
+
+
+def _engine(dtype, max_substeps):
+    """Motor 3D com atratores aleatórios no cubo [-1, 1]^3 e raiz na origem."""
+    attractors = np.random.RandomState(5).uniform(-1, 1, (600, 3))
+    return fractal_growth.SpaceColonization(attractors, np.zeros((1, 3)), [-1], 0.05, 0.04, 20,
+                                            max_substeps=max_substeps, dtype=dtype)
+
+
+@pytest.mark.parametrize('jit', ['0', '1'])
+@pytest.mark.parametrize('max_substeps', [1, 4])
+def test_new_nodes_are_computed_in_float32(monkeypatch, jit, max_substeps):
+    monkeypatch.setenv('FRACTAL_JIT', jit)
+    engine = _engine('float32', max_substeps)
+    appended = []
+    append_nodes = engine._append_nodes
+
+    def record(positions, parents, births):
+        appended.append(positions.dtype)
+        append_nodes(positions, parents, births)
+
+    monkeypatch.setattr(engine, '_append_nodes', record)
+    tree = engine.run()
+
+    assert appended and set(appended) == {np.dtype(np.float32)}
+    assert tree['positions'].dtype == np.float32
+    assert engine.attractors.dtype == np.float32
+
+
+def test_float32_tree_stays_close_to_float64():
+    single, double = _engine('float32', 1), _engine('float64', 1)
+    single_tree, double_tree = single.run(), double.run()
+
+    # Os arredondamentos mudam algumas decisões, mas não o tamanho da árvore
+    assert abs(len(single_tree['parents']) - len(double_tree['parents'])) <= 0.03 * len(double_tree['parents'])
+    assert abs(single.iterations - double.iterations) <= 0.1 * double.iterations
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: tests/test_influence.py
+#
+#   Descrição:
+#   Ativação preguiçosa dos atratores por raio de influência
+#   (fractal_growth.ParkedAttractors): a ativação tem de pegar exatamente os
+#   atratores ao alcance dos nós novos e, com um raio que cobre a máscara
+#   inteira, a árvore tem de ser a mesma do motor sem raio.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import numpy as np
+
+import fractal_growth
+
+
+def test_radius_covering_the_domain_matches_unlimited(mask_params, output_queue):
+    unlimited, unlimited_stats = fractal_growth.grow_mask_tree(
+        dict(mask_params, influence_radius=None), output_queue)
+    # Diagonal da imagem: todo atrator está no raio de qualquer nó
+    diagonal = float(np.hypot(mask_params['width'], mask_params['height']))
+    parked, parked_stats = fractal_growth.grow_mask_tree(
+        dict(mask_params, influence_radius=diagonal), output_queue)
+
+    assert parked_stats['iterations'] == unlimited_stats['iterations']
+    for key in ('positions', 'parents', 'births'):
+        np.testing.assert_array_equal(parked[key], unlimited[key])
+
+
+def test_parked_attractors_activate_exactly_within_radius():
+    rng = np.random.default_rng(2)
+    attractors = rng.uniform(0, 200, size=(3000, 2))
+    parked = fractal_growth.ParkedAttractors(attractors, np.arange(3000), radius=12.0)
+    activated = np.zeros(3000, dtype=bool)
+    for _ in range(5):
+        nodes = rng.uniform(0, 200, size=(20, 2))
+        # Inclui um atrator exatamente no raio (a comparação é inclusiva)
+        nodes[0] = attractors[0] + [12.0, 0.0]
+        distance = np.sqrt(((attractors[:, None, :] - nodes[None, :, :]) ** 2).sum(axis=-1)).min(axis=1)
+        expected = np.flatnonzero((distance <= 12.0) & ~activated)
+        np.testing.assert_array_equal(parked.activate_near(nodes), expected)
+        activated[expected] = True
+        assert len(parked) == 3000 - activated.sum()
+    np.testing.assert_array_equal(parked.remaining()[1], np.flatnonzero(~activated))
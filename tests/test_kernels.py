@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: tests/test_kernels.py
+#
+#   Descrição:
+#   Os kernels compilados com Numba (fractal_kernels) devem dar exatamente os
+#   mesmos resultados do caminho NumPy de fractal_growth, inclusive em
+#   empates e entradas vazias, e portanto a mesma árvore.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import numpy as np
+import pytest
+
+import fractal_growth
+
+pytest.importorskip('numba')
+
+
+def both_paths(monkeypatch, function, *args, **kwargs):
+    """Resultado de `function` com FRACTAL_JIT=0 (NumPy) e FRACTAL_JIT=1 (Numba)."""
+    results = []
+    for flag in ('0', '1'):
+        monkeypatch.setenv('FRACTAL_JIT', flag)
+        results.append(function(*args, **kwargs))
+    return results
+
+
+def tie_points(dtype):
+    """Nós numa grade inteira e pontos nos meios das arestas (dois nós à mesma distância)."""
+    nodes = np.array([[x, y] for y in range(4) for x in range(4)], dtype=dtype)
+    points = np.array([[x + 0.5, y] for y in range(4) for x in range(3)]
+                      + [[1.5, 1.5], [0.0, 0.0], [-2.0, 7.0]], dtype=dtype)
+    return points, nodes
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_nearest_nodes_matches_with_ties(monkeypatch, dtype):
+    points, nodes = tie_points(dtype)
+    (numpy_idx, numpy_d2), (jit_idx, jit_d2) = both_paths(
+        monkeypatch, fractal_growth.nearest_nodes, points, nodes)
+    np.testing.assert_array_equal(jit_idx, numpy_idx)
+    np.testing.assert_array_equal(jit_d2, numpy_d2)
+    assert jit_d2.dtype == numpy_d2.dtype
+    # Empate: vence o menor índice
+    assert numpy_idx[0] == 0
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+@pytest.mark.parametrize('inclusive', [False, True])
+def test_any_within_matches_at_the_radius(monkeypatch, dtype, inclusive):
+    points, nodes = tie_points(dtype)
+    # Raio igual à distância dos pontos de empate: decide o < contra o <=
+    numpy_hit, jit_hit = both_paths(monkeypatch, fractal_growth.any_within,
+                                    points, nodes, 0.5, inclusive=inclusive)
+    np.testing.assert_array_equal(jit_hit, numpy_hit)
+    assert numpy_hit[0] == inclusive
+
+
+def test_empty_inputs(monkeypatch):
+    nodes = np.zeros((3, 2))
+    empty = np.empty((0, 2))
+    for idx, d2 in both_paths(monkeypatch, fractal_growth.nearest_nodes, empty, nodes):
+        assert idx.shape == (0,) and d2.shape == (0,)
+    for function_args in ((empty, nodes), (nodes, empty), (empty, empty)):
+        for hit in both_paths(monkeypatch, fractal_growth.any_within, *function_args, 1.0):
+            assert hit.shape == (len(function_args[0]),) and not hit.any()
+    for sums, counts in both_paths(monkeypatch, fractal_growth.accumulate_directions,
+                                   np.empty(0, dtype=np.intp), empty, 3):
+        np.testing.assert_array_equal(sums, np.zeros((3, 2)))
+        np.testing.assert_array_equal(counts, np.zeros(3))
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_accumulate_directions_matches(monkeypatch, dtype):
+    rng = np.random.default_rng(0)
+    owners = rng.integers(0, 7, size=200).astype(np.intp)
+    unit = rng.normal(size=(200, 3)).astype(dtype)
+    (numpy_sums, numpy_counts), (jit_sums, jit_counts) = both_paths(
+        monkeypatch, fractal_growth.accumulate_directions, owners, unit, 9, dtype=dtype)
+    np.testing.assert_array_equal(jit_sums, numpy_sums)
+    np.testing.assert_array_equal(jit_counts, numpy_counts)
+
+
+def test_tree_is_identical_with_and_without_jit(monkeypatch, mask_params, output_queue):
+    trees = [tree for tree, _ in both_paths(monkeypatch, fractal_growth.grow_mask_tree,
+                                            mask_params, output_queue)]
+    assert len(trees[0]['parents']) > 1
+    for key in ('positions', 'parents', 'births'):
+        np.testing.assert_array_equal(trees[1][key], trees[0][key])
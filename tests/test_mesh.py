@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: tests/test_mesh.py
+#
+#   Descrição:
+#   Malha de tubos (fractal_mesh.tube_mesh), cadeia de níveis de detalhe
+#   (lod_chain) e exportação GLB quantizada (fractal_glb), sobre a árvore 3D
+#   do cubo.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import json
+import struct
+
+import numpy as np
+import pytest
+
+import fractal_glb
+import fractal_mesh
+
+ROOT_RADIUS = 0.05
+LOD_BUDGETS = (10000, 4000, 1000, 200)
+
+
+def assert_closed_outward(mesh):
+    """Malha fechada (cada aresta em exatamente duas faces, em sentidos opostos) e volume positivo."""
+    faces = mesh['faces']
+    edges = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]])
+    directed, counts = np.unique(edges, axis=0, return_counts=True)
+    # Enrolamento consistente: nenhuma aresta dirigida se repete ...
+    assert counts.max() == 1
+    # ... e toda aresta aparece também no sentido oposto (malha fechada)
+    reverse = {tuple(edge) for edge in directed[:, ::-1]}
+    assert {tuple(edge) for edge in directed} == reverse
+    a, b, c = (mesh['vertices'][faces[:, k]] for k in range(3))
+    assert np.einsum('ij,ij->i', a, np.cross(b, c)).sum() / 6 > 0
+
+
+def test_tube_mesh_is_closed_with_positive_volume(cube_tree):
+    mesh = fractal_mesh.tube_mesh(cube_tree, root_radius=ROOT_RADIUS)
+    expected = fractal_mesh._tube_triangles(cube_tree['parents'], fractal_mesh.DEFAULT_SEGMENTS)
+    assert len(mesh['faces']) == expected
+    assert_closed_outward(mesh)
+
+
+def test_tube_mesh_births_per_vertex(cube_tree):
+    mesh = fractal_mesh.tube_mesh(cube_tree, root_radius=ROOT_RADIUS)
+    assert mesh['births'].shape == (len(mesh['vertices']),)
+    assert mesh['births'].min() == 0
+    assert mesh['births'].max() == cube_tree['births'].max()
+
+
+def test_lod_chain_respects_budgets(cube_tree):
+    levels = fractal_mesh.lod_chain(cube_tree, LOD_BUDGETS, root_radius=ROOT_RADIUS)
+    assert len(levels) == len(LOD_BUDGETS)
+    triangles = [len(level['mesh']['faces']) for level in levels]
+    for count, budget in zip(triangles, LOD_BUDGETS):
+        assert 0 < count <= budget
+    assert triangles == sorted(triangles, reverse=True)
+    for level in levels:
+        assert_closed_outward(level['mesh'])
+
+
+def _glb_json(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    json_length, = struct.unpack_from('<I', data, 12)
+    return json.loads(data[20:20 + json_length])
+
+
+@pytest.mark.parametrize('kind', ['skeleton', 'tubes'])
+def test_glb_round_trip(cube_tree, tmp_path, kind):
+    if kind == 'skeleton':
+        children = np.nonzero(cube_tree['parents'] >= 0)[0]
+        positions = cube_tree['positions']
+        indices = np.stack([cube_tree['parents'][children], children], axis=1)
+        births, mode = cube_tree['births'], fractal_glb.MODE_LINES
+    else:
+        mesh = fractal_mesh.tube_mesh(cube_tree, root_radius=ROOT_RADIUS)
+        positions, indices, births = mesh['vertices'], mesh['faces'], mesh['births']
+        mode = fractal_glb.MODE_TRIANGLES
+    path = str(tmp_path / f'{kind}.glb')
+    fractal_glb.write_glb(path, positions, indices, mode, births=births)
+
+    loaded = fractal_glb.read_glb(path)
+    _, _, scale = fractal_glb.quantize_positions(positions)
+    assert loaded['mode'] == mode
+    # Erro de quantização: no máximo meio passo da grade int16 (1,5e-5 no cubo)
+    assert np.abs(loaded['positions'] - positions).max() <= 0.5 * scale + 1e-12
+    np.testing.assert_array_equal(loaded['indices'], np.asarray(indices).ravel())
+    np.testing.assert_array_equal(loaded['_BIRTH'], births)
+    assert _glb_json(path)['meshes'][0]['extras']['birth_max'] == births.max()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: tests/test_noise.py
+#
+#   Descrição:
+#   O ruído de Perlin vetorizado (fractal_noise) deve reproduzir exatamente o
+#   pacote `noise`, que a colônia usava antes.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import numpy as np
+import pytest
+
+import fractal_noise
+
+noise = pytest.importorskip('noise')
+
+
+@pytest.mark.parametrize('octaves', [1, 2, 4, 6])
+def test_pnoise3_matches_noise_package(octaves):
+    points = np.random.default_rng(1).uniform(-50, 50, size=(2000, 3)).astype(np.float32)
+    # Inclui pontos da grade inteira, onde o ruído é zero
+    points = np.concatenate([points, [[0, 0, 0], [1, 2, 3], [-4, 5, -6]]]).astype(np.float32)
+    expected = [noise.pnoise3(float(x), float(y), float(z), octaves=octaves, persistence=0.5,
+                              lacunarity=2.0, base=0) for x, y, z in points]
+    values = fractal_noise.pnoise3(points[:, 0], points[:, 1], points[:, 2], octaves=octaves,
+                                   persistence=0.5, lacunarity=2.0, base=0)
+    np.testing.assert_array_equal(values, np.array(expected, dtype=np.float32))
+
+
+def test_pnoise3_scalar_and_broadcast():
+    assert float(fractal_noise.pnoise3(0.3, 0.7, 0.1)) == noise.pnoise3(0.3, 0.7, 0.1)
+    values = fractal_noise.pnoise3(np.linspace(0, 3, 5)[:, None], 0.5, np.linspace(0, 1, 4))
+    assert values.shape == (5, 4)
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: tests/test_partition.py
+#
+#   Descrição:
+#   O crescimento particionado entre processos (fractal_partition) deve
+#   produzir exatamente a mesma árvore do motor serial.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import numpy as np
+import pytest
+
+import fractal_growth
+
+
+@pytest.mark.parametrize('workers', [2, 4])
+def test_partitioned_tree_matches_serial(mask_params, output_queue, workers):
+    mask_params['influence_radius'] = 40
+    serial, serial_stats = fractal_growth.grow_mask_tree(dict(mask_params), output_queue)
+    split, split_stats = fractal_growth.grow_mask_tree(
+        dict(mask_params, partitions=workers), output_queue)
+
+    assert len(serial['parents']) > 1
+    assert split_stats['iterations'] == serial_stats['iterations']
+    for key in ('positions', 'parents', 'births'):
+        np.testing.assert_array_equal(split[key], serial[key])
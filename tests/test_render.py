@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: tests/test_render.py
+#
+#   Descrição:
+#   Turntable 3D em software (fractal_render): o plano e o gerador entregam
+#   o número de quadros pedido em cada modo, com o tamanho pedido.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import math
+
+import numpy as np
+import pytest
+
+import fractal_render
+
+SIZE = (64, 48)
+
+
+@pytest.mark.parametrize('mode', fractal_render.TURNTABLE_MODES)
+@pytest.mark.parametrize('frames', [1, 7, 24])
+def test_plan_has_the_requested_frames(mode, frames):
+    plan = fractal_render.turntable_plan(50, frames, mode)
+
+    assert len(plan) == frames
+    iterations = [iteration for iteration, _ in plan]
+    # O último quadro mostra sempre a árvore completa e o crescimento nunca recua
+    assert iterations[-1] == 50
+    assert iterations == sorted(iterations)
+    if mode == 'rotation':
+        assert set(iterations) == {50}
+
+
+def test_plan_modes_move_the_camera():
+    growth = fractal_render.turntable_plan(50, 8, 'growth', azimuth=0.3)
+    rotation = fractal_render.turntable_plan(50, 8, 'rotation', turns=2.0)
+
+    assert {angle for _, angle in growth} == {0.3}
+    np.testing.assert_allclose([angle for _, angle in rotation], 4 * math.pi * np.arange(8) / 8)
+
+
+def test_plan_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        fractal_render.turntable_plan(50, 8, 'zoom')
+
+
+@pytest.mark.parametrize('mode', fractal_render.TURNTABLE_MODES)
+def test_iter_frames_yields_the_requested_frames(cube_tree, mode):
+    iterations = int(np.max(cube_tree['births']))
+    frames = list(fractal_render.iter_turntable_frames(cube_tree, iterations, SIZE, 'black', 'white', 1,
+                                                       5, mode))
+
+    assert [index for index, _ in frames] == list(range(5))
+    assert all(image.size == SIZE and image.mode == 'RGB' for _, image in frames)
+
+
+def test_transparent_frames(cube_tree):
+    iterations = int(np.max(cube_tree['births']))
+    frames = list(fractal_render.iter_turntable_frames(cube_tree, iterations, SIZE, None, 'white', 2,
+                                                       3, 'both'))
+
+    assert len(frames) == 3
+    _, image = frames[-1]
+    assert image.mode == 'RGBA'
+    # A árvore completa cobre alguns pixels opacos; o resto do fundo é transparente
+    alpha = np.asarray(image)[:, :, 3]
+    assert 0 < np.count_nonzero(alpha) < alpha.size
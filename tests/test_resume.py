@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: tests/test_resume.py
+#
+#   Descrição:
+#   Uma execução interrompida no meio e retomada pelo checkpoint deve terminar
+#   na mesma árvore de uma execução sem interrupção, inclusive quando o
+#   critério de convergência (GrowthGuard) está ligado.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import numpy as np
+import pytest
+
+import fractal_growth
+
+
+class SimulatedCrash(Exception):
+    """Interrupção artificial do crescimento (queda do nó da render farm)."""
+
+
+@pytest.mark.parametrize('crash_at', [2, 4])
+def test_resume_matches_uninterrupted_run(mask_params, output_queue, tmp_path,
+                                          monkeypatch, crash_at):
+    mask_params.update({'width': 800, 'height': 1000, 'kill_distance': 10,
+                        'stagnation_limit': 10, 'seed': 5, 'convergence_window': 6,
+                        'checkpoint_path': str(tmp_path / 'arvore.npz'),
+                        'checkpoint_interval': 1})
+    reference, reference_stats = fractal_growth.grow_mask_tree(dict(mask_params), output_queue)
+
+    step = fractal_growth.SpaceColonization.step
+
+    def crashing_step(engine):
+        if engine.iterations >= crash_at:
+            raise SimulatedCrash()
+        return step(engine)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(fractal_growth.SpaceColonization, 'step', crashing_step)
+        with pytest.raises(SimulatedCrash):
+            fractal_growth.grow_mask_tree(dict(mask_params), output_queue)
+
+    resumed, resumed_stats = fractal_growth.grow_mask_tree(
+        dict(mask_params, resume=True), output_queue)
+
+    assert reference_stats['iterations'] > crash_at
+    assert resumed_stats['iterations'] == reference_stats['iterations']
+    for key in ('positions', 'parents', 'births'):
+        np.testing.assert_array_equal(resumed[key], reference[key])
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: tests/test_sampling.py
+#
+#   Descrição:
+#   Modo aproximado com subconjunto rotativo de atratores (sample_fraction):
+#   cada iteração associa só o grupo id % período, todo atrator é visto uma
+#   vez por período e a árvore exata continua sendo o padrão.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import numpy as np
+
+import fractal_growth
+
+
+def test_full_fraction_matches_exact_tree(mask_params, output_queue):
+    exact, _ = fractal_growth.grow_mask_tree(dict(mask_params), output_queue)
+    full, _ = fractal_growth.grow_mask_tree(dict(mask_params, sample_fraction=1.0), output_queue)
+    for key in ('positions', 'parents', 'births'):
+        np.testing.assert_array_equal(full[key], exact[key])
+
+
+def test_each_iteration_associates_one_rotating_group(monkeypatch):
+    rng = np.random.default_rng(1)
+    attractors = rng.uniform([0, 0], [400, 300], size=(800, 2))
+    positions, parents = fractal_growth.initial_trunk((200, 400), (0.0, -1.0), 5)
+    engine = fractal_growth.SpaceColonization(attractors, positions, parents, 5, 5, 1000,
+                                              sample_fraction=0.25)
+    assert engine.sample_period == 4
+
+    associated = []
+    nearest_nodes = fractal_growth.nearest_nodes
+
+    def recording(points, nodes):
+        associated.append(points.copy())
+        return nearest_nodes(points, nodes)
+
+    monkeypatch.setattr(fractal_growth, 'nearest_nodes', recording)
+    seen = set()
+    for _ in range(12):
+        alive = dict(zip(map(tuple, engine.attractors), engine.attractor_ids))
+        associated.clear()
+        engine.step()
+        ids = {alive[tuple(point)] for point in associated[0]}
+        # Só o grupo id % período desta iteração, completo
+        assert ids == {i for i in alive.values() if i % 4 == engine.iterations % 4}
+        seen |= ids
+        if engine.iterations % 4 == 0:
+            # Um período inteiro: todo atrator vivo no início dele foi visto
+            assert set(engine.attractor_ids) <= seen
+            seen = set()
+
+
+def test_sampled_tree_completes_with_step_length_branches(mask_params, output_queue):
+    exact, exact_stats = fractal_growth.grow_mask_tree(dict(mask_params), output_queue)
+    sampled, stats = fractal_growth.grow_mask_tree(dict(mask_params, sample_fraction=0.25), output_queue)
+    children = np.flatnonzero(sampled['parents'] >= 0)
+    lengths = np.linalg.norm(sampled['positions'][children]
+                             - sampled['positions'][sampled['parents'][children]], axis=1)
+    np.testing.assert_allclose(lengths, mask_params['step_size'])
+    # Aproximado, mas da mesma ordem de grandeza da árvore exata
+    assert 0.5 * exact_stats['nodes'] < stats['nodes'] < 2 * exact_stats['nodes']
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: tests/test_substeps.py
+#
+#   Descrição:
+#   Vários passos por iteração para pontas isoladas (max_substeps): menos
+#   iterações para cruzar o vazio, galhos sempre com o comprimento do passo.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import numpy as np
+import pytest
+
+import fractal_growth
+
+
+def _branch_lengths(tree):
+    children = np.flatnonzero(tree['parents'] >= 0)
+    return np.linalg.norm(tree['positions'][children] - tree['positions'][tree['parents'][children]], axis=1)
+
+
+def _far_attractors(max_substeps):
+    """Tronco na origem e dois atratores a ~200 de distância: uma ponta isolada."""
+    positions, parents = fractal_growth.initial_trunk((0.0, 0.0), (0.0, -1.0), 5)
+    engine = fractal_growth.SpaceColonization(np.array([[0.0, -200.0], [3.0, -205.0]]), positions, parents,
+                                              5, 10, 1000, max_substeps=max_substeps)
+    return engine, engine.run()
+
+
+def test_isolated_tip_crosses_the_gap_in_fewer_iterations():
+    single, single_tree = _far_attractors(1)
+    iterations = [single.iterations]
+    for max_substeps in (2, 4, 8):
+        engine, tree = _far_attractors(max_substeps)
+        iterations.append(engine.iterations)
+        # Praticamente o mesmo caminho (a direção só é refeita a cada iteração),
+        # com o mesmo número de nós, percorrido em menos iterações
+        assert len(tree['parents']) == len(single_tree['parents'])
+        np.testing.assert_allclose(tree['positions'], single_tree['positions'], atol=0.1)
+        np.testing.assert_allclose(_branch_lengths(tree), 5)
+        assert engine.done
+    assert iterations == sorted(iterations, reverse=True)
+    assert iterations[-1] < iterations[0] / 2
+
+
+def test_one_substep_is_the_default(mask_params, output_queue):
+    default, _ = fractal_growth.grow_mask_tree(dict(mask_params), output_queue)
+    single, _ = fractal_growth.grow_mask_tree(dict(mask_params, max_substeps=1), output_queue)
+    for key in ('positions', 'parents', 'births'):
+        np.testing.assert_array_equal(single[key], default[key])
+
+
+@pytest.mark.parametrize('max_substeps', [3, 6])
+def test_mask_branches_keep_the_step_length(mask_params, output_queue, max_substeps):
+    tree, stats = fractal_growth.grow_mask_tree(dict(mask_params, max_substeps=max_substeps), output_queue)
+    np.testing.assert_allclose(_branch_lengths(tree), mask_params['step_size'])
+    assert stats['nodes'] > 10
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+#
+#   Arquivo: tests/test_volume.py
+#
+#   Descrição:
+#   Teste de pertencimento, sorteio de atratores e grade de distância com
+#   sinal de fractal_volume, no cubo de versao3d/cubo_bom.obj.
+#
+# =============================================================================
+# Desenvolvedores: Julie Pires, Marcelo Ribeiro, Francisco Freitas, Angélica de
+#                   Carvalho
+#
+# Parte do projeto para o evento #24.ART - Encontro Internacional de Arte e
+#                                   Tecnologia / Exposição EmMeio#17
+#
+# Nome da Obra: Existência Híbrida: (des)dobrando corpos numa anatomia gráfica
+#                                   em Realidade Aumentada
+# =============================================================================
+import numpy as np
+import pytest
+
+import fractal_volume
+
+
+def test_contains_points_over_shared_edges(cube_volume):
+    # As faces do cubo são divididas pela diagonal x == y: o raio +z desses
+    # pontos passa exatamente sobre a aresta comum a dois triângulos
+    line = np.linspace(-0.9, 0.9, 7)
+    points = np.stack([line, line, np.full(7, 0.25)], axis=1)
+    corners = np.array([[0.0, 0.0, 0.0], [0.9, 0.9, -0.9], [0.5, -0.5, -0.5]])
+    assert cube_volume.contains(points).all()
+    assert cube_volume.contains(corners).all()
+    assert not cube_volume.contains(points + [0.0, 0.0, 1.0]).any()
+
+
+def _brute_force_distance(seeds):
+    """Distância euclidiana exata (em células) de cada célula até a semente mais próxima."""
+    seed_cells = np.argwhere(seeds)
+    cells = np.argwhere(np.ones_like(seeds))
+    d2 = ((cells[:, None, :] - seed_cells[None, :, :]) ** 2).sum(axis=-1)
+    return np.sqrt(d2.min(axis=1)).reshape(seeds.shape)
+
+
+@pytest.mark.parametrize('inside_box', [True, False])
+def test_chamfer_distance_within_half_a_cell_on_a_box(inside_box):
+    # Uma caixa com a mesma folga de fora da grade de distância
+    pad = fractal_volume.SDF_PADDING
+    seeds = np.zeros((5 + 2 * pad, 7 + 2 * pad, 4 + 2 * pad), dtype=bool)
+    seeds[pad:pad + 5, pad:pad + 7, pad:pad + 4] = True
+    if not inside_box:
+        seeds = ~seeds
+    error = fractal_volume._chamfer_distance(seeds) - _brute_force_distance(seeds)
+    assert error.min() >= 0
+    assert error.max() <= 0.5
+
+
+def test_signed_distance_grid_on_the_cube(cube_volume):
+    grid = fractal_volume.SignedDistanceGrid.from_volume(cube_volume, resolution=16)
+    points = np.random.default_rng(0).uniform(-1.2, 1.2, size=(2000, 3))
+    # Distância com sinal exata ao cubo [-1, 1]^3
+    outside = np.maximum(np.abs(points) - 1, 0)
+    exact = np.sqrt((outside ** 2).sum(axis=1)) + np.minimum((np.abs(points) - 1).max(axis=1), 0)
+    distance = grid.distance(points)
+    # Dentro do cubo (onde a restrição decide) o erro fica abaixo de meia célula;
+    # fora, nos cantos, a distância de chanfro só precisa acertar o sinal
+    inside = exact <= 0
+    assert np.abs(distance[inside] - exact[inside]).max() <= 0.5 * grid.cell
+    assert (distance[exact > grid.cell] > 0).all()
+
+
+@pytest.mark.parametrize('mode', fractal_volume.CONTAINMENT_MODES)
+def test_containment_keeps_every_node_inside(cube_params, cube_volume, mode):
+    import Fractal3d
+    resolution = 16
+    tree = Fractal3d.run_fractal_generation_3d(
+        dict(cube_params, containment=mode, containment_resolution=resolution))
+    grid = fractal_volume.SignedDistanceGrid.from_volume(cube_volume, resolution)
+    assert len(tree['positions']) > 100
+    assert grid.distance(tree['positions']).max() <= 0
+
+
+def test_without_containment_branches_leave_the_cube(cube_params, cube_volume):
+    import Fractal3d
+    tree = Fractal3d.run_fractal_generation_3d(cube_params)
+    grid = fractal_volume.SignedDistanceGrid.from_volume(cube_volume, 16)
+    assert grid.distance(tree['positions']).max() > 0
+
+
+@pytest.fixture
+def torus_volume():
+    """Toro (raios 1 e 0,3): volume não convexo, com furo no meio."""
+    import trimesh
+    torus = trimesh.creation.torus(major_radius=1.0, minor_radius=0.3, major_sections=48, minor_sections=24)
+    return fractal_volume.MeshVolume(torus.vertices, torus.faces), torus.volume
+
+
+def test_sample_volume_stays_inside_the_mesh(cube_volume, torus_volume):
+    points = fractal_volume.sample_volume(cube_volume, 2000, np.random.RandomState(0), expected_volume=8.0)
+    assert points.shape == (2000, 3)
+    assert np.abs(points).max() <= 1
+
+    volume, expected = torus_volume
+    points = fractal_volume.sample_volume(volume, 2000, np.random.RandomState(0), expected_volume=expected)
+    # As faces ficam dentro do toro exato: todo ponto aceito também fica
+    tube_distance = np.hypot(np.hypot(points[:, 0], points[:, 1]) - 1.0, points[:, 2])
+    assert tube_distance.max() <= 0.3
+    assert volume.contains(points).all()
+
+
+@pytest.mark.parametrize('max_mb', [0.001, 0.05])
+def test_sample_volume_does_not_depend_on_batch_size(torus_volume, max_mb):
+    volume, expected = torus_volume
+    reference = fractal_volume.sample_volume(volume, 3000, np.random.RandomState(7), expected_volume=expected)
+    batched = fractal_volume.sample_volume(volume, 3000, np.random.RandomState(7), expected_volume=expected,
+                                           max_mb=max_mb)
+    np.testing.assert_array_equal(batched, reference)
@@ -15,81 +15,425 @@
 #                                   em Realidade Aumentada
 # =============================================================================
 
+import os
+import sys
 import numpy as np
 import trimesh
 import argparse
+import json
+import tempfile
 import time
 
-def export_tree_to_obj(nodes, filename):
-    """Exporta a árvore de nós (vértices e arestas) para um arquivo .obj."""
-    print(f"Exportando {len(nodes)} nós para {filename}...")
-    
-    node_to_index = {id(node): i + 1 for i, node in enumerate(nodes)}
+# O núcleo de crescimento é compartilhado com os geradores 2D (pasta acima)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fractal_cache
+import fractal_checkpoint
+import fractal_glb
+import fractal_growth
+import fractal_mesh
+import fractal_partition
+import fractal_profile
+import fractal_render
+import fractal_volume
+
+# Parâmetros que afetam a árvore 3D (e portanto a chave do cache)
+TREE_3D_KEYS = ('num_attractors', 'step_size', 'kill_distance', 'stagnation_limit', 'influence_radius',
+                'convergence_window', 'max_iterations', 'max_substeps', 'sample_fraction', 'dtype',
+                'volume_sampling', 'containment', 'containment_resolution')
+
+def _tree_edges(parents):
+    """Arestas (pai, filho) da árvore, com índices a partir de 0."""
+    children = np.nonzero(np.asarray(parents) >= 0)[0]
+    return np.column_stack([np.asarray(parents)[children], children])
 
+def export_tree_to_obj(tree, filename):
+    """Exporta a árvore (vértices e arestas) para um arquivo .obj."""
+    positions = np.asarray(tree['positions'], dtype=float)
+    edges = _tree_edges(tree['parents']) + 1
+    print(f"Exportando {len(positions)} nós para {filename}...")
+
+    # Um único `%` formata cada bloco inteiro (em C), em vez de um write por linha
     with open(filename, 'w') as f:
         f.write("# Fractal 3D Gerado com Space Colonization\n")
-        
-        for node in nodes:
-            pos = node['pos']
-            f.write(f"v {pos[0]:.6f} {pos[1]:.6f} {pos[2]:.6f}\n")
-            
-        for node in nodes:
-            if node['parent']:
-                parent_idx = node_to_index[id(node['parent'])]
-                child_idx = node_to_index[id(node)]
-                f.write(f"l {parent_idx} {child_idx}\n")
+        f.write(("v %.6f %.6f %.6f\n" * len(positions)) % tuple(positions.ravel().tolist()))
+        f.write(("l %d %d\n" * len(edges)) % tuple(edges.ravel().tolist()))
+    print("Exportação concluída.")
+
+def export_tree_to_ply(tree, filename):
+    """
+    Exporta a árvore para PLY binário (vértices float32 e arestas), legível
+    pelo Blender. Cada vértice leva também a propriedade `birth` (iteração em
+    que o nó nasceu), para animar o crescimento num shader de RA.
+    """
+    vertex = np.dtype([('x', '<f4'), ('y', '<f4'), ('z', '<f4'), ('birth', '<i4')])
+    vertices = np.zeros(len(tree['positions']), dtype=vertex)
+    positions = np.asarray(tree['positions'])
+    vertices['x'], vertices['y'], vertices['z'] = positions[:, 0], positions[:, 1], positions[:, 2]
+    vertices['birth'] = tree['births'] if 'births' in tree else 0
+    edges = _tree_edges(tree['parents']).astype('<i4')
+    print(f"Exportando {len(vertices)} nós para {filename}...")
+
+    header = ("ply\n"
+              "format binary_little_endian 1.0\n"
+              "comment Fractal 3D Gerado com Space Colonization\n"
+              f"element vertex {len(vertices)}\n"
+              "property float x\nproperty float y\nproperty float z\nproperty int birth\n"
+              f"element edge {len(edges)}\n"
+              "property int vertex1\nproperty int vertex2\n"
+              "end_header\n")
+    with open(filename, 'wb') as f:
+        f.write(header.encode('ascii'))
+        f.write(vertices.tobytes())
+        f.write(np.ascontiguousarray(edges).tobytes())
+    print("Exportação concluída.")
+
+def export_tree_to_npz(tree, filename):
+    """Grava os arrays da árvore ('positions', 'parents', 'births') num .npz."""
+    print(f"Exportando {len(tree['positions'])} nós para {filename}...")
+    np.savez(filename, **{name: np.asarray(values) for name, values in tree.items()})
     print("Exportação concluída.")
 
-def run_fractal_generation_3d(params):
-    """Executa o algoritmo de colonização do espaço em 3D."""
+def export_tree_to_glb(tree, filename):
+    """Exporta o esqueleto para GLB (linhas indexadas, posições int16 e atributo _BIRTH)."""
+    print(f"Exportando {len(tree['positions'])} nós para {filename}...")
+    fractal_glb.write_glb(filename, tree['positions'], _tree_edges(tree['parents']), fractal_glb.MODE_LINES,
+                          births=tree.get('births'))
+    print("Exportação concluída.")
+
+# Extensão do arquivo de saída -> exportador
+EXPORTERS = {'.obj': export_tree_to_obj, '.ply': export_tree_to_ply, '.npz': export_tree_to_npz,
+             '.glb': export_tree_to_glb}
+
+def export_tree(tree, filename):
+    """Exporta a árvore no formato indicado pela extensão de `filename` (.obj, .ply, .npz ou .glb)."""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in EXPORTERS:
+        raise ValueError(f"Formato de saída não suportado: '{extension}' (use {', '.join(EXPORTERS)})")
+    EXPORTERS[extension](tree, filename)
+
+def _tube_options(params):
+    """Raio do tronco, raio mínimo e expoente dos tubos a partir dos params."""
+    return {'root_radius': params.get('tube_radius') or params['step_size'],
+            'min_radius': params.get('tube_min_radius'),
+            'exponent': params.get('radius_exponent') or fractal_mesh.DEFAULT_RADIUS_EXPONENT}
+
+def export_tubes(tree, params, filename):
+    """
+    Varre o esqueleto numa malha de tubos fechados (fractal_mesh.tube_mesh) e
+    exporta para .obj, .stl ou .glb. params: 'tube_segments' (vértices por anel),
+    'tube_radius' (raio do tronco, padrão: step_size), 'tube_min_radius' e
+    'radius_exponent'.
+    """
+    mesh = fractal_mesh.tube_mesh(tree, segments=params.get('tube_segments') or fractal_mesh.DEFAULT_SEGMENTS,
+                                  **_tube_options(params))
+    print(f"Exportando malha de tubos ({len(mesh['vertices'])} vértices, {len(mesh['faces'])} triângulos) "
+          f"para {filename}...")
+    fractal_mesh.export_mesh(mesh, filename)
+    print("Exportação concluída.")
+
+def export_lods(tree, params, filename):
+    """
+    Exporta um nível de detalhe por orçamento de triângulos em
+    params['lod_budgets'] (fractal_mesh.lod_chain): 'nome_lod0.obj',
+    'nome_lod1.obj'... e o manifesto 'nome_lods.json' com o tamanho de cada
+    nível. Com params['tube_segments'], o nível 0 usa esse número de vértices
+    por anel.
+    """
+    base, extension = os.path.splitext(filename)
+    segments = fractal_mesh.LOD_SEGMENTS
+    if params.get('tube_segments'):
+        segments = (params['tube_segments'],) + tuple(s for s in segments if s < params['tube_segments'])
+    levels = fractal_mesh.lod_chain(tree, params['lod_budgets'], step_size=params['step_size'],
+                                    segments=segments, **_tube_options(params))
+
+    manifest = {'source_nodes': len(tree['positions']), 'levels': []}
+    for index, (budget, level) in enumerate(zip(params['lod_budgets'], levels)):
+        path = f"{base}_lod{index}{extension}"
+        fractal_mesh.export_mesh(level['mesh'], path)
+        entry = {'level': index, 'file': os.path.basename(path), 'budget_triangles': int(budget),
+                 'nodes': len(level['tree']['positions']), 'vertices': len(level['mesh']['vertices']),
+                 'triangles': len(level['mesh']['faces']), 'bytes': os.path.getsize(path),
+                 'segments': level['segments'], 'min_leaves': level['min_leaves'],
+                 'tolerance': level['tolerance']}
+        manifest['levels'].append(entry)
+        over = " (acima do orçamento)" if entry['triangles'] > budget else ""
+        print(f"LOD {index}: {entry['nodes']} nós, {entry['triangles']} triângulos{over} -> {path}")
+
+    manifest_path = f"{base}_lods.json"
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Manifesto dos níveis de detalhe gravado em {manifest_path}.")
+
+# Valores padrão do vídeo de turntable (cores iguais às dos geradores 2D)
+TURNTABLE_DEFAULTS = {'turntable_mode': 'both', 'turntable_frames': 120, 'turntable_turns': 1.0,
+                      'turntable_elevation': 20.0, 'width': 720, 'height': 720,
+                      'bg_color': '#0a0a14', 'tree_color': '#ffffd0', 'line_width': 1}
+
+def render_turntable(tree, params, filename):
+    """
+    Renderiza em CPU (fractal_render.iter_turntable_frames) um vídeo da árvore
+    em órbita: params['turntable_mode'] 'growth', 'rotation' ou 'both'. Usa o
+    mesmo codificador dos vídeos 2D: .webm sai em VP9 com fundo transparente
+    (como o vídeo de RA), os demais formatos com o fundo params['bg_color'].
+    """
+    import imageio.v2 as imageio  # só o vídeo precisa do imageio/ffmpeg
+
+    options = dict(TURNTABLE_DEFAULTS, **{key: value for key, value in params.items() if value is not None})
+    iterations = int(np.max(tree['births'])) if len(tree['births']) else 0
+    transparent = filename.lower().endswith('.webm')
+    frames = fractal_render.iter_turntable_frames(
+        tree, iterations, (options['width'], options['height']), None if transparent else options['bg_color'],
+        options['tree_color'], options['line_width'], options['turntable_frames'], options['turntable_mode'],
+        options['turntable_turns'], options['turntable_elevation'])
+    if transparent:
+        writer = imageio.get_writer(filename, fps=30, codec='libvpx-vp9', pixelformat='yuva420p',
+                                    output_params=['-crf', '25'])
+    else:
+        writer = imageio.get_writer(filename, fps=30, macro_block_size=None)
+
+    print(f"Renderizando turntable ({options['turntable_frames']} quadros, modo '{options['turntable_mode']}') "
+          f"em {filename}...")
+    start_time = time.time()
+    with writer:
+        for index, frame_image in frames:
+            writer.append_data(np.asarray(frame_image))
+    print(f"Turntable concluído em {time.time() - start_time:.2f} segundos.")
+
+def run_fractal_generation_3d(params, output_queue=None):
+    """
+    Executa o algoritmo de colonização do espaço em 3D e retorna a árvore como
+    arrays {'positions', 'parents', 'births'} (ou None em caso de erro).
+    Se `output_queue` for informado, recebe ao final a mensagem {'stats': ...}
+    no mesmo formato dos geradores 2D (usado pelo fractal_cli.py/fractal_batch.py).
+    Com params['checkpoint_path'], o estado é gravado a cada
+    params['checkpoint_interval'] iterações e params['resume'] continua do
+    último checkpoint, produzindo a mesma árvore de uma execução sem quedas.
+    params['convergence_window'], params['max_iterations'] e params['time_budget']
+    encerram o crescimento antes do fim (fractal_growth.GrowthGuard).
+    Com params['volume_sampling'] = 'stream', os atratores são sorteados em
+    lotes dentro da malha (fractal_volume.sample_volume), sem voxelizá-la;
+    params['sampling_max_mb'] limita a memória de cada lote.
+    Com params['containment'] = 'reject' ou 'project', os nós novos que
+    sairiam da malha são descartados ou projetados de volta, consultando uma
+    grade de distância com sinal de params['containment_resolution'] células.
+    Com params['partitions'], o crescimento é repartido em processos por
+    fatias do espaço (fractal_partition; 0 = um por núcleo), com a mesma
+    árvore do motor serial; exige params['influence_radius'] e não grava
+    checkpoints.
+    """
+    guard = fractal_growth.GrowthGuard.from_params(params)
+    checkpointer = fractal_checkpoint.Checkpointer.from_params(
+        params, f'tree_3d_v{fractal_growth.ENGINE_VERSION}', TREE_3D_KEYS, files=[params['input_file']])
+    engine, seed = fractal_growth.resume_engine(params, checkpointer, guard)
+    if seed is None:
+        # Semente explícita: a mesma semente com os mesmos params reproduz a mesma árvore
+        seed = fractal_growth.resolve_seed(params)
+
+    # Mesma malha, mesma semente e mesmos params: a árvore vem do cache
+    cache = fractal_cache.cache_from_params(params)
+    if cache is not None:
+        key = fractal_cache.make_key(f'tree_3d_v{fractal_growth.ENGINE_VERSION}', params, TREE_3D_KEYS,
+                                     seed, files=[params['input_file']])
+        cached = cache.get_tree(key)
+        if cached is not None:
+            tree, stats = cached
+            print(f"Árvore encontrada no cache ({stats['nodes']} nós).")
+            if output_queue is not None:
+                output_queue.put({'stats': dict(stats, cached=True)})
+            return tree
+
+    if engine is not None:
+        # O checkpoint já contém os atratores vivos: não é preciso recarregar a malha
+        print(f"Retomando do checkpoint '{checkpointer.path}' na iteração {engine.iterations}...")
+    else:
+        engine = _new_engine_3d(params, seed)
+        if engine is None:
+            return None
+
+    if params.get('containment'):
+        # Galhos presos ao volume da malha (não vai no checkpoint: é recriada ao retomar)
+        engine.constraint = _volume_constraint(params, fractal_cache.cache_from_params(params))
+
+    if params.get('partitions') is not None:
+        # Mesma árvore, com os atratores repartidos entre processos
+        engine = fractal_partition.PartitionedColonization.from_engine(engine, params['partitions'])
+        print(f"Crescimento particionado em {engine.workers} processos (eixo {'xyz'[engine.axis]}).")
+        checkpointer = None
+
+    # 3. PROCESSO DE CRESCIMENTO (núcleo compartilhado em fractal_growth.py)
+    profiler = fractal_profile.PhaseProfiler.from_params(params)
+    engine.profiler = profiler
+
+    def report(engine, info):
+        if engine.iterations % 10 == 0 or engine.done:
+            remaining = engine.remaining_attractors
+            progress = 100 * (engine.initial_attractors - remaining) / engine.initial_attractors
+            print(f"Iteração {engine.iterations}: {remaining} atratores restantes ({progress:.1f}%)")
+        if engine.iterations % fractal_profile.REPORT_INTERVAL == 0:
+            print(profiler.status_text())
+
+    start_time = time.time()
+    tree = engine.run(on_iteration=report, checkpointer=checkpointer, extra_state={'seed': seed},
+                      guard=guard)
+    end_time = time.time()
+    print(f"Processo de crescimento finalizado em {end_time - start_time:.2f} segundos.")
+
+    stats = {'seed': seed, 'nodes': engine.node_count, 'iterations': engine.iterations,
+             'attractors': engine.initial_attractors}
+    if guard.reason is not None:
+        stats['stop_reason'] = guard.reason
+        print(f"Crescimento encerrado na iteração {engine.iterations}: {guard.describe()}.")
+    # Uma árvore cortada pelo relógio não é reprodutível e não vai para o cache
+    if cache is not None and guard.reason != 'time_budget':
+        cache.put_tree(key, tree, stats)
+    if checkpointer is not None:
+        checkpointer.clear()
+    profile = profiler.finish(params, output_queue)
+    if output_queue is not None:
+        output_queue.put({'stats': dict(stats, profile=profile)})
+    else:
+        print(profiler.status_text(last=None))
+    return tree
+
+# Versões dos pré-processamentos da malha guardados no cache
+MESH_CACHE_KIND = 'mesh_repaired_v1'
+VOXEL_CACHE_KIND = 'mesh_voxels_v1'
+SDF_CACHE_KIND = 'mesh_sdf_v2'
+
+def _repaired_mesh(params, cache):
+    """
+    Malha carregada e consertada (process + fill_holes) como arrays
+    {'vertices', 'faces'} e metadados {'volume', 'bounds', 'watertight'}.
+    Com cache, o resultado é guardado pelo hash do arquivo da malha.
+    """
+    key = None
+    if cache is not None:
+        key = fractal_cache.make_key(MESH_CACHE_KIND, {}, (), None, files=[params['input_file']])
+        cached = cache.get_arrays(key)
+        if cached is not None:
+            print("Malha pré-processada encontrada no cache.")
+            return cached
+
+    mesh = trimesh.load_mesh(params['input_file'])
+    
+    # =================== CORREÇÃO FINAL: PROCESSAMENTO EXPLÍCITO ===================
+    # Força o trimesh a calcular todas as propriedades da malha, incluindo o volume.
+    # Esta linha é a nossa principal tentativa para resolver o erro de volume zero.
+    mesh.process()
+    # ============================================================================
+
+    if not mesh.is_watertight:
+        print("Aviso: A malha não é 'watertight'. Tentando consertar...")
+        mesh.fill_holes()
+        if not mesh.is_watertight:
+             print("Aviso: A correção automática falhou. O resultado pode ser impreciso.")
+
+    arrays = {'vertices': np.asarray(mesh.vertices), 'faces': np.asarray(mesh.faces)}
+    meta = {'volume': None if mesh.volume is None else float(mesh.volume),
+            'bounds': np.asarray(mesh.bounds).tolist(), 'watertight': bool(mesh.is_watertight)}
+    if key is not None:
+        cache.put_arrays(key, arrays, meta)
+    return arrays, meta
+
+def _voxel_points(params, cache, mesh_arrays, pitch):
+    """Centros dos voxels preenchidos da malha com o `pitch` dado (cache por malha e pitch)."""
+    key = None
+    if cache is not None:
+        key = fractal_cache.make_key(VOXEL_CACHE_KIND, {'pitch': pitch}, ('pitch',), None,
+                                     files=[params['input_file']])
+        cached = cache.get_arrays(key)
+        if cached is not None:
+            print("Volume voxelizado encontrado no cache.")
+            return cached[0]['points']
+
+    # A malha do cache já está consertada: process=False não refaz o processamento
+    mesh = trimesh.Trimesh(vertices=mesh_arrays['vertices'], faces=mesh_arrays['faces'], process=False)
+    voxelized_mesh = mesh.voxelized(pitch=pitch)
+    
+    # O VoxelGrid não tem o método 'sample'. Usamos '.points' para pegar o centro de cada voxel preenchido.
+    points = np.asarray(voxelized_mesh.points)
+    if key is not None and len(points):
+        cache.put_arrays(key, {'points': points}, {'pitch': pitch})
+    return points
+
+def _volume_constraint(params, cache):
+    """
+    Restrição dos nós novos ao volume da malha (fractal_volume.VolumeConstraint)
+    com a grade de distância com sinal guardada no cache por malha e resolução.
+    """
+    resolution = params.get('containment_resolution') or fractal_volume.DEFAULT_SDF_RESOLUTION
+    key = None
+    grid = None
+    if cache is not None:
+        key = fractal_cache.make_key(SDF_CACHE_KIND, {'resolution': resolution}, ('resolution',), None,
+                                     files=[params['input_file']])
+        cached = cache.get_arrays(key)
+        if cached is not None:
+            print("Grade de distância da malha encontrada no cache.")
+            arrays, meta = cached
+            grid = fractal_volume.SignedDistanceGrid(arrays['origin'], meta['cell'], arrays['values'])
+    if grid is None:
+        mesh_arrays, _ = _repaired_mesh(params, cache)
+        print(f"Calculando a grade de distância da malha ({resolution} células no maior eixo)...")
+        volume = fractal_volume.MeshVolume(mesh_arrays['vertices'], mesh_arrays['faces'])
+        grid = fractal_volume.SignedDistanceGrid.from_volume(volume, resolution)
+        if key is not None:
+            cache.put_arrays(key, {'origin': grid.origin, 'values': grid.values}, {'cell': grid.cell})
+    return fractal_volume.VolumeConstraint(grid, params['containment'])
+
+def _voxel_attractors(params, cache, mesh_arrays, volume, rng):
+    """Sorteia os atratores entre os centros dos voxels preenchidos (o modo padrão)."""
+    pitch = (volume / params['num_attractors'])**(1/3) * 0.5
+    print(f"Usando um pitch de voxel de {pitch:.4f}...")
+    
+    all_voxel_points = _voxel_points(params, cache, mesh_arrays, pitch)
+    
+    if len(all_voxel_points) == 0:
+        print("ERRO: A voxelização não resultou em nenhum ponto. Tente um pitch maior ou verifique a malha.")
+        return None
+
+    # Seleciona uma amostra aleatória dos pontos dos voxels
+    if len(all_voxel_points) > params['num_attractors']:
+         indices = rng.choice(len(all_voxel_points), size=params['num_attractors'], replace=False)
+         return all_voxel_points[indices]
+    return np.array(all_voxel_points)
+
+def _new_engine_3d(params, seed):
+    """Carrega a malha, sorteia os atratores no volume e cria o motor com o tronco inicial."""
+    rng = np.random.RandomState(seed % 2**32)
+    # A malha consertada e o volume voxelizado não dependem de passo, distâncias
+    # nem semente: vêm do cache entre execuções com a mesma malha
+    cache = fractal_cache.cache_from_params(params)
     
     # 1. CARREGAR MALHA E GERAR ATRATORES
     print(f"Carregando malha de '{params['input_file']}'...")
     try:
-        mesh = trimesh.load_mesh(params['input_file'])
-        
-        # =================== CORREÇÃO FINAL: PROCESSAMENTO EXPLÍCITO ===================
-        # Força o trimesh a calcular todas as propriedades da malha, incluindo o volume.
-        # Esta linha é a nossa principal tentativa para resolver o erro de volume zero.
-        mesh.process()
-        # ============================================================================
-
-        if not mesh.is_watertight:
-            print("Aviso: A malha não é 'watertight'. Tentando consertar...")
-            mesh.fill_holes()
-            if not mesh.is_watertight:
-                 print("Aviso: A correção automática falhou. O resultado pode ser impreciso.")
+        mesh_arrays, mesh_meta = _repaired_mesh(params, cache)
+        volume = mesh_meta['volume']
         
-        if mesh.volume is None or mesh.volume <= 1e-6:
-            print(f"\nERRO CRÍTICO: A malha tem volume inválido ({mesh.volume}).")
+        if volume is None or volume <= 1e-6:
+            print(f"\nERRO CRÍTICO: A malha tem volume inválido ({volume}).")
             print("Isso acontece se a malha não for um volume fechado ('watertight').")
             print("POR FAVOR, tente consertar o seu modelo 3D no Blender antes de usar.")
             return None
 
-        print(f"Gerando {params['num_attractors']} atratores dentro do volume da malha (Volume: {mesh.volume:.2f})...")
-        
-        pitch = (mesh.volume / params['num_attractors'])**(1/3) * 0.5
-        print(f"Usando um pitch de voxel de {pitch:.4f}...")
-        
-        voxelized_mesh = mesh.voxelized(pitch=pitch)
-        
-        # O VoxelGrid não tem o método 'sample'. Usamos '.points' para pegar o centro de cada voxel preenchido.
-        all_voxel_points = voxelized_mesh.points
-        
-        if len(all_voxel_points) == 0:
-            print("ERRO: A voxelização não resultou em nenhum ponto. Tente um pitch maior ou verifique a malha.")
-            return None
+        print(f"Gerando {params['num_attractors']} atratores dentro do volume da malha (Volume: {volume:.2f})...")
 
-        # Seleciona uma amostra aleatória dos pontos dos voxels
-        if len(all_voxel_points) > params['num_attractors']:
-             indices = np.random.choice(len(all_voxel_points), size=params['num_attractors'], replace=False)
-             attractor_points = all_voxel_points[indices]
+        if params.get('volume_sampling') == 'stream':
+            # Sorteio contínuo por rejeição, em lotes: sem grade de voxels na memória
+            mesh_volume = fractal_volume.MeshVolume(mesh_arrays['vertices'], mesh_arrays['faces'])
+            attractor_points = fractal_volume.sample_volume(
+                mesh_volume, params['num_attractors'], rng, expected_volume=volume,
+                max_mb=params.get('sampling_max_mb') or fractal_volume.DEFAULT_MAX_MB)
+            if attractor_points is None:
+                print("ERRO: Nenhum ponto sorteado caiu dentro da malha. Verifique se ela é fechada.")
+                return None
         else:
-             attractor_points = all_voxel_points
+            attractor_points = _voxel_attractors(params, cache, mesh_arrays, volume, rng)
+            if attractor_points is None:
+                return None
 
-
-        attractors = [{'id': i, 'pos': p} for i, p in enumerate(attractor_points)]
-        print(f"{len(attractors)} atratores gerados com sucesso.")
+        print(f"{len(attractor_points)} atratores gerados com sucesso.")
     except Exception as e:
         print(f"Erro ao carregar a malha ou gerar atratores: {e}")
         import traceback
@@ -97,99 +441,75 @@ def run_fractal_generation_3d(params):
         return None
 
     # 2. INICIALIZAÇÃO DA ÁRVORE
-    min_point = mesh.bounds[0]
-    root_pos = np.array([ (mesh.bounds[0][0] + mesh.bounds[1][0]) / 2, 
-                          (mesh.bounds[0][1] + mesh.bounds[1][1]) / 2, 
+    bounds = np.asarray(mesh_meta['bounds'])
+    min_point = bounds[0]
+    root_pos = np.array([ (bounds[0][0] + bounds[1][0]) / 2, 
+                          (bounds[0][1] + bounds[1][1]) / 2, 
                           min_point[2] ])
-    
-    root = {'pos': root_pos, 'parent': None}
-    nodes = [root]
-    current = root
-    for _ in range(5):
-        new_pos = np.copy(current['pos'])
-        new_pos[2] += params['step_size']
-        new_node = {'pos': new_pos, 'parent': current}
-        nodes.append(new_node)
-        current = new_node
-
-    stagnation_tracker = {att['id']: {'closest_node_idx': -1, 'count': 0} for att in attractors}
-    initial_attractors = len(attractors)
-
-    # 3. PROCESSO DE CRESCIMENTO
-    start_time = time.time()
-    iterations = 0
-    while attractors:
-        iterations += 1
-        
-        growth_vectors = {i: [] for i in range(len(nodes))}
-        for attractor in attractors:
-            att_pos = attractor['pos']
-            att_id = attractor['id']
-            closest_node_index = -1
-            min_dist = float('inf')
-            for i, node in enumerate(nodes):
-                d = np.linalg.norm(att_pos - node['pos'])
-                if d < min_dist:
-                    min_dist = d
-                    closest_node_index = i
-            
-            if stagnation_tracker[att_id]['closest_node_idx'] == closest_node_index:
-                stagnation_tracker[att_id]['count'] += 1
-            else:
-                stagnation_tracker[att_id]['closest_node_idx'] = closest_node_index
-                stagnation_tracker[att_id]['count'] = 1
-            
-            direction = att_pos - nodes[closest_node_index]['pos']
-            norm = np.linalg.norm(direction)
-            if norm > 0:
-                growth_vectors[closest_node_index].append(direction / norm)
-        
-        new_nodes = []
-        for node_index, vectors in growth_vectors.items():
-            if vectors:
-                avg_direction = np.mean(vectors, axis=0)
-                norm = np.linalg.norm(avg_direction)
-                if norm > 0:
-                    avg_direction /= norm
-                    parent_node = nodes[node_index]
-                    new_pos = parent_node['pos'] + avg_direction * params['step_size']
-                    new_node = {'pos': new_pos, 'parent': parent_node}
-                    new_nodes.append(new_node)
-        nodes.extend(new_nodes)
-        
-        ids_to_remove = set()
-        for attractor in attractors:
-            att_id = attractor['id']
-            att_pos = attractor['pos']
-            if stagnation_tracker[att_id]['count'] >= params['stagnation_limit']:
-                ids_to_remove.add(att_id)
-                continue
-            for node in nodes:
-                if np.linalg.norm(att_pos - node['pos']) < params['kill_distance']:
-                    ids_to_remove.add(att_id)
-                    break
-        
-        if ids_to_remove:
-            attractors = [att for att in attractors if att['id'] not in ids_to_remove]
-            for att_id in ids_to_remove:
-                if att_id in stagnation_tracker: del stagnation_tracker[att_id]
-
-        if iterations % 10 == 0 or not attractors:
-            progress = 100 * (initial_attractors - len(attractors)) / initial_attractors
-            print(f"Iteração {iterations}: {len(attractors)} atratores restantes ({progress:.1f}%)")
-
-    end_time = time.time()
-    print(f"Processo de crescimento finalizado em {end_time - start_time:.2f} segundos.")
-    return nodes
+    positions, parents = fractal_growth.initial_trunk(root_pos, (0.0, 0.0, 1.0), params['step_size'])
+    return fractal_growth.SpaceColonization(attractor_points, positions, parents, params['step_size'],
+                                            params['kill_distance'], params['stagnation_limit'],
+                                            influence_radius=params.get('influence_radius'),
+                                            max_substeps=params.get('max_substeps'),
+                                            sample_fraction=params.get('sample_fraction'),
+                                            dtype=params.get('dtype'))
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Gera um fractal 3D dentro de uma malha.")
     parser.add_argument("input_file", help="Caminho para o arquivo de malha de entrada (.obj, .stl, etc.)")
-    parser.add_argument("output_file", help="Caminho para o arquivo de saída .obj")
+    parser.add_argument("output_file", help="Caminho para o arquivo de saída (.obj, .ply binário, .npz ou .glb; "
+                                            "com --tubos, .obj, .stl ou .glb)")
     parser.add_argument("--pontos", type=int, default=5000, help="Número de pontos de atração a serem gerados.")
     parser.add_argument("--passo", type=float, default=0.5, help="Tamanho do passo de crescimento dos galhos.")
     parser.add_argument("--dist_remocao", type=float, default=2.0, help="Distância para um galho remover um atrator.")
     parser.add_argument("--estagnacao", type=int, default=15, help="Limite de iterações para remover um atrator estagnado.")
+    parser.add_argument("--raio_influencia", type=float, default=None,
+                        help="Raio de influência: atratores mais distantes de todos os galhos só atuam quando alcançados.")
+    parser.add_argument("--passos_por_iteracao", type=int, default=None,
+                        help="Máximo de passos de uma ponta isolada numa iteração (1 = desligado).")
+    parser.add_argument("--amostragem", type=float, default=None,
+                        help="Modo aproximado: fração dos atratores associada por iteração (ex.: 0.25).")
+    parser.add_argument("--float32", action="store_true",
+                        help="Nós, atratores e distâncias em float32 (metade da memória; árvore quase igual).")
+    parser.add_argument("--sem_voxelizacao", action="store_true",
+                        help="Sorteia os atratores em lotes dentro da malha, sem montar a grade de voxels.")
+    parser.add_argument("--memoria_amostragem", type=float, default=None,
+                        help="Memória máxima (MB) de cada lote do sorteio sem voxelização (padrão: 64).")
+    parser.add_argument("--conter", choices=('rejeitar', 'projetar'), default=None,
+                        help="Mantém os galhos dentro da malha: descarta ou projeta de volta os nós que saem.")
+    parser.add_argument("--resolucao_conter", type=int, default=None,
+                        help="Células da grade de distância no maior eixo da malha (padrão: 64).")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="Reparte o crescimento em N processos por fatias do espaço (0 = um por núcleo; "
+                             "exige --raio_influencia).")
+    parser.add_argument("--janela_convergencia", type=int, default=None,
+                        help="Para após N iterações sem nós novos ou sem mudança nos atratores.")
+    parser.add_argument("--max_iteracoes", type=int, default=None, help="Número máximo de iterações.")
+    parser.add_argument("--orcamento_tempo", type=float, default=None,
+                        help="Tempo máximo de crescimento em segundos (termina com a árvore até então).")
+    parser.add_argument("--tubos", type=int, default=None, metavar="SEGMENTOS",
+                        help="Exporta uma malha de tubos fechados (para RA) com SEGMENTOS vértices por anel.")
+    parser.add_argument("--raio_tubo", type=float, default=None, help="Raio do tronco dos tubos (padrão: --passo).")
+    parser.add_argument("--raio_minimo", type=float, default=None,
+                        help="Raio mínimo dos galhos (padrão: 10%% do raio do tronco).")
+    parser.add_argument("--expoente_raio", type=float, default=None,
+                        help="Expoente do modelo de Leonardo: raio ∝ folhas^(1/expoente) (padrão: 2).")
+    parser.add_argument("--lods", type=int, nargs='+', default=None, metavar="TRIANGULOS",
+                        help="Exporta níveis de detalhe de tubos, um por orçamento de triângulos "
+                             "(ex.: --lods 200000 50000 10000), e um manifesto JSON.")
+    parser.add_argument("--comparar_obj", action="store_true",
+                        help="Com saída .glb, informa tamanho e tempo de leitura em relação ao .obj equivalente.")
+    parser.add_argument("--giro", default=None, metavar="VIDEO",
+                        help="Renderiza também um vídeo turntable da árvore (.mp4, ou .webm com transparência).")
+    parser.add_argument("--modo_giro", choices=('crescimento', 'rotacao', 'ambos'), default='ambos',
+                        help="Turntable: crescimento com câmera parada, rotação da árvore pronta ou os dois.")
+    parser.add_argument("--quadros_giro", type=int, default=None, help="Número de quadros do turntable (padrão: 120).")
+    parser.add_argument("--voltas", type=float, default=None, help="Voltas da câmera no turntable (padrão: 1).")
+    parser.add_argument("--semente", type=int, default=None, help="Semente do gerador aleatório (reprodutibilidade).")
+    parser.add_argument("--checkpoint", default=None, help="Arquivo .npz para salvar o estado periodicamente.")
+    parser.add_argument("--checkpoint_intervalo", type=int, default=50, help="Iterações entre checkpoints.")
+    parser.add_argument("--resume", action="store_true", help="Continua do último checkpoint (requer --checkpoint).")
+    parser.add_argument("--perfil", default=None, help="Grava o perfil de tempo por fase em JSON ou CSV (pela extensão).")
     
     args = parser.parse_args()
 
@@ -198,10 +518,54 @@ if __name__ == "__main__":
         'num_attractors': args.pontos,
         'step_size': args.passo,
         'kill_distance': args.dist_remocao,
-        'stagnation_limit': args.estagnacao
+        'stagnation_limit': args.estagnacao,
+        'influence_radius': args.raio_influencia,
+        'max_substeps': args.passos_por_iteracao,
+        'sample_fraction': args.amostragem,
+        'dtype': 'float32' if args.float32 else None,
+        'volume_sampling': 'stream' if args.sem_voxelizacao else None,
+        'sampling_max_mb': args.memoria_amostragem,
+        'containment': {'rejeitar': 'reject', 'projetar': 'project', None: None}[args.conter],
+        'containment_resolution': args.resolucao_conter,
+        'partitions': args.processos,
+        'convergence_window': args.janela_convergencia,
+        'max_iterations': args.max_iteracoes,
+        'time_budget': args.orcamento_tempo,
+        'seed': args.semente,
+        'checkpoint_path': args.checkpoint,
+        'checkpoint_interval': args.checkpoint_intervalo,
+        'resume': args.resume,
+        'profile_path': args.perfil,
+        'tube_segments': args.tubos,
+        'tube_radius': args.raio_tubo,
+        'tube_min_radius': args.raio_minimo,
+        'radius_exponent': args.expoente_raio,
+        'lod_budgets': args.lods,
+        'turntable_path': args.giro,
+        'turntable_mode': {'crescimento': 'growth', 'rotacao': 'rotation', 'ambos': 'both'}[args.modo_giro],
+        'turntable_frames': args.quadros_giro,
+        'turntable_turns': args.voltas
     }
 
-    final_nodes = run_fractal_generation_3d(params)
+    final_tree = run_fractal_generation_3d(params)
+
+    if final_tree:
+        if params['lod_budgets']:
+            export_lods(final_tree, params, args.output_file)
+        elif params['tube_segments']:
+            export_tubes(final_tree, params, args.output_file)
+        else:
+            export_tree(final_tree, args.output_file)
+
+        if args.comparar_obj and args.output_file.lower().endswith('.glb') and not params['lod_budgets']:
+            # O mesmo conteúdo em .obj numa pasta temporária, só para a comparação
+            with tempfile.TemporaryDirectory() as folder:
+                obj_path = os.path.join(folder, 'comparacao.obj')
+                if params['tube_segments']:
+                    export_tubes(final_tree, params, obj_path)
+                else:
+                    export_tree(final_tree, obj_path)
+                fractal_glb.compare_with_obj(args.output_file, obj_path)
 
-    if final_nodes:
-        export_tree_to_obj(final_nodes, args.output_file)
+        if params['turntable_path']:
+            render_turntable(final_tree, params, params['turntable_path'])